@@ -0,0 +1,293 @@
+"""Historical backtest of the momentum and value selections
+
+Replays the HQM or RV selection plus equal-weight sizing over a range of
+stored daily snapshots. All dates are handled at once on a 3-D array
+(dates, symbols, fields): imputation, percentile ranks, scores, the top
+N selection, portfolio returns, turnover and drawdown are all computed
+along the date axis, not by rerunning a strategy per day.
+
+Between rebalances the positions drift with their prices; every
+rebalance_every days the portfolio is reset to equal weights of the
+current top N (fractional shares, no trading costs).
+
+    python backtest.py --strategy momentum --start 2025-01-01 --end 2025-12-31
+    python backtest.py --strategy value --synthetic 2520
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import warnings
+
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+from ingest import MOMENTUM_FIELDS, VALUE_FIELDS
+from scoring import composite_score, percentile_ranks
+from snapshotstore import SnapshotStore, column_name
+from strategies import MOMENTUM_METRICS, VALUE_METRICS
+
+PANEL_FIELDS = {**MOMENTUM_FIELDS, **VALUE_FIELDS}
+TRADING_DAYS = 252
+IMPUTATIONS = ('mean', 'median', 'none')
+
+
+class Panel:
+    """Market data of many days: values[date, symbol, field]"""
+
+    def __init__(self, dates: list, symbols: list, fields: list, values: np.ndarray):
+        self.dates = list(dates)
+        self.symbols = list(symbols)
+        self.fields = list(fields)
+        self.values = values
+
+    def field(self, name: str) -> np.ndarray:
+        """(dates, symbols) array of one field"""
+        return self.values[:, :, self.fields.index(name)]
+
+
+def load_panel(store: SnapshotStore, start: str = None, end: str = None,
+               fields: dict = PANEL_FIELDS, universe=None) -> Panel:
+    """Stack the stored snapshots between start and end (inclusive)
+
+    Symbols are the sorted union over all days; a symbol missing on a
+    day has NaN values. With a universe.Universe the symbols are its
+    table in id order instead: the rows of every day are placed at the
+    ids of their symbols, so the days join on the stable ids. Symbols
+    that are not in the table are added to it.
+    """
+    dates = [day for day in store.dates()
+             if (start is None or day >= start) and (end is None or day <= end)]
+    if not dates:
+        raise FileNotFoundError(f'No snapshots between {start} and {end} in {store.root}')
+
+    snapshots = [store.load_fields(fields, day) for day in dates]
+    if universe is None:
+        symbols = sorted(set().union(*(snapshot.symbols.tolist() for snapshot in snapshots)))
+        values = np.full((len(dates), len(symbols), len(fields)), np.nan)
+        for i, snapshot in enumerate(snapshots):
+            columns = snapshot.take(symbols, fields)
+            values[i] = np.column_stack([columns[field] for field in fields])
+        return Panel(dates, symbols, list(fields), values)
+
+    for snapshot in snapshots:
+        universe.add(symbol for symbol in snapshot.symbols.tolist() if symbol not in universe.ids)
+    symbols = list(universe.symbols)
+    values = np.full((len(dates), len(symbols), len(fields)), np.nan)
+    for i, snapshot in enumerate(snapshots):
+        ids = universe.positions(snapshot.symbols.tolist())
+        for j, field in enumerate(fields.values()):
+            source = snapshot.columns.get(column_name(*field))
+            if source is not None:
+                values[i, ids, j] = source
+    return Panel(dates, symbols, list(fields), values)
+
+
+def synthetic_panel(n_dates: int = 2520, n_symbols: int = 500, seed: int = 0) -> Panel:
+    """Random walk prices with trailing returns and value metrics
+
+    For offline testing; the momentum fields are the trailing returns of
+    the simulated price path.
+    """
+    rng = np.random.default_rng(seed)
+    windows = {'One-Year Price Return': 252, 'Six-Month Price Return': 126,
+               'Three-Month Price Return': 63, 'One-Month Price Return': 21}
+    history = n_dates + max(windows.values())
+    drift = rng.normal(0.0003, 0.0003, n_symbols)
+    volatility = rng.uniform(0.01, 0.03, n_symbols)
+    log_prices = np.cumsum(rng.normal(drift, volatility, (history, n_symbols)), axis=0)
+    prices = 50 * np.exp(log_prices)
+
+    fields = list(PANEL_FIELDS)
+    values = np.full((n_dates, n_symbols, len(fields)), np.nan)
+    offset = history - n_dates
+    values[:, :, fields.index('Price')] = prices[offset:]
+    for name, window in windows.items():
+        values[:, :, fields.index(name)] = prices[offset:] / prices[offset - window:-window] - 1
+
+    base = rng.lognormal(0, 0.5, (1, n_symbols, 1))
+    noise = np.exp(np.cumsum(rng.normal(0, 0.01, (n_dates, n_symbols, 6)), axis=0))
+    value_fields = ['Price-to-Earnings Ratio', 'Price-to-Book Ratio', 'Price-to-Sales Ratio',
+                    'Enterprise Value', 'EBITDA', 'Gross Profit']
+    scale = np.array([20, 3, 2, 1e10, 1e9, 2e9])
+    for i, name in enumerate(value_fields):
+        values[:, :, fields.index(name)] = base[:, :, 0] * scale[i] * noise[:, :, i]
+
+    # a few missing values, like the real data
+    missing = rng.random(values.shape) < 0.01
+    missing[:, :, fields.index('Price')] = False
+    values[missing] = np.nan
+
+    dates = pd.bdate_range('2000-01-03', periods=n_dates).strftime('%Y-%m-%d')
+    symbols = [f'S{i:04d}' for i in range(n_symbols)]
+    return Panel(dates, symbols, fields, values)
+
+
+def _fill_cross_section(values: np.ndarray, present: np.ndarray, impute: str = 'mean') -> np.ndarray:
+    """Replace missing metrics with the mean (or median) of that date, like fill_missing
+
+    With impute='none' missing metrics are left out of the score instead.
+    """
+    values = np.where(present[:, :, None], values, np.nan)
+    values = np.where(np.isfinite(values), values, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        match impute:
+            case 'mean':
+                fill = np.nanmean(values, axis=1, keepdims=True)
+            case 'median':
+                fill = np.nanmedian(values, axis=1, keepdims=True)
+            case 'none':
+                return values
+            case _:
+                raise ValueError(f'Unknown imputation {impute!r}, use one of {IMPUTATIONS}')
+    filled = np.where(np.isnan(values), fill, values)
+    return np.where(present[:, :, None], filled, np.nan)
+
+
+def _relative(prices: np.ndarray, base: np.ndarray) -> np.ndarray:
+    """prices / base, 1 where either is missing"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        relative = prices / base
+    return np.where(np.isfinite(relative), relative, 1.0)
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator != 0, numerator / denominator, np.nan)
+
+
+def strategy_scores(panel: Panel, strategy: str, metrics: list = None, impute: str = 'mean') -> tuple:
+    """(dates, symbols) scores of every day and whether low is better
+
+    metrics limits the score to a subset of the metric columns of the
+    strategy, default all of MOMENTUM_METRICS or VALUE_METRICS.
+    """
+    present = np.isfinite(panel.field('Price')) & (panel.field('Price') > 0)
+    match strategy:
+        case 'momentum':
+            metrics = np.stack([panel.field(name) for name in metrics or MOMENTUM_METRICS], axis=-1)
+            ascending = False
+        case 'value':
+            derived = {
+                'EV/EBITDA': _safe_divide(panel.field('Enterprise Value'), panel.field('EBITDA')),
+                'EV/GP': _safe_divide(panel.field('Enterprise Value'), panel.field('Gross Profit')),
+            }
+            metrics = np.stack([derived[name] if name in derived else panel.field(name)
+                                for name in metrics or VALUE_METRICS], axis=-1)
+            ascending = True
+        case _:
+            raise ValueError(f'Unknown strategy {strategy!r}, use momentum or value')
+
+    metrics = _fill_cross_section(metrics, present, impute)
+    scores = composite_score(percentile_ranks(metrics, axis=1))
+    return np.where(present, scores, np.nan), ascending
+
+
+def top_n_mask(scores: np.ndarray, n: int, ascending: bool = False) -> np.ndarray:
+    """(dates, symbols) mask of the n best scores of every date
+
+    Ties are broken on the panel symbol order (sorted, or universe ids).
+    """
+    keys = scores if ascending else -scores
+    keys = np.where(np.isnan(keys), np.inf, keys)
+    order = np.argsort(keys, axis=1, kind='stable')[:, :n]
+    mask = np.zeros(scores.shape, dtype=bool)
+    np.put_along_axis(mask, order, True, axis=1)
+    return mask & np.isfinite(scores)
+
+
+def run_backtest(panel: Panel,
+                 strategy: str,
+                 n: int = 50,
+                 rebalance_every: int = 21,
+                 metrics: list = None,
+                 impute: str = 'mean') -> pd.DataFrame:
+    """Daily portfolio return, value, drawdown and turnover of the strategy"""
+    prices = pd.DataFrame(panel.field('Price')).ffill().to_numpy()
+    n_dates = len(panel.dates)
+
+    # only the rebalance dates need scores
+    rebalance_dates = np.arange(0, n_dates, rebalance_every)
+    rebalance_panel = Panel([panel.dates[i] for i in rebalance_dates],
+                            panel.symbols, panel.fields, panel.values[rebalance_dates])
+    scores, ascending = strategy_scores(rebalance_panel, strategy, metrics, impute)
+    selected = top_n_mask(scores, n, ascending)
+    weights = selected / np.maximum(selected.sum(axis=1, keepdims=True), 1)
+
+    # the rebalance (block) each day belongs to and the prices it started at
+    block = np.arange(n_dates) // rebalance_every
+    base = prices[rebalance_dates][block]
+    block_weights = weights[block]
+
+    # the return of day t comes from the weights held since the rebalance before t
+    held = _relative(prices[:-1], base[:-1])
+    after = _relative(prices[1:], base[:-1])
+    returns = np.zeros(n_dates)
+    returns[1:] = ((block_weights[:-1] * after).sum(axis=1)
+                   / np.maximum((block_weights[:-1] * held).sum(axis=1), 1e-12) - 1)
+    returns[1:][block_weights[:-1].sum(axis=1) == 0] = 0.0
+
+    # turnover: drifted weights just before a rebalance against the new weights
+    turnover = np.zeros(n_dates)
+    turnover[0] = weights[0].sum()
+    drifted = (block_weights[:-1] * after)[rebalance_dates[1:] - 1]
+    drifted /= np.maximum(drifted.sum(axis=1, keepdims=True), 1e-12)
+    turnover[rebalance_dates[1:]] = np.abs(weights[1:] - drifted).sum(axis=1) / 2
+
+    value = np.cumprod(1 + returns)
+    drawdown = value / np.maximum.accumulate(value) - 1
+    return pd.DataFrame({'Return': returns,
+                         'Portfolio Value': value,
+                         'Drawdown': drawdown,
+                         'Turnover': turnover},
+                        index=pd.Index(panel.dates, name='Date'))
+
+
+def summarize(result: pd.DataFrame, rebalance_every: int = 21) -> dict:
+    """Total and annualized return, volatility, max drawdown and turnover"""
+    years = max(len(result.index) - 1, 1) / TRADING_DAYS
+    total = result['Portfolio Value'].iloc[-1] - 1
+    rebalances = result['Turnover'].iloc[rebalance_every::rebalance_every]
+    return {
+        'Total Return': total,
+        'Annual Return': (1 + total) ** (1 / years) - 1,
+        'Annual Volatility': result['Return'].std() * np.sqrt(TRADING_DAYS),
+        'Max Drawdown': result['Drawdown'].min(),
+        'Average Turnover': rebalances.mean() if len(rebalances) else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest the momentum or value selection')
+    parser.add_argument('--strategy', choices=['momentum', 'value'], default='momentum')
+    parser.add_argument('--start', help='first snapshot date, YYYY-MM-DD')
+    parser.add_argument('--end', help='last snapshot date, YYYY-MM-DD')
+    parser.add_argument('--top', type=int, default=50, help='number of stocks to hold')
+    parser.add_argument('--rebalance-every', type=int, default=21, help='trading days')
+    parser.add_argument('--impute', choices=IMPUTATIONS, default='mean',
+                        help='how missing metrics are filled in')
+    parser.add_argument('--synthetic', type=int, metavar='DAYS',
+                        help='run on a synthetic panel of DAYS days instead of snapshots')
+    parser.add_argument('--universe',
+                        help='symbol table (universe.py) the snapshots are joined on by id')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        panel = synthetic_panel(args.synthetic)
+    else:
+        universe = None
+        if args.universe:
+            from stocks import load_universe
+            universe = load_universe(args.universe)
+        panel = load_panel(SnapshotStore(), args.start, args.end, universe=universe)
+
+    result = run_backtest(panel, args.strategy, args.top, args.rebalance_every,
+                          impute=args.impute)
+    print(result)
+    for name, value in summarize(result, args.rebalance_every).items():
+        print(f'{name:<18} {value:10.2%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark and check of the batch mode for many accounts
+
+Runs random jobs (universe, strategy, portfolio value, weighting) of 1
+and of --accounts accounts over two universes against the local IEX
+stub, uncached so every run fetches, with stocksbatch.run_batch. Every
+sized job is checked against the strategy run on its own. With --naive
+the jobs are also run one account at a time (fetch, score and size per
+job), as before the batch mode.
+Run from the repository root:
+    python -m benchmarks.benchbatch --accounts 100 --naive
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd  # The Pandas data science library
+
+import stocks
+from marketdata import MarketDataClient
+from stocksbatch import fetch_jobs, run_batch
+from strategies import STRATEGIES, STRATEGY_WEIGHTINGS
+from stubserver import make_symbols, start_stub_server
+
+
+def make_jobs(accounts: int, universes: list, seed: int = 0) -> list:
+    """One or two random jobs per account"""
+    rng = random.Random(seed)
+    jobs = []
+    for account in range(accounts):
+        for _ in range(rng.randint(1, 2)):
+            strategy = rng.choice(list(STRATEGIES))
+            jobs.append({'account': f'ACC-{account:03d}',
+                         'universe': rng.choice(universes),
+                         'strategy': strategy,
+                         'portfolio_value': round(rng.uniform(1e4, 5e6), 2),
+                         'weighting': rng.choice(STRATEGY_WEIGHTINGS[strategy])})
+    return jobs
+
+
+def run_naive(jobs: list, client) -> list:
+    """Every job on its own: fetch, score and size"""
+    results = []
+    for job in jobs:
+        symbols = stocks.read_universe(job['universe'])
+        results.append(stocks.run(job['strategy'], symbols, job['portfolio_value'], client=client,
+                                  weighting=job['weighting'])[job['strategy']])
+    return results
+
+
+def check(accounts: dict, jobs: list, client) -> int:
+    """Every batch job equals its strategy run alone on the same market data
+
+    The stub draws the payloads of a symbol from the endpoint types
+    requested together, so the data is fetched as the batch does.
+    """
+    data, universes = fetch_jobs(jobs, client)
+    checked = 0
+    for results in accounts.values():
+        for job, df in results:
+            expected = STRATEGIES[job['strategy']](data, universes[job['universe']],
+                                                   job['portfolio_value'], weighting=job['weighting'])
+            pd.testing.assert_frame_equal(df, expected)
+            checked += 1
+    return checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=100)
+    parser.add_argument('--sizes', type=int, nargs=2, default=[500, 300],
+                        help='symbols of the two universes')
+    parser.add_argument('--naive', action='store_true',
+                        help='also time the jobs run one by one')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server()
+    try:
+        with tempfile.TemporaryDirectory() as root, \
+                MarketDataClient(token='stub', base_url=base_url) as client:
+            universes = []
+            for size in args.sizes:
+                path = os.path.join(root, f'universe_{size}.csv')
+                pd.DataFrame({'Ticker': make_symbols(size)}).to_csv(path, index=False)
+                universes.append(path)
+
+            for accounts in (1, args.accounts):
+                jobs = make_jobs(accounts, universes)
+                start = time.perf_counter()
+                batch = run_batch(jobs, client)
+                seconds = time.perf_counter() - start
+                print(f'{accounts:>4} accounts, {len(jobs):>4} jobs: batch {seconds:7.3f}s')
+                if args.naive:
+                    start = time.perf_counter()
+                    run_naive(jobs, client)
+                    print(f'{"":>22}one by one {time.perf_counter() - start:7.3f}s')
+            print(f'{check(batch, jobs, client)} jobs equal to their strategy run alone')
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark: exporting strategy results to Excel, CSV and Parquet
+
+Writes a synthetic value strategy sheet of 50, 500 and 10000 rows with
+the old df.to_excel plus per-column reformat export and with every
+writer of writeroutput, and reports the time and the peak memory
+(tracemalloc) of each.
+Run from the repository root:
+    python -m benchmarks.benchexport --rows 50 500 10000
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+from strategies import OUTPUTS, RV_COLUMNS
+from stubserver import make_symbols
+from writeroutput import WRITERS, get_writer
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.random((rows, len(RV_COLUMNS) - 1)) * 100, columns=RV_COLUMNS[1:])
+    df.insert(0, 'Ticker', make_symbols(rows))
+    df['Number of Shares to Buy'] = df['Number of Shares to Buy'].astype('int64')
+    return df
+
+
+def to_excel_reformat(df: pd.DataFrame, filepath: str, sheet_name: str, column_formats: dict):
+    """The export before writeroutput: to_excel, then formats per column"""
+    writer = pd.ExcelWriter(filepath, engine='xlsxwriter')
+    df.to_excel(writer, sheet_name=sheet_name, index=False)
+    num_formats = {'dollar': '$0.00', 'integer': '0', 'float': '0', 'percent': '0.0%'}
+    for column, (header, format_type) in column_formats.items():
+        properties = {'font_color': '#ffffff', 'bg_color': '#0a0a23', 'border': 1}
+        if format_type in num_formats:
+            properties['num_format'] = num_formats[format_type]
+        template = writer.book.add_format(properties)
+        writer.sheets[sheet_name].set_column(f'{column}:{column}', 25, template)
+        writer.sheets[sheet_name].write(f'{column}1', header, template)
+    writer.close()
+
+
+def measure(export, repeat: int) -> tuple:
+    """Mean seconds and peak traced bytes of export()"""
+    tracemalloc.start()
+    export()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        export()
+    return (time.perf_counter() - start) / repeat, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[50, 500, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    output = OUTPUTS['value']
+    print(f'{"rows":>6} {"export":<18} {"time":>10} {"peak memory":>12}')
+    with tempfile.TemporaryDirectory() as root:
+        for rows in args.rows:
+            df = make_frame(rows)
+
+            def to_excel():
+                to_excel_reformat(df, os.path.join(root, 'to_excel.xlsx'),
+                                  output['sheet_name'], output['column_formats'])
+
+            exports = {'to_excel + reformat': to_excel}
+            for output_format in WRITERS:
+                path = os.path.join(root, 'out.xlsx' if output_format == 'excel' else output_format)
+
+                def export(output_format=output_format, path=path):
+                    with get_writer(output_format, path) as writer:
+                        writer.write(df, output['sheet_name'], output['column_formats'])
+                exports[output_format] = export
+
+            for name, export in exports.items():
+                seconds, peak = measure(export, args.repeat)
+                print(f'{rows:>6} {name:<18} {seconds * 1000:>8.1f}ms {peak / 2 ** 20:>9.2f}MiB')
+
+
+if __name__ == '__main__':
+    main()
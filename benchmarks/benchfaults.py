@@ -0,0 +1,139 @@
+"""Check of the market data client against a faulty IEX stub
+
+Fetches --symbols symbols from a clean stub as the reference and checks:
+    faults  with a fraction of faulty responses, poison symbols and
+            symbols with a malformed payload every other symbol is
+            fetched, a rerun fills the dropped payloads and symbols
+            and a warm run only requests the failed poison symbols again
+    resume  a fetch that crashes in an outage keeps its finished chunks
+            in the cache and the rerun only requests the rest
+    token   a bad token or a wrong URL fails the fetch at once instead
+            of bisecting
+Run from the repository root:
+    python -m benchmarks.benchfaults --symbols 2000 --fault-rate 0.2
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import requests  # The requests library for HTTP requests in Python
+
+from marketdata import MarketDataClient
+from responsecache import ResponseCache
+from stubserver import make_symbols, start_stub_server
+
+TYPES = ['quote', 'stats', 'advanced-stats']
+
+
+def fetch(base_url: str, symbols: list, cache=None, token: str = 'stub') -> tuple:
+    """Fetched data, failed symbols and seconds of a client with short backoffs"""
+    with MarketDataClient(token=token, base_url=base_url, backoff=0.01, max_retries=2,
+                          cache=cache) as client:
+        start = time.perf_counter()
+        data = client.fetch(symbols, TYPES)
+        return data, client.failed, time.perf_counter() - start
+
+
+def check_faults(server, base_url, symbols, reference, root, fault_rate, poison):
+    malformed = {symbols[5], symbols[-5]}
+    server.fault_rate, server.poison, server.malformed = fault_rate, set(poison), set(malformed)
+    with ResponseCache(os.path.join(root, 'faults.sqlite')) as cache:
+        server.requests = 0
+        data, failed, seconds = fetch(base_url, symbols, cache)
+        assert sorted(failed) == sorted(poison), failed
+        dropped = 0
+        for symbol in symbols:
+            if symbol in poison or symbol in malformed:
+                assert symbol not in data
+                continue
+            dropped += len(TYPES) - len(data.get(symbol, {}))
+            for endpoint_type, payload in data.get(symbol, {}).items():
+                assert payload == reference[symbol][endpoint_type], (symbol, endpoint_type)
+        print(f'faults  {server.requests:>4} requests {seconds:6.3f}s, poison {sorted(failed)} left out,'
+              f' {sorted(malformed)} and {dropped} more payloads malformed')
+
+        server.fault_rate = 0.0
+        server.requests = 0
+        data, failed, seconds = fetch(base_url, symbols, cache)
+        # the malformed symbols are fetched again, not cached as absent
+        assert data == {symbol: reference[symbol] for symbol in symbols if symbol not in poison}
+        print(f'rerun   {server.requests:>4} requests {seconds:6.3f}s, complete and equal to the clean fetch')
+
+        server.requests = 0
+        data, failed, seconds = fetch(base_url, symbols, cache)
+        assert sorted(failed) == sorted(poison) and server.requests <= 2 * len(poison), server.requests
+        print(f'warm    {server.requests:>4} requests {seconds:6.3f}s, only the failed poison symbols')
+    server.poison = set()
+
+
+def check_resume(server, base_url, symbols, reference, root, outage_after):
+    with ResponseCache(os.path.join(root, 'resume.sqlite')) as cache:
+        server.requests, server.outage_after = 0, outage_after
+        try:
+            fetch(base_url, symbols, cache)
+        except requests.HTTPError as error:
+            print(f'outage  {server.requests:>4} requests, fetch failed: {error.response.status_code}')
+        else:
+            raise AssertionError('the fetch should fail in the outage')
+        kept, _ = cache.get(symbols, TYPES, endpoint=base_url)
+
+        server.requests, server.outage_after = 0, None
+        data, failed, seconds = fetch(base_url, symbols, cache)
+        assert data == reference and not failed
+        chunks = -(-len(symbols) // 100)
+        assert server.requests == chunks - len(kept) // 100, server.requests
+        print(f'resume  {server.requests:>4} requests {seconds:6.3f}s, {len(kept)} symbols kept'
+              f' of {len(symbols)}, equal to the clean fetch')
+
+
+def check_token(server, base_url, symbols):
+    server.requests, server.token = 0, 'stub'
+    try:
+        fetch(base_url, symbols, token='bad')
+    except requests.HTTPError as error:
+        assert error.response.status_code == 401
+        # only the chunks the 4 workers had started before the first failed
+        assert server.requests < 2 * 4, server.requests
+        print(f'token   {server.requests:>4} requests, fetch failed: {error.response.status_code}')
+    else:
+        raise AssertionError('the fetch should fail with a bad token')
+    server.token = None
+
+    server.requests = 0
+    try:
+        fetch(base_url.replace('/stable', '/wrong'), symbols)
+    except requests.HTTPError as error:
+        assert error.response.status_code == 404
+        assert server.requests < 2 * 4, server.requests
+        print(f'url     {server.requests:>4} requests, fetch failed: {error.response.status_code}')
+    else:
+        raise AssertionError('the fetch should fail with a wrong URL')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=2000)
+    parser.add_argument('--fault-rate', type=float, default=0.2)
+    parser.add_argument('--outage-after', type=int, default=8)
+    args = parser.parse_args()
+
+    symbols = make_symbols(args.symbols)
+    poison = [symbols[len(symbols) // 3], symbols[2 * len(symbols) // 3]]
+    server, base_url = start_stub_server(latency=0.005)
+    try:
+        reference, _, seconds = fetch(base_url, symbols)
+        print(f'clean   {server.requests:>4} requests {seconds:6.3f}s')
+        with tempfile.TemporaryDirectory() as root:
+            check_faults(server, base_url, symbols, reference, root, args.fault_rate, poison)
+            check_resume(server, base_url, symbols, reference, root, args.outage_after)
+        check_token(server, base_url, symbols)
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark: serial batch loop against the concurrent market data client
+
+Both run against the local IEX stub with simulated latency, no network needed.
+Run from the repository root:
+    python -m benchmarks.benchfetch --symbols 500 --latency 0.2
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import time
+
+import requests
+
+from marketdata import MarketDataClient, chunks
+from stubserver import make_symbols, start_stub_server
+
+
+def serial_fetch(base_url: str, symbols: list, types: list) -> dict:
+    """The original loop of the strategy scripts: one new connection per chunk"""
+    data = {}
+    for group in chunks(symbols, 100):
+        symbol_string = ','.join(group)
+        batch_api_call_url = f'{base_url}/stock/market/batch/?types={",".join(types)}&symbols={symbol_string}&token=stub'
+        data.update(requests.get(batch_api_call_url).json())
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(latency=args.latency)
+    symbols = make_symbols(args.symbols)
+    types = ['quote', 'stats', 'advanced-stats']
+
+    start = time.perf_counter()
+    serial = serial_fetch(base_url, symbols, types)
+    serial_time = time.perf_counter() - start
+
+    with MarketDataClient(token='stub', base_url=base_url, max_workers=args.workers) as client:
+        start = time.perf_counter()
+        concurrent = client.fetch(symbols, types)
+        concurrent_time = time.perf_counter() - start
+
+    server.shutdown()
+    assert serial == concurrent
+
+    print(f'{args.symbols} symbols, {args.latency}s latency per request')
+    print(f'serial loop:       {serial_time:8.3f} s')
+    print(f'concurrent client: {concurrent_time:8.3f} s ({args.workers} workers)')
+    print(f'speedup:           {serial_time / concurrent_time:8.2f} x')
+
+
+if __name__ == '__main__':
+    main()
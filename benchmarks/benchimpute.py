@@ -0,0 +1,98 @@
+"""Benchmark and check of the imputation stage
+
+Fills a synthetic value frame with a fraction of missing metrics and a
+sector per symbol, with the old fillna loop over the columns and with
+imputation.impute, with and without sectors and for every method. The
+results are checked against the old loop (the mean without groups) and
+against a plain loop over the sectors, and the time of each is reported.
+Run from the repository root:
+    python -m benchmarks.benchimpute --rows 500 10000 --missing-rate 0.05
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import time
+
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+from imputation import IMPUTATION_METHODS, column_statistics, impute
+from strategies import VALUE_METRICS
+from stubserver import SECTORS, make_symbols
+
+
+def make_frame(rows: int, missing_rate: float, seed: int = 0) -> tuple:
+    """Value metrics with missing values, and the sector per row (some unknown)"""
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.lognormal(2, 1, (rows, len(VALUE_METRICS))), 2)
+    values[rng.random(values.shape) < missing_rate] = np.nan
+    df = pd.DataFrame(values, columns=list(VALUE_METRICS))
+    df.insert(0, 'Ticker', make_symbols(rows))
+    sectors = np.array(list(SECTORS), dtype=object)[rng.integers(0, len(SECTORS), rows)]
+    sectors[rng.random(rows) < 0.02] = None
+    return df, sectors
+
+
+def fillna_loop(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """The imputation before imputation.impute: fillna per column"""
+    for column in columns:
+        df[column] = df[column].fillna(df[column].mean())
+    return df
+
+
+def by_group_loop(df: pd.DataFrame, columns, method: str, sectors, min_count: int = 3):
+    """Reference: the statistic per sector in a Python loop over the sectors"""
+    values = df[list(columns)].to_numpy(dtype=np.float64)
+    fill = np.broadcast_to(column_statistics(values, method), values.shape).copy()
+    for sector in set(sectors) - {None}:
+        rows = sectors == sector
+        in_sector = values[rows]
+        statistics = column_statistics(in_sector, method)
+        enough = (~np.isnan(in_sector)).sum(axis=0) >= min_count
+        fill[rows] = np.where(enough, statistics, fill[rows])
+    return np.where(np.isnan(values), fill, values)
+
+
+def impute_copy(df: pd.DataFrame, columns, method: str = 'mean', groups=None) -> pd.DataFrame:
+    df = df.copy()
+    impute(df, columns, method, groups)
+    return df
+
+
+def timed(function, repeat: int = 5) -> tuple:
+    """Best seconds of repeat calls of function, and its last result"""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[500, 10000])
+    parser.add_argument('--missing-rate', type=float, default=0.05)
+    args = parser.parse_args()
+
+    columns = list(VALUE_METRICS)
+    for rows in args.rows:
+        df, sectors = make_frame(rows, args.missing_rate)
+        print(f'{rows} rows, {int(df[columns].isna().sum().sum())} missing values')
+
+        old_time, old = timed(lambda: fillna_loop(df.copy(), columns))
+        new_time, new = timed(lambda: impute_copy(df, columns))
+        pd.testing.assert_frame_equal(new, old)
+        print(f'  {"fillna loop":<22} {old_time * 1000:8.3f} ms')
+        print(f'  {"mean":<22} {new_time * 1000:8.3f} ms  equal to the fillna loop')
+
+        for method in IMPUTATION_METHODS:
+            seconds, result = timed(lambda: impute_copy(df, columns, method, sectors))
+            reference = by_group_loop(df, columns, method, sectors)
+            np.testing.assert_allclose(result[columns].to_numpy(), reference, rtol=1e-12)
+            print(f'  {method + " by sector":<22} {seconds * 1000:8.3f} ms  equal to the sector loop')
+
+
+if __name__ == '__main__':
+    main()
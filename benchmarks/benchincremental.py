@@ -0,0 +1,113 @@
+"""Benchmark and equivalence check of the incremental rescoring
+
+Scores a synthetic momentum universe once, then applies rounds of
+updates to a few symbols (values that move by about --move, and a
+fraction --jumps that go missing and come back or tie with another
+value) both incrementally and with the full fill_missing + score_frame
+recompute. Fails when any percentile, score or the top selection
+differs, and reports the time per round of both, up to the top 50.
+Run from the repository root:
+    python -m benchmarks.benchincremental --symbols 500 5000 --changed 5 --rounds 200
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from incrementalscoring import IncrementalScores
+from ingest import build_frame
+from scoring import score_frame
+from selection import select_top
+from strategies import HQM_COLUMNS, MOMENTUM_METRICS, fill_missing
+from stubserver import make_symbols
+
+
+def make_columns(symbols: list, rng, missing_rate: float = 0.05) -> dict:
+    """Returns rounded to 3 decimals, so there are ties"""
+    n = len(symbols)
+    columns = {'Price': np.round(rng.uniform(5, 500, n), 2)}
+    for metric in MOMENTUM_METRICS:
+        values = np.round(rng.normal(0.05, 0.2, n), 3)
+        values[rng.random(n) < missing_rate] = np.nan
+        columns[metric] = values
+    return columns
+
+
+def full_recompute(symbols: list, columns: dict) -> pd.DataFrame:
+    df = build_frame(symbols, HQM_COLUMNS, columns)
+    df = fill_missing(df, MOMENTUM_METRICS)
+    return score_frame(df, MOMENTUM_METRICS, 'HQM Score')
+
+
+def check(incremental: pd.DataFrame, full: pd.DataFrame, n: int):
+    percentile_columns = list(MOMENTUM_METRICS.values()) + ['HQM Score']
+    np.testing.assert_array_equal(incremental[percentile_columns].to_numpy(),
+                                  full[percentile_columns].to_numpy())
+    np.testing.assert_allclose(incremental[list(MOMENTUM_METRICS)].to_numpy(),
+                               full[list(MOMENTUM_METRICS)].to_numpy(), rtol=1e-12)
+    pd.testing.assert_frame_equal(select_top(incremental, 'HQM Score', n),
+                                  select_top(full, 'HQM Score', n))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, nargs='+', default=[500, 5000])
+    parser.add_argument('--changed', type=int, default=5,
+                        help='symbols updated per round')
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--move', type=float, default=0.005,
+                        help='standard deviation of the change of a value')
+    parser.add_argument('--jumps', type=float, default=0.02,
+                        help='fraction of the values that go missing, and that tie with another value')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.symbols:
+        rng = np.random.default_rng(args.seed)
+        symbols = make_symbols(size)
+        columns = make_columns(symbols, rng)
+        scores = IncrementalScores(symbols, columns, MOMENTUM_METRICS, 'HQM Score')
+        check(scores.frame(HQM_COLUMNS), full_recompute(symbols, columns), 50)
+
+        incremental_time = full_time = 0.0
+        affected = 0
+        for _ in range(args.rounds):
+            positions = rng.choice(size, args.changed, replace=False)
+            changed = [symbols[i] for i in positions]
+            updates = {}
+            for metric in MOMENTUM_METRICS:
+                values = columns[metric][positions].copy()
+                values = np.where(np.isnan(values), rng.normal(0.05, 0.2, args.changed), values)
+                values = np.round(values + rng.normal(0, args.move, args.changed), 3)
+                # some values go missing, some take an existing value (ties)
+                values[rng.random(args.changed) < args.jumps] = np.nan
+                ties = rng.random(args.changed) < args.jumps
+                values[ties] = columns[metric][rng.choice(size, ties.sum())]
+                columns[metric][positions] = values
+                updates[metric] = values
+
+            start = time.perf_counter()
+            affected += len(scores.update_many(changed, updates))
+            top = scores.top(HQM_COLUMNS, 50)
+            incremental_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            full = full_recompute(symbols, columns)
+            full_top = select_top(full, 'HQM Score', 50)
+            full_time += time.perf_counter() - start
+
+            check(scores.frame(HQM_COLUMNS), full, 50)
+            pd.testing.assert_frame_equal(top, full_top)
+
+        print(f'{size} symbols, {args.changed} changed per round, {args.rounds} rounds: equal')
+        print(f'  full recompute: {full_time / args.rounds * 1000:8.3f} ms per round')
+        print(f'  incremental:    {incremental_time / args.rounds * 1000:8.3f} ms per round'
+              f' ({affected / args.rounds:.0f} rescored symbols per round)')
+
+
+if __name__ == '__main__':
+    main()
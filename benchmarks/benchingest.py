@@ -0,0 +1,87 @@
+"""Benchmark: row by row pd.concat against columnar frame construction
+
+Builds the momentum frame from synthetic batch responses for growing
+universes. Run from the repository root:
+    python -m benchmarks.benchingest --sizes 500 1000 2500 5000 10000
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from ingest import MOMENTUM_FIELDS, build_frame, parse_columns
+from stubserver import make_payload, make_symbols
+
+HQM_COLUMNS = ['Ticker', 'Price', 'Number of Shares to Buy',
+               'One-Year Price Return', 'One-Year Return Percentile',
+               'Six-Month Price Return', 'Six-Month Return Percentile',
+               'Three-Month Price Return', 'Three-Month Return Percentile',
+               'One-Month Price Return', 'One-Month Return Percentile',
+               'HQM Score']
+
+
+def concat_frame(data: dict, symbols: list) -> pd.DataFrame:
+    """The original per-symbol loop of stocksquantmomentum.py"""
+    hqm_dataframe = pd.DataFrame(columns=HQM_COLUMNS)
+    for symbol in symbols:
+        new_data = pd.DataFrame([[symbol,
+                                  data[symbol]['quote']['latestPrice'],
+                                  'N/A',
+                                  data[symbol]['stats']['year1ChangePercent'],
+                                  'N/A',
+                                  data[symbol]['stats']['month6ChangePercent'],
+                                  'N/A',
+                                  data[symbol]['stats']['month3ChangePercent'],
+                                  'N/A',
+                                  data[symbol]['stats']['month1ChangePercent'],
+                                  'N/A',
+                                  'N/A'
+                                  ]],
+                                columns=HQM_COLUMNS)
+        hqm_dataframe = pd.concat([hqm_dataframe, new_data],
+                                  ignore_index=True,
+                                  axis=0)
+    return hqm_dataframe
+
+
+def columnar_frame(data: dict, symbols: list) -> pd.DataFrame:
+    return build_frame(symbols, HQM_COLUMNS,
+                       parse_columns(data, symbols, MOMENTUM_FIELDS))
+
+
+def timed(function, *args) -> tuple:
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[500, 1000, 2500, 5000, 10000])
+    parser.add_argument('--max-concat', type=int, default=10000,
+                        help='skip the concat loop above this universe size')
+    args = parser.parse_args()
+
+    print(f'{"tickers":>8} {"concat s":>10} {"columnar s":>11} {"speedup":>8} {"memory KiB":>11}')
+    for size in args.sizes:
+        symbols = make_symbols(size)
+        data = {symbol: make_payload(symbol, ['quote', 'stats'])
+                for symbol in symbols}
+
+        columnar_time, frame = timed(columnar_frame, data, symbols)
+        memory = frame.memory_usage(deep=True).sum() / 1024
+        if size <= args.max_concat:
+            concat_time, reference = timed(concat_frame, data, symbols)
+            assert (reference['Price'].astype(float).values == frame['Price'].values).all()
+            print(f'{size:>8} {concat_time:>10.3f} {columnar_time:>11.4f} '
+                  f'{concat_time / columnar_time:>7.0f}x {memory:>11.0f}')
+        else:
+            print(f'{size:>8} {"-":>10} {columnar_time:>11.4f} {"-":>8} {memory:>11.0f}')
+
+
+if __name__ == '__main__':
+    main()
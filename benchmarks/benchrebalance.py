@@ -0,0 +1,121 @@
+"""Benchmark and check of the rebalance stage
+
+Builds random targets and holdings of many accounts with --positions
+target positions each (part of them already held, some held tickers
+leaving the portfolio) and computes the orders with rebalance.rebalance,
+with and without a no-trade band and a turnover cap. The orders are
+checked against a plain loop over the accounts and their positions, and
+the time of both is reported.
+Run from the repository root:
+    python -m benchmarks.benchrebalance --accounts 100 2000 --positions 500
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import math
+import time
+
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+from rebalance import ORDER_COLUMNS, rebalance
+from stubserver import make_symbols
+
+
+def make_books(accounts: int, positions: int, seed: int = 0) -> tuple:
+    """Random targets and holdings, long format, and the value per account"""
+    rng = np.random.default_rng(seed)
+    tickers = np.array(make_symbols(positions * 2), dtype=object)
+    prices = pd.Series(np.round(rng.uniform(5, 500, len(tickers)), 2), index=tickers)
+    names = np.array([f'ACC-{account:05d}' for account in range(accounts)], dtype=object)
+    values = pd.Series(np.round(rng.uniform(1e4, 5e6, accounts), 2), index=names)
+
+    picked = np.argsort(rng.random((accounts, len(tickers))), axis=1)[:, :positions]
+    target_tickers = tickers[picked].ravel()
+    target_shares = np.floor(values.to_numpy()[:, None] / positions
+                             / prices.to_numpy()[picked]).astype(np.int64).ravel()
+    targets = pd.DataFrame({'Account': np.repeat(names, positions),
+                            'Ticker': target_tickers,
+                            'Price': prices[target_tickers].to_numpy(),
+                            'Target Shares': target_shares})
+
+    # most targets held with some drift, a few held tickers not in the targets
+    held = rng.random(len(targets)) < 0.8
+    drift = rng.normal(1, 0.1, len(targets))
+    holdings = pd.DataFrame({'Account': targets['Account'][held],
+                             'Ticker': targets['Ticker'][held],
+                             'Shares': np.round(target_shares * drift)[held].astype(np.int64)})
+    leaving = pd.DataFrame({'Account': names,
+                            'Ticker': tickers[rng.integers(0, len(tickers), accounts)],
+                            'Shares': rng.integers(1, 100, accounts)})
+    holdings = pd.concat([holdings, leaving], ignore_index=True)
+    return targets, holdings, values, prices
+
+
+def rebalance_loop(targets, holdings, values, prices, band: float = 0.0,
+                   turnover_cap: float = None) -> pd.DataFrame:
+    """Reference: the orders account by account and position by position"""
+    books = {}
+    for account, ticker, shares in zip(targets['Account'], targets['Ticker'], targets['Target Shares']):
+        books.setdefault(account, {}).setdefault(ticker, [0, 0])[1] += shares
+    for account, ticker, shares in zip(holdings['Account'], holdings['Ticker'], holdings['Shares']):
+        if account in books:
+            books[account].setdefault(ticker, [0, 0])[0] += shares
+
+    rows = []
+    for account in sorted(books):
+        value = values[account]
+        orders = {}
+        for ticker, (current, target) in books[account].items():
+            order = target - current
+            if band > 0 and target != 0 and abs(order * prices[ticker]) < band * value:
+                order = 0
+            orders[ticker] = order
+        traded = sum(abs(order * prices[ticker]) for ticker, order in orders.items())
+        if turnover_cap is not None and traded > turnover_cap * value:
+            scale = turnover_cap * value / traded
+            orders = {ticker: math.trunc(order * scale) for ticker, order in orders.items()}
+        account_rows = []
+        for ticker in sorted(orders):
+            order = orders[ticker]
+            if order != 0:
+                current, target = books[account][ticker]
+                account_rows.append([account, ticker, prices[ticker], current, target, order,
+                                     'buy' if order > 0 else 'sell', order * prices[ticker]])
+        rows += [row for row in account_rows if row[6] == 'sell']
+        rows += [row for row in account_rows if row[6] == 'buy']
+    return pd.DataFrame(rows, columns=ORDER_COLUMNS)
+
+
+def timed(function) -> tuple:
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--accounts', type=int, nargs='+', default=[100, 2000])
+    parser.add_argument('--positions', type=int, default=500)
+    parser.add_argument('--band', type=float, default=0.002)
+    parser.add_argument('--turnover-cap', type=float, default=0.05)
+    args = parser.parse_args()
+
+    settings = {'plain': {}, f'band {args.band}': {'band': args.band},
+                f'band and cap {args.turnover_cap}': {'band': args.band,
+                                                      'turnover_cap': args.turnover_cap}}
+    for accounts in args.accounts:
+        targets, holdings, values, prices = make_books(accounts, args.positions)
+        print(f'{accounts} accounts x {args.positions} positions, {len(holdings)} holdings')
+        for name, options in settings.items():
+            seconds, orders = timed(lambda: rebalance(targets, holdings, values, prices, **options))
+            loop_seconds, expected = timed(
+                lambda: rebalance_loop(targets, holdings, values, prices, **options))
+            pd.testing.assert_frame_equal(orders, expected, check_dtype=False)
+            print(f'  {name:<20} {len(orders):>8} orders  rebalance {seconds:7.3f}s'
+                  f'  loop {loop_seconds:7.3f}s  equal')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Memory report of the typed strategy frames
+
+Builds the scored momentum and value frames of the whole universe (before
+the selection) from stub data in three representations:
+    original  object columns with 'N/A' markers, as the frames started
+    untyped   float64 columns, object tickers and NaN share counts
+    schema    the schema.py dtypes: category, float32/float64, Int32
+and reports the memory per frame and the time of a sort on the score and
+of filling the missing metrics. The values of all three are checked to be
+the same.
+Run from the repository root:
+    python -m benchmarks.benchschema --sizes 500 10000
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import time
+
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+from ingest import build_frame
+from schema import PERCENTILE, SHARES, check_frame, memory_report
+from scoring import score_frame
+from strategies import (ENDPOINT_TYPES, HQM_COLUMNS, METRIC_COLUMNS, MOMENTUM_METRICS, RV_COLUMNS,
+                        VALUE_METRICS, fill_missing)
+from stubserver import make_batch, make_symbols
+
+FRAMES = {
+    'momentum': (HQM_COLUMNS, MOMENTUM_METRICS, 'HQM Score'),
+    'value': (RV_COLUMNS, VALUE_METRICS, 'RV Score'),
+}
+
+
+def representations(strategy: str, symbols: list, missing_rate: float) -> dict:
+    """The scored frame of strategy as original, untyped and schema frame"""
+    columns, metrics, score_column = FRAMES[strategy]
+    data = make_batch(symbols, ENDPOINT_TYPES[strategy], missing_rate)
+    typed = build_frame(symbols, columns, METRIC_COLUMNS[strategy](data, symbols))
+    typed = score_frame(fill_missing(typed, metrics), metrics, score_column)
+    assert not check_frame(typed), check_frame(typed)
+
+    untyped = typed.astype({column: np.float64 for column in typed.columns
+                            if typed[column].dtype in (PERCENTILE, SHARES)})
+    untyped['Ticker'] = np.asarray(symbols, dtype=object)
+    original = untyped.astype(object)
+    original[columns[2]] = 'N/A'
+    return {'original': original, 'untyped': untyped, 'schema': typed}
+
+
+def timed(function, repeat: int = 5) -> float:
+    """Best milliseconds of repeat calls"""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def fill_metrics(df: pd.DataFrame, metrics: dict):
+    for column in metrics:
+        df[column].fillna(df[column].mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 10000])
+    parser.add_argument('--missing-rate', type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f'{"tickers":>8} {"frame":<9} {"representation":<15} {"KiB":>9} {"of original":>12}'
+          f' {"sort ms":>8} {"fill ms":>8}')
+    for size in args.sizes:
+        symbols = make_symbols(size)
+        for strategy, (columns, metrics, score_column) in FRAMES.items():
+            frames = representations(strategy, symbols, args.missing_rate)
+            original_bytes = memory_report(frames['original'])['total']
+            for name, df in frames.items():
+                values = df[score_column].astype(np.float64).to_numpy()
+                np.testing.assert_array_equal(values, frames['schema'][score_column].to_numpy())
+                assert (df['Ticker'].astype(str).to_numpy() == np.asarray(symbols)).all()
+                total = memory_report(df)['total']
+                sort_ms = timed(lambda: df.sort_values(score_column))
+                fill_ms = timed(lambda: fill_metrics(df, metrics))
+                print(f'{size:>8} {strategy:<9} {name:<15} {total / 1024:>9.1f}'
+                      f' {total / original_bytes:>11.0%} {sort_ms:>8.3f} {fill_ms:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark and equivalence check of the vectorized scoring engine
+
+Compares scoring.score_frame with the original percentileofscore double
+loop of the strategy scripts on the value metrics of synthetic data, and
+fails when the percentiles or scores differ.
+Run from the repository root:
+    python -m benchmarks.benchscoring --sizes 500 2000 10000
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import time
+from statistics import mean
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from scoring import score_frame
+
+METRICS = {
+    'Price-to-Earnings Ratio': 'PE Percentile',
+    'Price-to-Book Ratio': 'PB Percentile',
+    'Price-to-Sales Ratio': 'PS Percentile',
+    'EV/EBITDA': 'EV/EBITDA Percentile',
+    'EV/GP': 'EV/GP Percentile'
+}
+
+
+def make_frame(size: int, seed: int = 0) -> pd.DataFrame:
+    """Metric columns rounded to 1 decimal, so there are plenty of ties"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'Ticker': [f'T{i}' for i in range(size)]})
+    for metric, percentile in METRICS.items():
+        df[metric] = np.round(rng.lognormal(2, 1, size), 1)
+        df[percentile] = np.nan
+    df['RV Score'] = np.nan
+    return df
+
+
+def loop_score(rv_dataframe: pd.DataFrame) -> pd.DataFrame:
+    """The original loops of stocksquantvalue.py"""
+    for row in rv_dataframe.index:
+        for metric in METRICS.keys():
+            rv_dataframe.loc[row, METRICS[metric]] = stats.percentileofscore(
+                rv_dataframe[metric],
+                rv_dataframe.loc[row, metric]
+            )/100
+
+    for row in rv_dataframe.index:
+        value_percentiles = []
+        for metric in METRICS.keys():
+            value_percentiles.append(rv_dataframe.loc[row, METRICS[metric]])
+        rv_dataframe.loc[row, 'RV Score'] = mean(value_percentiles)
+    return rv_dataframe
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 10000])
+    parser.add_argument('--max-loop', type=int, default=2000,
+                        help='skip the original loop above this universe size')
+    args = parser.parse_args()
+
+    print(f'{"tickers":>8} {"loop s":>10} {"vectorized s":>13} {"speedup":>8}')
+    for size in args.sizes:
+        start = time.perf_counter()
+        vectorized = score_frame(make_frame(size), METRICS, 'RV Score')
+        vectorized_time = time.perf_counter() - start
+
+        if size > args.max_loop:
+            print(f'{size:>8} {"-":>10} {vectorized_time:>13.4f} {"-":>8}')
+            continue
+
+        start = time.perf_counter()
+        reference = loop_score(make_frame(size))
+        loop_time = time.perf_counter() - start
+
+        columns = list(METRICS.values()) + ['RV Score']
+        np.testing.assert_allclose(vectorized[columns].to_numpy(dtype=float),
+                                   reference[columns].to_numpy(dtype=float))
+        print(f'{size:>8} {loop_time:>10.3f} {vectorized_time:>13.4f} '
+              f'{loop_time / vectorized_time:>7.0f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark: loading a stored columnar snapshot against parsing JSON
+
+Stores a synthetic snapshot of --symbols tickers with --fields numeric
+fields, then times a memory-mapped load of the value strategy columns
+and reports the size on disk per day and per year of daily snapshots.
+Also checks the value strategy gives the same picks on both.
+Run from the repository root:
+    python -m benchmarks.benchsnapshot --symbols 500 --fields 50
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from ingest import VALUE_FIELDS, parse_columns
+from snapshotstore import SnapshotStore
+from strategies import quant_value
+from stubserver import make_payload, make_symbols
+
+
+def make_data(symbols: list, fields: int) -> dict:
+    data = {}
+    for symbol in symbols:
+        payload = make_payload(symbol, ['quote', 'stats', 'advanced-stats'])
+        extra = fields - sum(len(values) for values in payload.values())
+        for i in range(max(0, extra)):
+            payload['advanced-stats'][f'field{i}'] = hash((symbol, i)) % 10000 / 100
+        data[symbol] = payload
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--fields', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    symbols = make_symbols(args.symbols)
+    data = make_data(symbols, args.fields)
+    text = json.dumps(data)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = SnapshotStore(root)
+        path = store.save(data, symbols, day='2026-10-17')
+        size = sum(os.path.getsize(os.path.join(path, file)) for file in os.listdir(path))
+        stored_fields = len(store.columns('2026-10-17'))
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            parse_columns(json.loads(text), symbols, VALUE_FIELDS)
+        json_time = (time.perf_counter() - start) / args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            snapshot = store.load_fields(VALUE_FIELDS, day='2026-10-17')
+            parse_columns(snapshot, symbols, VALUE_FIELDS)
+        load_time = (time.perf_counter() - start) / args.repeat
+
+        live = quant_value(data, symbols, 1e6)
+        stored = quant_value(store.load(), symbols, 1e6)
+        assert live.equals(stored)
+
+    print(f'{args.symbols} symbols x {stored_fields} fields')
+    print(f'parse JSON:         {json_time * 1000:8.2f} ms')
+    print(f'load snapshot mmap: {load_time * 1000:8.2f} ms')
+    print(f'size per day:       {size / 1024:8.0f} KiB')
+    print(f'size per year:      {size * 252 / 1024 ** 2:8.1f} MiB (252 trading days)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Benchmark suite: every pipeline stage of the three strategies
+
+Runs offline against the local IEX stub with synthetic quote, stats and
+advanced-stats payloads, for each universe size and with a fraction of
+the fields missing. Per strategy the stages fetch (from the stub), ingest,
+impute, score, select, size and export are timed with the profiling
+stage timers; the best of --repeat runs is reported, as timeit does.
+
+With --save-baseline the timings are stored as the baseline. Otherwise
+they are compared with the stored baseline and the suite exits with 1
+when a stage got slower than the baseline times (1 + tolerance).
+Stages faster than --min-time are not compared, these are mostly noise.
+Baselines depend on the machine, so save one before comparing.
+Run from the repository root:
+    python -m benchmarks.benchsuite --sizes 500 2000 --save-baseline
+    python -m benchmarks.benchsuite --sizes 500 2000
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import profiling
+from marketdata import MarketDataClient
+from strategies import ENDPOINT_TYPES, OUTPUTS, STRATEGIES
+from stubserver import make_symbols, start_stub_server
+from writeroutput import WRITERS, get_writer
+
+BASELINE_PATH = os.path.join('benchmarks', 'baselines.json')
+STAGES = ['fetch', 'ingest', 'impute', 'score', 'select', 'size', 'export']
+
+
+def run_once(client, symbols: list, strategy: str, output_format: str, root: str) -> dict:
+    """Seconds per stage of one profiled strategy run"""
+    profiler = profiling.start(strategy)
+    with profiling.stage('fetch', rows=len(symbols)):
+        data = client.fetch(symbols, ENDPOINT_TYPES[strategy])
+    df = STRATEGIES[strategy](data, symbols, 1000000)
+    output = OUTPUTS[strategy]
+    path = os.path.join(root, 'out.xlsx' if output_format == 'excel' else output_format)
+    with profiling.stage('export', rows=len(df)):
+        with get_writer(output_format, path) as writer:
+            writer.write(df, output['sheet_name'], output['column_formats'])
+    profiling.stop()
+    return {name: record['wall_time'] for name, record in profiler.stages.items()}
+
+
+def run_suite(sizes: list, missing_rate: float, repeat: int, output_format: str) -> dict:
+    """Best seconds per '<strategy>/<size>/<stage>'"""
+    server, base_url = start_stub_server(missing_rate=missing_rate)
+    timings = {}
+    try:
+        with MarketDataClient(token='stub', base_url=base_url) as client, \
+                tempfile.TemporaryDirectory() as root:
+            for size in sizes:
+                symbols = make_symbols(size)
+                for strategy in STRATEGIES:
+                    runs = [run_once(client, symbols, strategy, output_format, root)
+                            for _ in range(repeat)]
+                    for stage in STAGES:
+                        if stage in runs[0]:
+                            timings[f'{strategy}/{size}/{stage}'] = min(run[stage] for run in runs)
+    finally:
+        server.shutdown()
+    return timings
+
+
+def compare(timings: dict, baseline: dict, tolerance: float, min_time: float) -> list:
+    """The keys that got slower than the baseline allows"""
+    regressions = []
+    for key, seconds in timings.items():
+        base = baseline.get(key)
+        if base is None or max(seconds, base) < min_time:
+            continue
+        if seconds > base * (1 + tolerance):
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000])
+    parser.add_argument('--missing-rate', type=float, default=0.05)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output-format', choices=list(WRITERS), default='excel')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='allowed slowdown as a fraction of the baseline')
+    parser.add_argument('--min-time', type=float, default=0.005,
+                        help='seconds under which a stage is not compared')
+    args = parser.parse_args()
+
+    timings = run_suite(args.sizes, args.missing_rate, args.repeat, args.output_format)
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)['timings']
+    regressions = compare(timings, baseline, args.tolerance, args.min_time)
+
+    print(f'{"strategy/size/stage":<28} {"time":>10} {"baseline":>10}')
+    for key, seconds in timings.items():
+        base = baseline.get(key)
+        base_text = '' if base is None else f'{base * 1000:8.1f}ms'
+        flag = '  REGRESSION' if key in regressions else ''
+        print(f'{key:<28} {seconds * 1000:8.1f}ms {base_text:>10}{flag}')
+
+    if args.save_baseline:
+        if os.path.dirname(args.baseline):
+            os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as file:
+            json.dump({'missing_rate': args.missing_rate,
+                       'output_format': args.output_format,
+                       'timings': timings}, file, indent=2)
+        print(f'Baseline written to {args.baseline}')
+    elif not baseline:
+        print(f'No baseline at {args.baseline}, run with --save-baseline first')
+    elif regressions:
+        print(f'{len(regressions)} stage(s) slower than the baseline allows')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
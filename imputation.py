@@ -0,0 +1,91 @@
+"""Vectorized imputation of missing metric values
+
+The metric columns of a strategy frame are filled in one pass over the
+column block: the missing mask, the statistic of every column and the
+fill are computed for all columns at once. The statistic is one of
+
+    mean        the mean of the valid values (the tutorial's fillna)
+    median      the median of the valid values
+    winsorized  the mean after clipping the values to the limits and
+                1 - limits quantiles, so outliers don't drag it along
+
+With groups (e.g. the sector of every symbol) a missing value is filled
+with the statistic of its group, computed for all groups in a single
+groupby transform. Groups with fewer than min_count valid values, and
+symbols without a group, get the statistic of the whole universe.
+
+17-10-2026
+Arno Kemner
+"""
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+from profiling import add
+
+IMPUTATION_METHODS = ['mean', 'median', 'winsorized']
+
+
+def column_statistics(values: np.ndarray, method: str = 'mean', limits: float = 0.05) -> np.ndarray:
+    """Statistic of the valid values of every column of values, NaN without any"""
+    statistics = np.full(values.shape[1], np.nan)
+    for i in range(values.shape[1]):
+        column = values[:, i]
+        valid = column[~np.isnan(column)]
+        if not len(valid):
+            continue
+        if method == 'mean':
+            # summed like pandas does, equal to df[column].mean()
+            statistics[i] = np.nansum(column) / len(valid)
+        elif method == 'median':
+            statistics[i] = np.median(valid)
+        else:
+            low, high = np.quantile(valid, [limits, 1 - limits])
+            statistics[i] = np.clip(valid, low, high).mean()
+    return statistics
+
+
+def group_statistics(values: np.ndarray, groups, method: str = 'mean', limits: float = 0.05,
+                     min_count: int = 3) -> np.ndarray:
+    """Statistic of the group of every value, NaN for small groups and no group"""
+    codes, _ = pd.factorize(pd.Series(groups, dtype=object))
+    # symbols without a group (code -1) are left out of the groupby
+    keys = np.where(codes >= 0, codes, np.nan)
+    frame = pd.DataFrame(values)
+    if method == 'winsorized':
+        grouped = frame.groupby(keys)
+        frame = frame.clip(grouped.transform('quantile', limits),
+                           grouped.transform('quantile', 1 - limits))
+        method = 'mean'
+    grouped = frame.groupby(keys)
+    statistics = grouped.transform(method).to_numpy(dtype=np.float64)
+    counts = grouped.transform('count').to_numpy(dtype=np.float64)
+    return np.where(counts >= min_count, statistics, np.nan)
+
+
+def impute(df: pd.DataFrame, columns, method: str = 'mean', groups=None,
+           limits: float = 0.05, min_count: int = 3) -> dict:
+    """Fill the missing values of columns in df, returns the number filled per column
+
+    groups optionally gives the group label of every row (None for no
+    group). The counts are also added to the profiler as 'imputed <column>'.
+    """
+    if method not in IMPUTATION_METHODS:
+        raise ValueError(f'method must be one of {IMPUTATION_METHODS}, not {method!r}')
+    columns = list(columns)
+    values = df[columns].to_numpy(dtype=np.float64)
+    missing = np.isnan(values)
+    if missing.any():
+        fill = np.broadcast_to(column_statistics(values, method, limits), values.shape)
+        if groups is not None:
+            by_group = group_statistics(values, groups, method, limits, min_count)
+            fill = np.where(np.isnan(by_group), fill, by_group)
+        values = np.where(missing, fill, values)
+        for i, column in enumerate(columns):
+            df[column] = values[:, i]
+
+    # a column without any valid value stays missing
+    filled = (missing & ~np.isnan(values)).sum(axis=0)
+    counts = {column: int(count) for column, count in zip(columns, filled)}
+    for column, count in counts.items():
+        add(f'imputed {column}', count)
+    return counts
@@ -0,0 +1,260 @@
+"""Incremental percentile ranks and composite scores
+
+When only a few symbols change between two refreshes, re-ranking the
+whole universe is wasted work. MetricRanks keeps the valid values of one
+metric sorted, with the position of every value next to it, so a new
+value is placed with a binary search (np.searchsorted) and the values in
+between shift by one slot. Only the percentiles of the values between
+the old and the new value change, the update returns these positions
+and their percentiles are looked up in the sorted values again.
+
+The percentiles equal scoring.percentile_ranks of the column after
+strategies.fill_missing: NaN values count as the mean of the valid
+values. That mean is kept up to date by PairwiseSum, which mirrors the
+pairwise summation of numpy so it stays bit for bit the mean pandas
+takes. An update costs two binary searches, the shift of the sorted
+values between the old and the new slot (a memmove, the whole arrays
+when a value goes missing or comes back) and O(log n) for the mean.
+IncrementalScores combines one MetricRanks per metric into the
+percentile columns and composite score of scoring.score_frame, and only
+recomputes the rows an update affected.
+benchmarks/benchincremental.py checks the results against a full
+rescore.
+
+17-10-2026
+Arno Kemner
+"""
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+from ingest import build_frame
+from scoring import composite_score
+from selection import top_n_positions
+
+
+class PairwiseSum:
+    """np.sum of an array, updated per value in O(log n)
+
+    numpy sums blocks of at most 128 values and adds up the halves of
+    longer arrays, split at a multiple of 8. The partial sum of every
+    block and half is kept, an update resums its block and the halves
+    above it, so the total is bit for bit np.sum of the current values.
+    """
+    BLOCK = 128
+
+    def __init__(self, values):
+        self.values = np.array(values, dtype=np.float64)
+        self.nodes = []  # (start, end, left node, right node), blocks without children
+        self.sums = []
+        self.root = self._build(0, len(self.values))
+
+    def _build(self, start: int, end: int) -> int:
+        if end - start <= self.BLOCK:
+            left = right = None
+            total = self._block_sum(start, end)
+        else:
+            half = (end - start) // 2
+            half -= half % 8
+            left = self._build(start, start + half)
+            right = self._build(start + half, end)
+            total = self.sums[left] + self.sums[right]
+        self.nodes.append((start, end, left, right))
+        self.sums.append(total)
+        return len(self.nodes) - 1
+
+    def _block_sum(self, start: int, end: int) -> float:
+        return float(np.add.reduce(self.values[start:end], initial=0.0))
+
+    @property
+    def total(self) -> float:
+        return self.sums[self.root]
+
+    def set(self, position: int, value: float):
+        self.values[position] = value
+        path = [self.root]
+        while self.nodes[path[-1]][2] is not None:
+            _, _, left, right = self.nodes[path[-1]]
+            path.append(left if position < self.nodes[left][1] else right)
+        start, end, _, _ = self.nodes[path[-1]]
+        self.sums[path[-1]] = self._block_sum(start, end)
+        for node in reversed(path[:-1]):
+            _, _, left, right = self.nodes[node]
+            self.sums[node] = self.sums[left] + self.sums[right]
+
+
+class MetricRanks:
+    """Sorted values of one metric with NaN imputed by the mean"""
+
+    def __init__(self, values):
+        self.values = np.array(values, dtype=np.float64)
+        self.n = len(self.values)
+        valid = ~np.isnan(self.values)
+        order = np.flatnonzero(valid)[np.argsort(self.values[valid], kind='stable')]
+        self.sorted_values = self.values[order]
+        self.sorted_positions = order
+        self.missing = np.flatnonzero(~valid)
+        # NaN counts as 0, as in np.nansum
+        self.sum = PairwiseSum(np.where(valid, self.values, 0.0))
+        self.fill_value = self._mean()
+
+    def _mean(self) -> float:
+        """The mean of the valid values, used for the missing ones
+
+        Summed like pandas does, so it is bit for bit the fill value of
+        strategies.fill_missing (a valid value can tie with it).
+        """
+        if not len(self.sorted_values):
+            return np.nan
+        return float(self.sum.total / len(self.sorted_values))
+
+    def filled(self, positions=None) -> np.ndarray:
+        """The values at positions (default all) with the missing ones filled in"""
+        values = self.values if positions is None else self.values[positions]
+        return np.where(np.isnan(values), self.fill_value, values)
+
+    def percentiles(self, positions=None) -> np.ndarray:
+        """Percentile ranks of the positions (default all), NaN without valid values"""
+        values = self.filled(positions)
+        if not len(self.sorted_values):
+            return np.full(len(values), np.nan)
+        below = np.searchsorted(self.sorted_values, values, side='left')
+        up_to = np.searchsorted(self.sorted_values, values, side='right')
+        if len(self.missing):
+            below += len(self.missing) * (self.fill_value < values)
+            up_to += len(self.missing) * (self.fill_value <= values)
+        # the mean of the first and last position of the value, as scoring.percentile_ranks
+        return (below + 1 + up_to) / 2 / self.n
+
+    def between(self, low: float, high: float) -> np.ndarray:
+        """Positions of the valid values in [low, high]"""
+        start = np.searchsorted(self.sorted_values, low, side='left')
+        end = np.searchsorted(self.sorted_values, high, side='right')
+        return self.sorted_positions[start:end]
+
+    def _index(self, value: float, position: int) -> int:
+        """Index of the value of position in the sorted values"""
+        start = np.searchsorted(self.sorted_values, value, side='left')
+        end = np.searchsorted(self.sorted_values, value, side='right')
+        return start + int(np.flatnonzero(self.sorted_positions[start:end] == position)[0])
+
+    def _move(self, old: float, value: float, position: int):
+        """Move the value of position from old to value in the sorted arrays"""
+        i = self._index(old, position)
+        j = int(np.searchsorted(self.sorted_values, value, side='left'))
+        # shift the values in between one slot towards the old place
+        if j > i:
+            j -= 1
+            self.sorted_values[i:j] = self.sorted_values[i + 1:j + 1]
+            self.sorted_positions[i:j] = self.sorted_positions[i + 1:j + 1]
+        else:
+            self.sorted_values[j + 1:i + 1] = self.sorted_values[j:i]
+            self.sorted_positions[j + 1:i + 1] = self.sorted_positions[j:i]
+        self.sorted_values[j] = value
+        self.sorted_positions[j] = position
+
+    def update(self, position: int, value: float) -> np.ndarray:
+        """Set the value at position, returns the positions whose percentile may change"""
+        old = self.values[position]
+        if old == value or (np.isnan(old) and np.isnan(value)):
+            return np.empty(0, dtype=np.intp)
+        old_fill_value = self.fill_value
+        had_values = len(self.sorted_values) > 0
+
+        if np.isnan(old):
+            i = np.searchsorted(self.sorted_values, value, side='left')
+            self.sorted_values = np.insert(self.sorted_values, i, value)
+            self.sorted_positions = np.insert(self.sorted_positions, i, position)
+        elif np.isnan(value):
+            i = self._index(old, position)
+            self.sorted_values = np.delete(self.sorted_values, i)
+            self.sorted_positions = np.delete(self.sorted_positions, i)
+        else:
+            self._move(old, value, position)
+        self.values[position] = value
+        self.sum.set(position, 0.0 if np.isnan(value) else value)
+        if np.isnan(old):
+            self.missing = np.delete(self.missing, np.searchsorted(self.missing, position))
+        elif np.isnan(value):
+            self.missing = np.insert(self.missing, np.searchsorted(self.missing, position), position)
+        # the fill value only matters while values are missing
+        if len(self.missing):
+            self.fill_value = self._mean()
+        if not had_values or not len(self.sorted_values):
+            # no valid values before or after, every rank changes
+            return np.arange(self.n)
+
+        # the filled values that moved, from and to; only the counts of
+        # the values between the two ends of a move change
+        moves = [(old_fill_value if np.isnan(old) else old,
+                  self.fill_value if np.isnan(value) else value)]
+        if len(self.missing):
+            moves.append((old_fill_value, self.fill_value))
+        rows = [self.between(min(move), max(move)) for move in moves]
+        return np.concatenate(rows + [self.missing, [position]]).astype(np.intp)
+
+
+class IncrementalScores:
+    """Percentile columns and composite score of a universe, updated per symbol"""
+
+    def __init__(self, symbols: list, columns: dict, metrics: dict, score_column: str,
+                 weights: dict = None):
+        self.symbols = list(symbols)
+        self.positions = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.metrics = metrics
+        self.score_column = score_column
+        self.weights = None if weights is None else [weights.get(metric, 0.0) for metric in metrics]
+        self.tickers = np.asarray(self.symbols, dtype=object)
+        self.columns = {name: np.array(values, dtype=np.float64) for name, values in columns.items()}
+        self.ranks = {metric: MetricRanks(self.columns[metric]) for metric in metrics}
+
+        self.percentiles = np.column_stack(
+            [self.ranks[metric].percentiles() for metric in metrics]
+        ) if metrics else np.empty((len(self.symbols), 0))
+        self.scores = composite_score(self.percentiles, self.weights)
+
+    def update(self, symbol: str, values: dict) -> np.ndarray:
+        """Set the column values of symbol, returns the positions with a new score"""
+        return self.update_many([symbol], {name: [value] for name, value in values.items()})
+
+    def update_many(self, symbols: list, columns: dict) -> np.ndarray:
+        """Set the columns of symbols (one value per symbol), returns the positions with a new score"""
+        positions = np.array([self.positions[symbol] for symbol in symbols], dtype=np.intp)
+        affected = np.zeros(len(self.symbols), dtype=bool)
+        for i, metric in enumerate(self.metrics):
+            if metric not in columns:
+                continue
+            ranks = self.ranks[metric]
+            values = np.asarray(columns[metric], dtype=np.float64).tolist()
+            # a mask instead of np.unique, the row sets overlap a lot
+            changed = np.zeros(len(self.symbols), dtype=bool)
+            for position, value in zip(positions.tolist(), values):
+                changed[ranks.update(position, value)] = True
+            rows = np.flatnonzero(changed)
+            if len(rows):
+                # after all updates, so every row is looked up once
+                self.percentiles[rows, i] = ranks.percentiles(rows)
+                affected |= changed
+        for name, values in columns.items():
+            self.columns[name][positions] = values
+
+        rows = np.flatnonzero(affected)
+        if len(rows):
+            self.scores[rows] = composite_score(self.percentiles[rows], self.weights)
+        return rows
+
+    def frame(self, frame_columns: list, positions=None) -> pd.DataFrame:
+        """The scored frame of the positions (default all), like strategies
+        after fill_missing and score_frame"""
+        if positions is None:
+            positions = np.arange(len(self.symbols))
+        arrays = {name: values[positions] for name, values in self.columns.items()}
+        for i, (metric, percentile_column) in enumerate(self.metrics.items()):
+            arrays[metric] = self.ranks[metric].filled(positions)
+            arrays[percentile_column] = self.percentiles[positions, i]
+        arrays[self.score_column] = self.scores[positions]
+        return build_frame(self.tickers[positions], frame_columns, arrays)
+
+    def top(self, frame_columns: list, n: int, ascending: bool = False) -> pd.DataFrame:
+        """The n best rows of frame, as selection.select_top of it"""
+        positions = top_n_positions(self.scores, self.tickers, n, ascending)
+        return self.frame(frame_columns, positions)
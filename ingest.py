@@ -0,0 +1,131 @@
+"""Ingestion of IEX batch responses into typed column arrays
+
+Instead of growing a DataFrame row by row with pd.concat, every field is
+parsed straight into a float64 array (NaN for missing or non numeric
+values) and the strategy frame is built once from those columns.
+
+A field spec maps a column name to the endpoint type and key in the
+batch response:
+    {'Price': ('quote', 'latestPrice'), ...}
+
+17-10-2026
+Arno Kemner
+"""
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+from schema import missing_column, typed_column
+
+EQUAL_WEIGHT_FIELDS = {
+    'Price': ('quote', 'latestPrice'),
+    'Market Capitalization': ('quote', 'marketCap'),
+}
+
+MOMENTUM_FIELDS = {
+    'Price': ('quote', 'latestPrice'),
+    'One-Year Price Return': ('stats', 'year1ChangePercent'),
+    'Six-Month Price Return': ('stats', 'month6ChangePercent'),
+    'Three-Month Price Return': ('stats', 'month3ChangePercent'),
+    'One-Month Price Return': ('stats', 'month1ChangePercent'),
+}
+
+VALUE_FIELDS = {
+    'Price': ('quote', 'latestPrice'),
+    'Price-to-Earnings Ratio': ('quote', 'peRatio'),
+    'Price-to-Book Ratio': ('advanced-stats', 'priceToBook'),
+    'Price-to-Sales Ratio': ('advanced-stats', 'priceToSales'),
+    'Enterprise Value': ('advanced-stats', 'enterpriseValue'),
+    'EBITDA': ('advanced-stats', 'EBITDA'),
+    'Gross Profit': ('advanced-stats', 'grossProfit'),
+}
+
+# ratios computed from the parsed fields: column: (numerator, denominator)
+VALUE_RATIOS = {
+    'EV/EBITDA': ('Enterprise Value', 'EBITDA'),
+    'EV/GP': ('Enterprise Value', 'Gross Profit'),
+}
+
+# text fields the missing values can be imputed by
+GROUP_FIELDS = {
+    'sector': ('company', 'sector'),
+    'industry': ('company', 'industry'),
+}
+
+
+def to_float(value) -> float:
+    """Numeric value of a JSON field, NaN when missing or not a number"""
+    if value is None or isinstance(value, bool):
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def parse_columns(data: dict, symbols: list, fields: dict) -> dict:
+    """Parse the batch response into one float64 array per field
+
+    Symbols or types missing from the response give NaN values.
+    A stored snapshotstore.Snapshot is already columnar and only projected.
+    """
+    if hasattr(data, 'take'):
+        return data.take(symbols, fields)
+
+    empty = {}
+    payloads = [data.get(symbol) or empty for symbol in symbols]
+    columns = {}
+    for column, (endpoint_type, key) in fields.items():
+        columns[column] = np.fromiter(
+            (to_float((payload.get(endpoint_type) or empty).get(key))
+             for payload in payloads),
+            dtype=np.float64,
+            count=len(payloads))
+    return columns
+
+
+def parse_labels(data: dict, symbols: list, field: tuple) -> np.ndarray:
+    """Parse a text field (endpoint type, key) into an object array, None when missing"""
+    if hasattr(data, 'take_labels'):
+        return data.take_labels(symbols, field)
+
+    endpoint_type, key = field
+    empty = {}
+    labels = np.empty(len(symbols), dtype=object)
+    for i, symbol in enumerate(symbols):
+        label = ((data.get(symbol) or empty).get(endpoint_type) or empty).get(key)
+        labels[i] = label if isinstance(label, str) and label else None
+    return labels
+
+
+def safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element wise division, NaN where either side is missing or zero"""
+    result = np.full(len(numerator), np.nan)
+    mask = np.isfinite(numerator) & np.isfinite(denominator) & (denominator != 0)
+    np.divide(numerator, denominator, out=result, where=mask)
+    return result
+
+
+def add_ratios(columns: dict, ratios: dict) -> dict:
+    """Add the ratio columns {column: (numerator, denominator)} for all symbols at once"""
+    for column, (numerator, denominator) in ratios.items():
+        columns[column] = safe_divide(columns[numerator], columns[denominator])
+    return columns
+
+
+def build_frame(symbols: list, columns: list, arrays: dict) -> pd.DataFrame:
+    """Build the strategy frame in one go
+
+    columns gives the order of the frame, the 'Ticker' column is filled
+    with symbols and every column without an array is missing. Every
+    column gets its schema dtype.
+    """
+    n = len(symbols)
+    frame = {}
+    for column in columns:
+        if column == 'Ticker':
+            frame[column] = typed_column(column, symbols)
+        elif column in arrays:
+            frame[column] = typed_column(column, arrays[column])
+        else:
+            frame[column] = missing_column(column, n)
+    return pd.DataFrame(frame, columns=columns)
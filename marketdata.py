@@ -0,0 +1,293 @@
+"""Market data client for the IEX Cloud batch endpoint
+
+Shared by all strategies. Symbols are split in chunks of at most 100
+(the IEX batch limit) and the chunks are requested concurrently over one
+pooled keep-alive session. Rate limited (429) and server error responses
+are retried with exponential backoff (at most max_delay seconds between
+attempts), honouring a Retry-After header.
+
+A batch that fails for its content (an error JSON, a malformed body or a
+400 status) is split in halves until the failing symbols are isolated;
+those are left out of the result, like delisted symbols, and listed in
+client.failed, as is a single symbol that gets a 404. Other client
+errors (a bad token: 401, 403, a wrong URL: 404) fail the fetch at once.
+Malformed payloads of single symbols or types are dropped.
+With a ResponseCache every chunk is stored as soon as it completes, so a
+run that crashes (e.g. when IEX stays down) keeps its finished chunks and
+the rerun only fetches the rest.
+
+Returns the merged per-symbol payload, in the same shape as a single
+batch response:
+    {symbol: {'quote': {...}, 'stats': {...}, ...}, ...}
+
+With a ResponseCache only the (symbol, type) pairs that are not cached
+for the base_url are requested from IEX. Symbols that a well formed
+response left out are cached as absent, so they aren't requested again
+either; failed symbols and malformed payloads are not cached and are
+requested again. Requests with extra query parameters (like the range
+of a chart) bypass the cache, these are not part of its key.
+requests is imported when the first request is sent, so a run served
+from the cache never loads it.
+
+17-10-2026
+Arno Kemner
+"""
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import profiling
+from config import IEX_CLOUD_API_TOKEN
+
+IEX_BASE_URL = 'https://sandbox.iexapis.com/stable'
+BATCH_SIZE = 100  # maximum number of symbols in one IEX batch call
+RETRY_STATUS = (429, 500, 502, 503, 504)
+# rejection of the symbols in a batch, bisected to find the bad ones
+CONTENT_STATUS = (400,)
+# unknown symbol, only when a single symbol was asked for
+SYMBOL_STATUS = (400, 404)
+
+
+class BatchError(Exception):
+    """A batch response that is not a {symbol: {type: payload}} object"""
+
+
+def validate_batch(body) -> dict:
+    """The well formed part of a batch response
+
+    Raises BatchError for an error JSON or a body that is not an object.
+    Symbol payloads that are not objects and types that are not an
+    object or a list (the chart) are dropped.
+    """
+    if not isinstance(body, dict) or 'error' in body:
+        raise BatchError(f'Invalid batch response: {str(body)[:80]!r}')
+    data = {}
+    for symbol, payload in body.items():
+        if not isinstance(payload, dict):
+            profiling.add('malformed_payloads')
+            continue
+        valid = {endpoint_type: value for endpoint_type, value in payload.items()
+                 if isinstance(value, (dict, list))}
+        if len(valid) < len(payload):
+            profiling.add('malformed_payloads', len(payload) - len(valid))
+        data[symbol] = valid
+    return data
+
+
+def chunks(lst, n):
+    """Yield successive n-sized chunks from lst.
+
+    Function sourced from
+    https://stackoverflow.com/questions/312443/how-do-you-split-a-list-into-evenly-sized-chunks
+    """
+    for i in range(0, len(lst), n):
+        yield lst[i:i + n]
+
+
+class MarketDataClient:
+    """Concurrent client for the IEX batch endpoint
+
+    max_workers bounds both the number of requests in flight and the
+    size of the connection pool, so every worker reuses its own
+    keep-alive connection.
+    """
+
+    def __init__(self,
+                 token: str = IEX_CLOUD_API_TOKEN,
+                 base_url: str = None,
+                 max_workers: int = 4,
+                 timeout: float = 10.0,
+                 max_retries: int = 5,
+                 backoff: float = 0.5,
+                 max_delay: float = 30.0,
+                 batch_size: int = BATCH_SIZE,
+                 cache=None):
+        self.token = token
+        self.base_url = (base_url or IEX_BASE_URL).rstrip('/')
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.batch_size = batch_size
+        self.cache = cache
+        self.failed = []
+        # symbols the last well formed response for them left out (delisted)
+        self.omitted = set()
+        self._session = None
+
+    @property
+    def session(self):
+        """Pooled keep-alive session, created on the first request"""
+        if self._session is None:
+            import requests  # The requests library for HTTP requests in Python
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session = session
+        return self._session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+    def _retry_delay(self, attempt: int, response=None) -> float:
+        """Seconds to wait before the next attempt, at most max_delay"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after is not None:
+                try:
+                    return min(float(retry_after), self.max_delay)
+                except ValueError:
+                    pass
+        # exponential backoff with jitter, so workers don't retry in lockstep
+        return min(self.backoff * 2 ** attempt, self.max_delay) * (0.5 + random.random() / 2)
+
+    def fetch_chunk(self, symbols: list, types: list, extra_params: dict = None) -> dict:
+        """Request one batch of at most batch_size symbols"""
+        import requests
+
+        url = f'{self.base_url}/stock/market/batch'
+        params = {'symbols': ','.join(symbols),
+                  'types': ','.join(types),
+                  **(extra_params or {}),
+                  'token': self.token}
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.get(
+                    url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._retry_delay(attempt))
+                continue
+
+            profiling.add('requests')
+            profiling.add('bytes_downloaded', len(response.content))
+            if response.status_code in RETRY_STATUS and attempt < self.max_retries:
+                profiling.add('retries')
+                time.sleep(self._retry_delay(attempt, response))
+                continue
+            response.raise_for_status()
+            try:
+                body = response.json()
+            except ValueError:
+                raise BatchError(f'Malformed batch response: {response.text[:80]!r}') from None
+            data = validate_batch(body)
+            for symbol in symbols:
+                if symbol in body:
+                    self.omitted.discard(symbol)
+                else:
+                    self.omitted.add(symbol)
+            return data
+
+    def fetch_resilient(self, symbols: list, types: list, extra_params: dict = None,
+                        attempt: int = 0) -> dict:
+        """fetch_chunk, bisecting a batch that fails for its content
+
+        A single symbol with a malformed response is retried with backoff,
+        one that still fails or is rejected (400, 404) is added to
+        self.failed and left out without retrying. Other HTTP errors (also
+        a 404 for a batch), network errors and server errors that outlast
+        the retries are raised, bisecting doesn't help against a bad
+        token, a wrong URL or an outage.
+        """
+        import requests
+
+        try:
+            return self.fetch_chunk(symbols, types, extra_params)
+        except (BatchError, requests.HTTPError) as error:
+            response = getattr(error, 'response', None)
+            status = CONTENT_STATUS if len(symbols) > 1 else SYMBOL_STATUS
+            if response is not None and response.status_code not in status:
+                raise
+            if len(symbols) == 1:
+                if isinstance(error, BatchError) and attempt < self.max_retries:
+                    profiling.add('retries')
+                    time.sleep(self._retry_delay(attempt))
+                    return self.fetch_resilient(symbols, types, extra_params, attempt + 1)
+                profiling.add('failed_symbols')
+                self.failed.append(symbols[0])
+                return {}
+        profiling.add('bisections')
+        middle = len(symbols) // 2
+        data = self.fetch_resilient(symbols[:middle], types, extra_params)
+        data.update(self.fetch_resilient(symbols[middle:], types, extra_params))
+        return data
+
+    def fetch(self, symbols, types: list, extra_params: dict = None) -> dict:
+        """Fetch types for all symbols and merge the batch responses"""
+        if self.cache is None or extra_params:
+            return self._fetch_uncached(symbols, types, extra_params)
+
+        symbols = list(symbols)
+        data, missing = self.cache.get(symbols, types, endpoint=self.base_url)
+        misses = sum(len(missing_types) for missing_types in missing.values())
+        profiling.add('cache_hits', len(symbols) * len(types) - misses)
+        profiling.add('cache_misses', misses)
+        # symbols missing the same types can share batch calls
+        requests_by_types = {}
+        for symbol, missing_types in missing.items():
+            requests_by_types.setdefault(tuple(missing_types), []).append(symbol)
+
+        for missing_types, missing_symbols in requests_by_types.items():
+            # every chunk is stored when it completes, a rerun resumes from there
+            fetched = self._fetch_uncached(missing_symbols, list(missing_types),
+                                           checkpoint=self._checkpoint)
+            for symbol, payloads in fetched.items():
+                data.setdefault(symbol, {}).update(payloads)
+        return data
+
+    def _checkpoint(self, symbols: list, types: list, data: dict):
+        """Cache a completed chunk, the symbols its responses left out as absent
+
+        Symbols with a malformed payload or that failed are not cached,
+        so the next fetch requests them again.
+        """
+        failed = set(self.failed)
+        absent = {symbol: types for symbol in symbols
+                  if symbol in self.omitted and symbol not in data and symbol not in failed}
+        self.cache.put(data, endpoint=self.base_url, absent=absent)
+
+    def _fetch_uncached(self, symbols, types: list, extra_params: dict = None,
+                        checkpoint=None) -> dict:
+        """Fetch all chunks, checkpoint(symbols, types, data) runs for every completed chunk"""
+        groups = list(chunks(list(symbols), self.batch_size))
+        data = {}
+        if not groups:
+            return data
+
+        workers = min(self.max_workers, len(groups))
+        results = [None] * len(groups)
+        error = None
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self.fetch_resilient, group, types, extra_params): i
+                       for i, group in enumerate(groups)}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                # keep the completed chunks of a failing fetch before raising,
+                # the chunks that haven't started are not sent anymore
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    for pending in futures:
+                        pending.cancel()
+                    continue
+                i = futures[future]
+                results[i] = future.result()
+                if checkpoint is not None:
+                    checkpoint(groups[i], types, results[i])
+        if error is not None:
+            raise error
+        for result in results:
+            data.update(result)
+        return data
@@ -0,0 +1,120 @@
+"""Parallel parameter sweep of the strategy knobs
+
+Evaluates a grid of strategy parameters with the backtest: the number of
+picks, the subset of momentum windows or value metrics, the rebalance
+interval and the imputation of missing data.
+The panel is copied once into shared memory and every worker process
+maps it, so the market data isn't pickled to the workers per task.
+Returns a results table ranked on a summary statistic.
+
+    python parametersweep.py --strategy momentum --synthetic 2520 --workers 4
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+from backtest import (IMPUTATIONS, Panel, load_panel, run_backtest, summarize,
+                      synthetic_panel)
+from snapshotstore import SnapshotStore
+from strategies import MOMENTUM_METRICS, VALUE_METRICS
+
+# panel of the worker process, attached to the shared memory block
+_panel = None
+_shared = None
+
+
+def metric_subsets(metrics, min_size: int = 1) -> list:
+    """All subsets of the metric columns with at least min_size metrics"""
+    metrics = list(metrics)
+    return [subset
+            for size in range(min_size, len(metrics) + 1)
+            for subset in itertools.combinations(metrics, size)]
+
+
+def make_grid(strategy: str,
+              top: list = (25, 50, 100),
+              metrics: list = None,
+              rebalance_every: list = (21,),
+              impute: list = ('mean', 'median')) -> list:
+    """Every combination of the parameter values, as a list of dicts"""
+    if metrics is None:
+        metrics = metric_subsets(MOMENTUM_METRICS if strategy == 'momentum' else VALUE_METRICS)
+    return [{'strategy': strategy, 'n': n, 'metrics': subset,
+             'rebalance_every': every, 'impute': method}
+            for n, subset, every, method in itertools.product(top, metrics, rebalance_every, impute)]
+
+
+def _attach(name: str, shape: tuple, dtype: str, dates: list, symbols: list, fields: list):
+    """Worker initializer: map the shared panel values"""
+    global _panel, _shared
+    _shared = shared_memory.SharedMemory(name=name)
+    values = np.ndarray(shape, dtype=dtype, buffer=_shared.buf)
+    _panel = Panel(dates, symbols, fields, values)
+
+
+def _evaluate(params: dict) -> dict:
+    result = run_backtest(_panel, params['strategy'], params['n'], params['rebalance_every'],
+                          list(params['metrics']), params['impute'])
+    return {**params, **summarize(result, params['rebalance_every'])}
+
+
+def sweep(panel: Panel, grid: list, workers: int = None, rank_by: str = 'Annual Return') -> pd.DataFrame:
+    """Backtest every parameter set of grid, best rank_by first"""
+    workers = workers or os.cpu_count() or 1
+    values = np.ascontiguousarray(panel.values)
+    shared = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shared.buf)[:] = values
+        initargs = (shared.name, values.shape, values.dtype.str,
+                    panel.dates, panel.symbols, panel.fields)
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_attach,
+                                 initargs=initargs) as executor:
+            chunksize = max(1, len(grid) // (workers * 4))
+            results = list(executor.map(_evaluate, grid, chunksize=chunksize))
+    finally:
+        shared.close()
+        shared.unlink()
+
+    table = pd.DataFrame(results)
+    table['metrics'] = table['metrics'].map(', '.join)
+    return table.sort_values(rank_by, ascending=False, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep strategy parameters over a backtest')
+    parser.add_argument('--strategy', choices=['momentum', 'value'], default='momentum')
+    parser.add_argument('--start', help='first snapshot date, YYYY-MM-DD')
+    parser.add_argument('--end', help='last snapshot date, YYYY-MM-DD')
+    parser.add_argument('--top', type=int, nargs='+', default=[25, 50, 100],
+                        help='numbers of stocks to hold')
+    parser.add_argument('--rebalance-every', type=int, nargs='+', default=[21])
+    parser.add_argument('--impute', choices=IMPUTATIONS, nargs='+', default=['mean', 'median'])
+    parser.add_argument('--workers', type=int, help='worker processes, default all cores')
+    parser.add_argument('--rank-by', default='Annual Return')
+    parser.add_argument('--synthetic', type=int, metavar='DAYS',
+                        help='run on a synthetic panel of DAYS days instead of snapshots')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        panel = synthetic_panel(args.synthetic)
+    else:
+        panel = load_panel(SnapshotStore(), args.start, args.end)
+
+    grid = make_grid(args.strategy, args.top, rebalance_every=args.rebalance_every,
+                     impute=args.impute)
+    table = sweep(panel, grid, args.workers, args.rank_by)
+    with pd.option_context('display.max_colwidth', 80, 'display.width', 200):
+        print(table)
+
+
+if __name__ == '__main__':
+    main()
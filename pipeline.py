@@ -0,0 +1,131 @@
+"""Streaming, chunk at a time fetch and ingest pipeline
+
+For universes of many thousands of symbols. The universe is read lazily,
+each chunk of symbols is fetched while the previous one is parsed, and
+the parsed values are appended to preallocated column buffers. Only the
+raw JSON of the chunks in flight is in memory, so the peak memory is
+bounded by the chunk size times the prefetch depth (plus the float64
+columns of the result), not by the JSON of the whole universe.
+
+The result is a snapshotstore.Snapshot, so the strategies run on it
+unchanged. iter_snapshots yields a partial snapshot after every chunk.
+
+17-10-2026
+Arno Kemner
+"""
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+from ingest import to_float
+from marketdata import BATCH_SIZE
+from snapshotstore import Snapshot, column_name
+
+
+def read_universe(path: str, chunksize: int = 10000):
+    """Yield the tickers of a universe CSV without reading it at once
+
+    Symbols removed from a universe.Universe table are left out, as in
+    stocks.read_universe.
+    """
+    columns = ['Ticker', 'Status']
+    for frame in pd.read_csv(path, usecols=lambda column: column in columns, chunksize=chunksize):
+        if 'Status' in frame.columns:
+            frame = frame[frame['Status'] != 'removed']
+        yield from frame['Ticker'].astype(str)
+
+
+def symbol_chunks(symbols, size: int = BATCH_SIZE):
+    """Yield lists of size symbols from any iterable"""
+    iterator = iter(symbols)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+class ColumnBuffers:
+    """Preallocated float64 columns that grow by doubling"""
+
+    def __init__(self, fields: dict, capacity: int = 1024):
+        self.fields = fields
+        self.count = 0
+        self.symbols = np.empty(capacity, dtype=object)
+        self.columns = {name: np.full(capacity, np.nan) for name in fields}
+
+    def _reserve(self, extra: int):
+        capacity = len(self.symbols)
+        if self.count + extra <= capacity:
+            return
+        while capacity < self.count + extra:
+            capacity *= 2
+        symbols = np.empty(capacity, dtype=object)
+        symbols[:self.count] = self.symbols[:self.count]
+        self.symbols = symbols
+        for name, values in self.columns.items():
+            grown = np.full(capacity, np.nan)
+            grown[:self.count] = values[:self.count]
+            self.columns[name] = grown
+
+    def append(self, symbols: list, data: dict) -> int:
+        """Parse the batch response of symbols into the buffers
+
+        Symbols missing from the response are skipped; returns the number
+        of appended symbols.
+        """
+        valid = [symbol for symbol in symbols if data.get(symbol)]
+        self._reserve(len(valid))
+        start, end = self.count, self.count + len(valid)
+        self.symbols[start:end] = valid
+        empty = {}
+        for name, (endpoint_type, key) in self.fields.items():
+            self.columns[name][start:end] = [
+                to_float((data[symbol].get(endpoint_type) or empty).get(key))
+                for symbol in valid]
+        self.count = end
+        return len(valid)
+
+    def snapshot(self, day: str = None) -> Snapshot:
+        """Snapshot of the symbols parsed so far (views, no copies)"""
+        symbols = self.symbols[:self.count]
+        columns = {name: values[:self.count] for name, values in self.columns.items()}
+        return Snapshot(day, symbols, columns)
+
+
+def iter_snapshots(client, symbols, types: list, fields: dict,
+                   prefetch: int = None, capacity: int = 1024, day: str = None):
+    """Yield a growing partial Snapshot after each fetched chunk
+
+    fields is a field spec {column: (endpoint type, key)}; the snapshot
+    columns are keyed by snapshotstore.column_name. At most prefetch
+    chunks (default the client's max_workers) are downloaded concurrently
+    ahead of the one being parsed.
+    """
+    if prefetch is None:
+        prefetch = client.max_workers
+    buffers = ColumnBuffers({column_name(*field): field for field in fields.values()},
+                            capacity)
+    chunks = symbol_chunks(symbols, client.batch_size)
+    with ThreadPoolExecutor(max_workers=prefetch + 1) as executor:
+        in_flight = [(chunk, executor.submit(client.fetch, chunk, types))
+                     for chunk in itertools.islice(chunks, prefetch + 1)]
+        while in_flight:
+            chunk, future = in_flight.pop(0)
+            data = future.result()
+            next_chunk = next(chunks, None)
+            if next_chunk is not None:
+                in_flight.append((next_chunk, executor.submit(client.fetch, next_chunk, types)))
+            buffers.append(chunk, data)
+            del data
+            yield buffers.snapshot(day)
+
+
+def stream_snapshot(client, symbols, types: list, fields: dict,
+                    prefetch: int = None, capacity: int = 1024, day: str = None) -> Snapshot:
+    """Fetch and ingest the whole universe, returns the final Snapshot"""
+    snapshot = None
+    for snapshot in iter_snapshots(client, symbols, types, fields, prefetch, capacity, day):
+        pass
+    if snapshot is None:
+        return Snapshot(day, np.array([], dtype=str), {})
+    return snapshot
@@ -0,0 +1,178 @@
+"""Daily close history with incremental updates and local momentum returns
+
+Instead of the precomputed year1ChangePercent etc. of the stats endpoint,
+the daily closes of the universe are kept on disk as one (dates, symbols)
+array. An update only fetches the chart range since the last stored day
+(two years for symbols new to the history), so a daily run costs one
+small delta fetch.
+
+Returns over any window are computed for the whole universe in one
+vectorized pass, including skip-month (e.g. 12-1) and volatility
+adjusted momentum.
+
+17-10-2026
+Arno Kemner
+"""
+import os
+from datetime import date
+
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+HISTORY_PATH = 'history'
+
+# IEX chart ranges and the number of trading days they cover
+CHART_RANGES = [('5d', 5), ('1m', 21), ('3m', 63), ('6m', 126), ('1y', 252), ('2y', 504), ('5y', 1260)]
+
+# the windows of the stats endpoint fields used by the momentum strategy
+MOMENTUM_WINDOWS = {
+    'One-Year Price Return': 252,
+    'Six-Month Price Return': 126,
+    'Three-Month Price Return': 63,
+    'One-Month Price Return': 21,
+}
+
+
+def chart_range(trading_days: int) -> str:
+    """Smallest chart range covering trading_days"""
+    for name, days in CHART_RANGES:
+        if days >= trading_days:
+            return name
+    return CHART_RANGES[-1][0]
+
+
+def trailing_returns(closes: np.ndarray, window: int, skip: int = 0) -> np.ndarray:
+    """(dates, symbols) return over window days, ending skip days before each date"""
+    returns = np.full(closes.shape, np.nan)
+    n = closes.shape[0]
+    if n > window + skip:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns[window + skip:] = closes[window:n - skip] / closes[:n - skip - window] - 1
+    return returns
+
+
+def trailing_volatility(closes: np.ndarray, window: int, skip: int = 0) -> np.ndarray:
+    """(dates, symbols) standard deviation of the daily returns over the window"""
+    daily = pd.DataFrame(closes).pct_change(fill_method=None)
+    volatility = daily.rolling(window).std().shift(skip).to_numpy()
+    return volatility
+
+
+def momentum(closes: np.ndarray, window: int, skip: int = 0, volatility_adjusted: bool = False) -> np.ndarray:
+    """Trailing return, optionally divided by the volatility over the window"""
+    returns = trailing_returns(closes, window, skip)
+    if volatility_adjusted:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns = returns / (trailing_volatility(closes, window, skip) * np.sqrt(window))
+    return returns
+
+
+class PriceHistory:
+    """Daily closes of a universe: closes[date, symbol]"""
+
+    def __init__(self, path: str = HISTORY_PATH):
+        self.path = path
+        if os.path.exists(self._file('closes')):
+            self.dates = np.load(self._file('dates'))
+            self.symbols = np.load(self._file('symbols'))
+            self.closes = np.load(self._file('closes'))
+        else:
+            self.dates = np.array([], dtype='<U10')
+            self.symbols = np.array([], dtype='<U10')
+            self.closes = np.empty((0, 0))
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f'{name}.npy')
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        for name in ('dates', 'symbols', 'closes'):
+            temporary = os.path.join(self.path, f'{name}.tmp.npy')
+            np.save(temporary, getattr(self, name))
+            os.replace(temporary, self._file(name))
+
+    def last_date(self) -> str:
+        return str(self.dates[-1]) if len(self.dates) else None
+
+    def merge(self, data: dict):
+        """Add the chart payloads {symbol: {'chart': [{'date', 'close'}, ...]}}"""
+        bars = [(symbol, bar['date'], bar.get('close'))
+                for symbol, payload in data.items()
+                for bar in (payload.get('chart') or [])]
+        if not bars:
+            return
+
+        dates = np.union1d(self.dates, np.array([day for _, day, _ in bars]))
+        known = set(self.symbols.tolist())
+        added = sorted({symbol for symbol, _, _ in bars} - known)
+        symbols = np.concatenate([self.symbols, np.array(added, dtype=str)]) if added else self.symbols
+
+        closes = np.full((len(dates), len(symbols)), np.nan)
+        if self.closes.size:
+            rows = np.searchsorted(dates, self.dates)
+            closes[rows, :self.closes.shape[1]] = self.closes
+
+        date_rows = {day: i for i, day in enumerate(dates.tolist())}
+        symbol_columns = {symbol: i for i, symbol in enumerate(symbols.tolist())}
+        rows = np.fromiter((date_rows[day] for _, day, _ in bars), dtype=np.intp, count=len(bars))
+        columns = np.fromiter((symbol_columns[symbol] for symbol, _, _ in bars), dtype=np.intp, count=len(bars))
+        values = np.fromiter((np.nan if close is None else close for _, _, close in bars),
+                             dtype=np.float64, count=len(bars))
+        closes[rows, columns] = values
+
+        self.dates, self.symbols, self.closes = dates, symbols, closes
+
+    def update(self, client, symbols: list, today: date = None, initial_range: str = '2y') -> int:
+        """Fetch the closes since the last stored day, returns the number of requests
+
+        Symbols not in the history yet get initial_range of history.
+        """
+        today = today or date.today()
+        known = set(self.symbols.tolist())
+        new_symbols = [symbol for symbol in symbols if symbol not in known]
+        old_symbols = [symbol for symbol in symbols if symbol in known]
+
+        requests = []
+        if new_symbols:
+            requests.append((new_symbols, initial_range))
+        if old_symbols and self.last_date():
+            missing_days = int(np.busday_count(np.datetime64(self.last_date()) + 1,
+                                               np.datetime64(today) + 1))
+            if missing_days > 0:
+                requests.append((old_symbols, chart_range(missing_days)))
+
+        for request_symbols, request_range in requests:
+            data = client.fetch(request_symbols, ['chart'],
+                                {'range': request_range, 'chartCloseOnly': 'true'})
+            self.merge(data)
+        if requests:
+            self.save()
+        return len(requests)
+
+    def columns(self, symbols: list) -> np.ndarray:
+        """Positions of symbols in the history, -1 when not in it"""
+        positions = {symbol: i for i, symbol in enumerate(self.symbols.tolist())}
+        return np.fromiter((positions.get(symbol, -1) for symbol in symbols),
+                           dtype=np.intp, count=len(symbols))
+
+    def latest_returns(self,
+                       symbols: list,
+                       windows: dict = MOMENTUM_WINDOWS,
+                       skip: int = 0,
+                       volatility_adjusted: bool = False) -> dict:
+        """Momentum of the last stored day per window, ordered as symbols
+
+        Returns {column name: array}, NaN for symbols without enough history.
+        """
+        columns = self.columns(symbols)
+        found = columns >= 0
+        closes = self.closes[:, columns[found]] if self.closes.size else np.empty((0, 0))
+        results = {}
+        for name, window in windows.items():
+            values = np.full(len(symbols), np.nan)
+            if len(closes):
+                # only the last window + skip + 1 days are needed for the last date
+                recent = closes[-(window + skip + 1):]
+                values[found] = momentum(recent, window, skip, volatility_adjusted)[-1]
+            results[name] = values
+        return results
@@ -0,0 +1,206 @@
+"""Stage timers and a JSON report of a strategy run
+
+The strategies and the market data client mark their stages and count
+what they process:
+
+    with profiling.stage('score', rows=len(df)):
+        ...
+    profiling.add('bytes_downloaded', len(response.content))
+
+Both are no-ops until a run is profiled:
+
+    profiler = profiling.start('value', trace_memory=True)
+    ...
+    profiling.stop().write('profiles/value.json')
+
+The report gives per stage the wall time, the counters added inside it
+(rows, bytes_downloaded, requests, cache_hits, cache_misses) and, with
+trace_memory, the peak traced memory. Nested stages are named by their
+path, e.g. 'value/score'; a stage entered more than once is summed.
+With cprofile the run is also profiled with cProfile and the stats are
+dumped next to the report.
+
+17-10-2026
+Arno Kemner
+"""
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+_active = None
+
+# counters that only make sense per stage, these are not totalled for the run
+STAGE_COUNTERS = ('rows',)
+
+
+class Profiler:
+    """Collects the stages and counters of one run"""
+
+    def __init__(self, name: str, trace_memory: bool = False, cprofile: bool = False):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self.stages = {}
+        self.totals = {}
+        self.stack = []
+        # counters are also added from the fetch threads
+        self.lock = threading.Lock()
+        self.started_at = None
+        self.wall_time = None
+        self.peak_memory = None
+        self.run_peak = 0
+
+    def start(self):
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._start = time.perf_counter()
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+        return self
+
+    def stop(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        if self.trace_memory:
+            self._update_peaks()
+            self.peak_memory = self.run_peak
+            tracemalloc.stop()
+        self.wall_time = time.perf_counter() - self._start
+        return self
+
+    def _update_peaks(self):
+        """Pass the traced peak since the last stage boundary to the open stages"""
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for entry in self.stack:
+            entry['peak_memory'] = max(entry['peak_memory'], peak)
+        self.run_peak = max(self.run_peak, peak)
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None):
+        path = '/'.join([entry['name'] for entry in self.stack] + [name])
+        with self.lock:
+            record = self.stages.setdefault(path, {'name': path, 'calls': 0,
+                                                   'wall_time': 0.0, 'counters': {}})
+            record['calls'] += 1
+        if self.trace_memory:
+            self._update_peaks()
+        entry = {'name': name, 'record': record, 'peak_memory': 0}
+        self.stack.append(entry)
+        if rows is not None:
+            self.add('rows', rows)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['wall_time'] += time.perf_counter() - start
+            if self.trace_memory:
+                self._update_peaks()
+                record['peak_memory'] = max(record.get('peak_memory', 0), entry['peak_memory'])
+            self.stack.pop()
+
+    def add(self, counter: str, value=1):
+        """Add value to a counter of the innermost open stage and the run"""
+        with self.lock:
+            if self.stack:
+                counters = self.stack[-1]['record']['counters']
+                counters[counter] = counters.get(counter, 0) + value
+            if counter not in STAGE_COUNTERS:
+                self.totals[counter] = self.totals.get(counter, 0) + value
+
+    def report(self) -> dict:
+        stages = []
+        for record in self.stages.values():
+            stage = {'name': record['name'],
+                     'calls': record['calls'],
+                     'wall_time': round(record['wall_time'], 6),
+                     **record['counters']}
+            if 'peak_memory' in record:
+                stage['peak_memory'] = record['peak_memory']
+            stages.append(stage)
+        return {'run': self.name,
+                'started_at': self.started_at,
+                'wall_time': None if self.wall_time is None else round(self.wall_time, 6),
+                'peak_memory': self.peak_memory,
+                'totals': dict(self.totals),
+                'stages': stages}
+
+    def write(self, path: str) -> dict:
+        """Write the JSON report (and the cProfile stats as path.prof)"""
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        report = self.report()
+        if self.cprofile is not None:
+            report['cprofile'] = f'{os.path.splitext(path)[0]}.prof'
+            self.cprofile.dump_stats(report['cprofile'])
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2)
+        return report
+
+
+def report_path(name: str) -> str:
+    """Default report file, one per run so the reports can be compared over time"""
+    return os.path.join('profiles', f'{name}-{datetime.now():%Y%m%d-%H%M%S}.json')
+
+
+def start(name: str, trace_memory: bool = False, cprofile: bool = False) -> Profiler:
+    """Start profiling a run, the stages and counters are recorded from now on"""
+    global _active
+    _active = Profiler(name, trace_memory, cprofile).start()
+    return _active
+
+
+def stop() -> Profiler:
+    """Stop the active profiler and return it"""
+    global _active
+    profiler, _active = _active, None
+    return profiler.stop()
+
+
+@contextmanager
+def stage(name: str, rows: int = None):
+    """Time a stage of the active profiler, does nothing when not profiling"""
+    if _active is None:
+        yield None
+        return
+    with _active.stage(name, rows) as record:
+        yield record
+
+
+def add(counter: str, value=1):
+    """Add to a counter of the active profiler, does nothing when not profiling"""
+    if _active is not None:
+        _active.add(counter, value)
+
+
+def start_run(name: str, args):
+    """Start profiling when the script was run with --profile"""
+    if args.profile is None:
+        return None
+    return start(name, args.profile_memory, args.cprofile)
+
+
+def finish_run(name: str, args):
+    """Stop profiling and write the report of a run started by start_run"""
+    if _active is None:
+        return None
+    path = args.profile or report_path(name)
+    report = stop().write(path)
+    print(f'Profile report written to {path}')
+    return report
+
+
+def add_arguments(parser):
+    """The profiling options of the strategy scripts"""
+    parser.add_argument('--profile', metavar='REPORT', nargs='?', const='',
+                        help='write a JSON timing report (default profiles/<run>-<time>.json)')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='with --profile: trace the peak memory per stage (slower)')
+    parser.add_argument('--cprofile', action='store_true',
+                        help='with --profile: also dump cProfile stats next to the report')
@@ -0,0 +1,128 @@
+"""Rebalance: the orders from the current holdings to the target shares
+
+The strategies size every position from zero. rebalance takes the
+current holdings of any number of accounts and returns only the buy and
+sell orders that move them to the target shares, netted per account and
+ticker. Targets and holdings are joined on (Account, Ticker) in one
+index alignment and all accounts are handled with array operations, so
+thousands of accounts of 500 positions take well under a second.
+
+    band          no trade when the order is worth less than this
+                  fraction of the account value; positions that leave
+                  the portfolio are always sold
+    turnover_cap  the value bought plus sold is at most this fraction of
+                  the account value; all orders of an account over the
+                  cap are scaled down (rounded towards zero)
+
+Holdings CSV, the Account column is optional for a single account and a
+Price column is used for held tickers without a target price:
+
+    Account,Ticker,Shares
+    ACC-001,AAPL,120
+
+17-10-2026
+Arno Kemner
+"""
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+KEYS = ['Account', 'Ticker']
+HOLDINGS_COLUMNS = ['Ticker', 'Shares']
+ORDER_COLUMNS = ['Account', 'Ticker', 'Price', 'Current Shares', 'Target Shares',
+                 'Order Shares', 'Side', 'Trade Value']
+
+# the orders sheet of an account workbook, without the Account column
+ORDERS_OUTPUT = {
+    'sheet_name': 'Orders',
+    'column_formats': {
+        'A': ['Ticker', 'string'],
+        'B': ['Price', 'dollar'],
+        'C': ['Current Shares', 'integer'],
+        'D': ['Target Shares', 'integer'],
+        'E': ['Order Shares', 'integer'],
+        'F': ['Side', 'string'],
+        'G': ['Trade Value', 'dollar']
+    }
+}
+
+
+def read_holdings(path: str, account: str = '') -> pd.DataFrame:
+    """The holdings CSV as a frame, account for rows without an Account column"""
+    holdings = pd.read_csv(path, dtype={'Account': str, 'Ticker': str})
+    missing = [column for column in HOLDINGS_COLUMNS if column not in holdings.columns]
+    if missing:
+        raise ValueError(f'{path}: missing column(s) {missing}')
+    if 'Account' not in holdings.columns:
+        holdings.insert(0, 'Account', account)
+    shares = pd.to_numeric(holdings['Shares'], errors='coerce')
+    if shares.isna().any() or (shares % 1 != 0).any():
+        raise ValueError(f'{path}: Shares must be whole numbers')
+    holdings['Shares'] = shares.astype(np.int64)
+    return holdings
+
+
+def rebalance(targets: pd.DataFrame,
+              holdings: pd.DataFrame,
+              account_values=None,
+              prices: pd.Series = None,
+              band: float = 0.0,
+              turnover_cap: float = None) -> pd.DataFrame:
+    """The orders (ORDER_COLUMNS) from holdings to targets, sells first per account
+
+    targets has the columns Account, Ticker, Price and Target Shares,
+    holdings Account, Ticker, Shares and optionally Price; a ticker in
+    several rows of an account is summed. Only the accounts in targets
+    are rebalanced. account_values ({account: value}) is what band and
+    turnover_cap are relative to, by default the value of the targets.
+    prices fills in the price of held tickers without a target price.
+    """
+    holdings = holdings[holdings['Account'].isin(targets['Account'].unique())]
+    target = targets.groupby(KEYS)['Target Shares'].sum()
+    current = holdings.groupby(KEYS)['Shares'].sum()
+    current, target = current.align(target, join='outer', fill_value=0)
+
+    price = targets.groupby('Ticker', sort=False)['Price'].first()
+    if prices is not None:
+        price = price.combine_first(prices)
+    if 'Price' in holdings.columns:
+        price = price.combine_first(holdings.groupby('Ticker', sort=False)['Price'].first())
+    price = price.reindex(current.index.get_level_values('Ticker')).to_numpy(dtype=np.float64)
+
+    index = current.index
+    codes, accounts = pd.factorize(index.get_level_values('Account'))
+    current = current.to_numpy(dtype=np.int64)
+    target = target.to_numpy(dtype=np.int64)
+    target_values = np.bincount(codes, weights=np.nan_to_num(target * price), minlength=len(accounts))
+    if account_values is None:
+        values = target_values
+    else:
+        values = pd.Series(account_values, dtype=np.float64).reindex(accounts).to_numpy()
+        values = np.where(np.isnan(values), target_values, values)
+    row_values = values[codes]
+
+    orders = target - current
+    if band > 0:
+        # a position without a price can't be valued and is always traded
+        small = (np.abs(orders * price) < band * row_values) & (target != 0)
+        orders[small] = 0
+    if turnover_cap is not None:
+        traded = np.bincount(codes, weights=np.nan_to_num(np.abs(orders * price)),
+                             minlength=len(accounts))
+        scale = np.ones(len(accounts))
+        over = traded > turnover_cap * values
+        scale[over] = turnover_cap * values[over] / traded[over]
+        orders = np.trunc(orders * scale[codes]).astype(np.int64)
+
+    trading = orders != 0
+    result = pd.DataFrame({
+        'Account': index.get_level_values('Account')[trading],
+        'Ticker': index.get_level_values('Ticker')[trading],
+        'Price': price[trading],
+        'Current Shares': current[trading],
+        'Target Shares': target[trading],
+        'Order Shares': orders[trading],
+        'Side': np.where(orders[trading] > 0, 'buy', 'sell'),
+        'Trade Value': (orders * price)[trading],
+    })
+    return result.sort_values(['Account', 'Side'], ascending=[True, False], kind='stable',
+                              ignore_index=True)
@@ -0,0 +1,181 @@
+"""Persistent on-disk cache for IEX batch responses
+
+Entries are keyed by (endpoint, symbol, endpoint type, date) and stored
+in a small SQLite database, so consecutive strategy runs share their
+downloads and the stub never serves into a real IEX run. Every endpoint
+type has its own time to live: quotes go stale quickly, the (advanced)
+stats only change once a day.
+A symbol that is not in the response (delisted, or left out as failed)
+is stored as a negative entry without a payload and the same time to
+live, so warm runs don't request it again.
+When the cache grows over max_bytes the least recently used entries are
+evicted.
+
+17-10-2026
+Arno Kemner
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+
+CACHE_PATH = os.path.join('cache', 'responses.sqlite')
+MAX_BYTES = 100 * 1024 * 1024
+
+# time to live in seconds per endpoint type
+TTL = {
+    'quote': 15 * 60,
+    'stats': 24 * 60 * 60,
+    'advanced-stats': 24 * 60 * 60,
+}
+DEFAULT_TTL = 60 * 60
+
+
+class ResponseCache:
+    """LRU and size bounded cache of per-symbol batch payloads
+
+    With refresh=True every lookup misses, but fetched responses are
+    still stored, so the next run is warm again.
+    """
+
+    def __init__(self,
+                 path: str = CACHE_PATH,
+                 ttl: dict = None,
+                 max_bytes: int = MAX_BYTES,
+                 refresh: bool = False):
+        self.path = path
+        self.ttl = TTL if ttl is None else ttl
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # shared by the fetch threads, every access holds the lock
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        columns = [row[1] for row in self.connection.execute('PRAGMA table_info(responses)')]
+        if columns and 'endpoint' not in columns:
+            # a cache of the layout without endpoints, start over
+            self.connection.execute('DROP TABLE responses')
+        self.connection.execute(
+            '''CREATE TABLE IF NOT EXISTS responses (
+                   endpoint TEXT NOT NULL,
+                   symbol TEXT NOT NULL,
+                   type TEXT NOT NULL,
+                   date TEXT NOT NULL,
+                   payload TEXT,
+                   size INTEGER NOT NULL,
+                   fetched_at REAL NOT NULL,
+                   accessed_at REAL NOT NULL,
+                   PRIMARY KEY (endpoint, symbol, type, date))''')
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def get(self, symbols, types: list, day: str = None, endpoint: str = '') -> tuple:
+        """Look up types for symbols
+
+        Returns the cached payloads as {symbol: {type: payload}} and a
+        dict {symbol: [missing types]} of what still has to be fetched.
+        Negative entries are hits that are in neither.
+        """
+        with self.lock:
+            return self._get(list(symbols), types, day or date.today().isoformat(), endpoint)
+
+    def _get(self, symbols: list, types: list, day: str, endpoint: str) -> tuple:
+        missing = {symbol: list(types) for symbol in symbols}
+        data = {}
+        if self.refresh:
+            self.misses += len(symbols) * len(types)
+            return data, missing
+
+        now = time.time()
+        hit_keys = []
+        for endpoint_type in types:
+            min_fetched_at = now - self.ttl.get(endpoint_type, DEFAULT_TTL)
+            # query per 500 symbols to stay under the SQLite variable limit
+            for i in range(0, len(symbols), 500):
+                group = symbols[i:i + 500]
+                rows = self.connection.execute(
+                    f'''SELECT symbol, payload FROM responses
+                        WHERE endpoint = ? AND type = ? AND date = ? AND fetched_at >= ?
+                        AND symbol IN ({','.join('?' * len(group))})''',
+                    [endpoint, endpoint_type, day, min_fetched_at, *group])
+                for symbol, payload in rows:
+                    if payload is not None:
+                        data.setdefault(symbol, {})[endpoint_type] = json.loads(payload)
+                    missing[symbol].remove(endpoint_type)
+                    hit_keys.append((now, endpoint, symbol, endpoint_type, day))
+
+        self.connection.executemany(
+            '''UPDATE responses SET accessed_at = ?
+               WHERE endpoint = ? AND symbol = ? AND type = ? AND date = ?''',
+            hit_keys)
+        self.connection.commit()
+
+        self.hits += len(hit_keys)
+        self.misses += len(symbols) * len(types) - len(hit_keys)
+        missing = {symbol: left for symbol, left in missing.items() if left}
+        return data, missing
+
+    def put(self, data: dict, day: str = None, endpoint: str = '', absent: dict = None):
+        """Store a (merged) batch response {symbol: {type: payload}}
+
+        absent {symbol: [types]} are stored as negative entries.
+        """
+        with self.lock:
+            self._put(data, day or date.today().isoformat(), endpoint, absent or {})
+
+    def _put(self, data: dict, day: str, endpoint: str, absent: dict):
+        now = time.time()
+        rows = []
+        for symbol, payloads in data.items():
+            for endpoint_type, payload in payloads.items():
+                text = json.dumps(payload)
+                rows.append((endpoint, symbol, endpoint_type, day, text, len(text), now, now))
+        for symbol, types in absent.items():
+            for endpoint_type in types:
+                rows.append((endpoint, symbol, endpoint_type, day, None, 0, now, now))
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        self.connection.commit()
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        with self.lock:
+            (total,) = self.connection.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()
+            if total <= self.max_bytes:
+                return
+
+            excess = total - self.max_bytes
+            rows = self.connection.execute(
+                'SELECT rowid, size FROM responses ORDER BY accessed_at')
+            evict_rowids = []
+            for rowid, size in rows:
+                if excess <= 0:
+                    break
+                evict_rowids.append((rowid,))
+                excess -= size
+            self.connection.executemany(
+                'DELETE FROM responses WHERE rowid = ?', evict_rowids)
+            self.connection.commit()
+
+    def clear(self):
+        with self.lock:
+            self.connection.execute('DELETE FROM responses')
+            self.connection.commit()
@@ -0,0 +1,85 @@
+"""Column types of the strategy frames
+
+Every column of the strategy frames has an explicit dtype instead of
+whatever pandas infers from mixed values, and a missing value is a
+nullable marker (NaN, <NA>) of that dtype, never a sentinel string:
+
+    Ticker         category (sorted categories, the tickers in the frame)
+    percentiles    float32, only displayed, the score is taken before
+    share counts   Int32, nullable: <NA> until the picks are sized
+    other columns  float64: prices, market caps, the metrics and the
+                   scores, which are ranked and keep their exact ties
+
+ingest.build_frame, scoring.score_frame and the sizing build their
+columns with typed_column, so every frame follows the schema.
+
+17-10-2026
+Arno Kemner
+"""
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+TICKER = 'category'
+METRIC = np.float64
+PERCENTILE = np.float32
+SHARES = 'Int32'
+SHARES_MAX = np.iinfo(np.int32).max
+
+SHARES_COLUMNS = ('Number of Shares to Buy', 'Number Of Shares to Buy')
+
+
+def column_type(column: str):
+    """The dtype of a strategy frame column"""
+    if column == 'Ticker':
+        return TICKER
+    if column.endswith('Percentile'):
+        return PERCENTILE
+    if column in SHARES_COLUMNS:
+        return SHARES
+    return METRIC
+
+
+def column_types(columns) -> dict:
+    """{column: dtype} of the columns of a strategy frame"""
+    return {column: column_type(column) for column in columns}
+
+
+def typed_column(column: str, values):
+    """values as the dtype of column; share counts that don't fit Int32 raise OverflowError"""
+    dtype = column_type(column)
+    if dtype == TICKER:
+        return pd.Categorical(values)
+    if dtype == SHARES:
+        counts = np.asarray(values)
+        if counts.dtype.kind in 'iuf' and ((counts > SHARES_MAX) | (counts < -SHARES_MAX)).any():
+            raise OverflowError(f'{column} does not fit {SHARES}')
+        return pd.array(values, dtype=SHARES)
+    return np.asarray(values, dtype=dtype)
+
+
+def missing_column(column: str, n: int):
+    """A column of n missing values"""
+    if column_type(column) == SHARES:
+        return pd.array([pd.NA] * n, dtype=SHARES)
+    return typed_column(column, np.full(n, np.nan))
+
+
+def check_frame(df: pd.DataFrame) -> list:
+    """The columns of df that don't have their schema dtype"""
+    return [column for column in df.columns if df[column].dtype != column_type(column)]
+
+
+def records(df: pd.DataFrame) -> list:
+    """The rows of df for JSON: None for missing values, float32 at its shortest decimal"""
+    df = df.copy()
+    for column in df.columns:
+        if df[column].dtype == np.float32:
+            # 0.062 instead of the float64 value of the float32, 0.061999998986721
+            df[column] = df[column].astype(str).astype(np.float64)
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def memory_report(df: pd.DataFrame) -> dict:
+    """Bytes per column (including the strings of object columns) and the total"""
+    usage = df.memory_usage(deep=True, index=False)
+    return {**usage.to_dict(), 'total': int(usage.sum())}
@@ -0,0 +1,53 @@
+"""Top-N selection of a scored universe
+
+Uses a partial selection (np.argpartition, O(n)) and only sorts the
+selected rows, instead of sorting the whole universe by score.
+Ties are broken on the ticker, so the selection does not depend on the
+order of the universe. Rows without a score are selected last.
+
+17-10-2026
+Arno Kemner
+"""
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+
+def top_n_positions(scores, tickers, n: int, ascending: bool = False) -> np.ndarray:
+    """Positions of the n best scores, best first
+
+    ascending=False selects the highest scores, ascending=True the lowest.
+    """
+    keys = np.asarray(scores, dtype=np.float64)
+    if not ascending:
+        keys = -keys
+    keys = np.where(np.isnan(keys), np.inf, keys)
+    tickers = np.asarray(tickers)
+    n = max(0, min(n, len(keys)))
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+
+    if n < len(keys):
+        threshold = keys[np.argpartition(keys, n - 1)[:n]].max()
+        # every row tied with the n-th score competes on its ticker
+        candidates = np.flatnonzero(keys <= threshold)
+    else:
+        candidates = np.arange(len(keys))
+
+    order = np.lexsort((tickers[candidates], keys[candidates]))
+    return candidates[order[:n]]
+
+
+def select_top(df: pd.DataFrame,
+               score_column: str,
+               n: int,
+               ascending: bool = False,
+               ticker_column: str = 'Ticker') -> pd.DataFrame:
+    """Return the n best rows of df by score_column, best first"""
+    positions = top_n_positions(df[score_column].to_numpy(dtype=np.float64),
+                                df[ticker_column].to_numpy(),
+                                n,
+                                ascending)
+    top = df.iloc[positions].reset_index(drop=True)
+    if isinstance(top[ticker_column].dtype, pd.CategoricalDtype):
+        top[ticker_column] = top[ticker_column].cat.remove_unused_categories()
+    return top
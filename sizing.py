@@ -0,0 +1,155 @@
+"""Position sizing: number of shares to buy for a portfolio value
+
+Share counts for all positions are computed in one vectorized step from
+a weight per position:
+    equal_weights       every position the same amount
+    market_cap_weights  proportional to the market capitalization
+    score_weights       proportional to the strategy score
+
+Rounding down to whole shares leaves cash over. With redistribute=True
+that cash buys one more share of the positions that are the furthest
+below their target, as long as it lasts. share_counts_many sizes the same
+positions for many portfolio values at once.
+
+17-10-2026
+Arno Kemner
+"""
+import numpy as np  # The Numpy numerical computing library
+import pandas as pd  # The Pandas data science library
+
+from schema import typed_column
+
+WEIGHTINGS = ('equal', 'market-cap', 'score')
+
+
+def _normalize(weights: np.ndarray) -> np.ndarray:
+    weights = np.where(np.isfinite(weights) & (weights > 0), weights, 0.0)
+    total = weights.sum()
+    if total == 0:
+        return weights
+    return weights / total
+
+
+def equal_weights(n: int) -> np.ndarray:
+    if n == 0:
+        return np.empty(0)
+    return np.full(n, 1.0 / n)
+
+
+def market_cap_weights(market_caps) -> np.ndarray:
+    return _normalize(np.asarray(market_caps, dtype=np.float64))
+
+
+def score_weights(scores, ascending: bool = False) -> np.ndarray:
+    """Weights from percentile scores in [0, 1]
+
+    With ascending=True a low score is better (value strategy), so the
+    weights are taken from 1 - score.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if ascending:
+        scores = 1.0 - scores
+    return _normalize(scores)
+
+
+def share_counts(prices, portfolio_value: float, weights, redistribute: bool = True) -> np.ndarray:
+    """Whole number of shares per position
+
+    Positions without a valid price get 0 shares.
+    """
+    return share_counts_many(prices, [portfolio_value], weights, redistribute)[0]
+
+
+def share_counts_many(prices, portfolio_values, weights, redistribute: bool = True) -> np.ndarray:
+    """Whole number of shares per portfolio value (rows) and position (columns)
+
+    Every row equals share_counts of its portfolio value; all rows are
+    sized at once, the redistribution buys runs of positions for all
+    portfolios together.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    values = np.asarray(portfolio_values, dtype=np.float64)[:, None]
+    valid = np.isfinite(prices) & (prices > 0)
+    safe_prices = np.where(valid, prices, 1.0)
+
+    targets = values * weights
+    shares = np.where(valid, np.floor(targets / safe_prices), 0).astype(np.int64)
+    if not redistribute:
+        return shares
+
+    cash = values[:, 0] - (shares * np.where(valid, prices, 0)).sum(axis=1)
+    shortfall = np.where(valid, targets - shares * safe_prices, -np.inf)
+    # one pass from the largest shortfall, each position buys at most one more share
+    # while the cash lasts. A round buys the run of candidates (short positions the
+    # cash left can pay) whose summed prices fit; the one after it can't be paid
+    # anymore and the next round goes on with the candidates that still can.
+    order = np.argsort(-shortfall, axis=1, kind='stable')
+    sorted_prices = safe_prices[order]
+    # the short positions come first
+    short = np.arange(order.shape[1]) < (shortfall > 0).sum(axis=1)[:, None]
+    candidates = short & (sorted_prices <= cash[:, None])
+    candidate_prices = np.where(candidates, sorted_prices, 0.0)
+    fits = np.cumsum(candidate_prices, axis=1) <= cash[:, None]
+    cash -= (candidate_prices * fits).sum(axis=1)
+    rows, columns = np.nonzero(candidates & fits)
+    shares[rows, order[rows, columns]] += 1
+    # further rounds on the few candidates the cash left can still pay, cost is the
+    # cumulative price within each row
+    rows, columns = np.nonzero(candidates & ~fits & (sorted_prices <= cash[:, None]))
+    while len(rows):
+        candidate_prices = sorted_prices[rows, columns]
+        first = np.r_[True, rows[1:] != rows[:-1]]
+        cost = np.cumsum(candidate_prices)
+        cost -= (cost - candidate_prices)[first][np.cumsum(first) - 1]
+        fits = cost <= cash[rows]
+        shares[rows[fits], order[rows[fits], columns[fits]]] += 1
+        cash -= np.bincount(rows[fits], candidate_prices[fits], len(cash))
+        keep = ~fits & (candidate_prices <= cash[rows])
+        rows, columns = rows[keep], columns[keep]
+    return shares
+
+
+def position_weights(df: pd.DataFrame,
+                     weighting: str = 'equal',
+                     weight_column: str = None,
+                     ascending: bool = False) -> np.ndarray:
+    """Weight of every row of df for a weighting of WEIGHTINGS"""
+    match weighting:
+        case 'equal':
+            return equal_weights(len(df.index))
+        case 'market-cap':
+            return market_cap_weights(df[weight_column])
+        case 'score':
+            return score_weights(df[weight_column], ascending)
+        case _:
+            raise ValueError(f'Unknown weighting {weighting!r}, use one of {WEIGHTINGS}')
+
+
+def size_positions(df: pd.DataFrame,
+                   portfolio_value: float,
+                   shares_column: str,
+                   weighting: str = 'equal',
+                   weight_column: str = None,
+                   ascending: bool = False,
+                   redistribute: bool = True) -> pd.DataFrame:
+    """Fill shares_column of df with the number of shares to buy
+
+    weight_column holds the market capitalization or the score, for the
+    'market-cap' and 'score' weightings.
+    """
+    weights = position_weights(df, weighting, weight_column, ascending)
+    df[shares_column] = typed_column(shares_column,
+                                     share_counts(df['Price'], portfolio_value, weights, redistribute))
+    return df
+
+
+def read_portfolio_value(value: float = None) -> float:
+    """Return value, or ask the value of the portfolio until it is a number"""
+    while value is None:
+        portfolio_size = input("Enter the value of your portfolio:")
+        try:
+            value = float(portfolio_size)
+        except ValueError:
+            print("That's not a number! \n Try again:")
+    return value
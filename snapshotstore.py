@@ -0,0 +1,163 @@
+"""Dated columnar snapshots of fetched market data
+
+Every numeric field of a merged batch response is stored as one NumPy
+array per field, in a directory per day:
+    snapshots/2026-10-17/symbols.npy
+    snapshots/2026-10-17/quote.latestPrice.npy
+    snapshots/2026-10-17/advanced-stats.EBITDA.npy
+    ...
+Loading memory-maps the files, and only the requested columns are opened,
+so rescoring or a new strategy doesn't have to fetch and parse JSON again.
+Text fields (like a sector) are stored as fixed width unicode arrays.
+
+17-10-2026
+Arno Kemner
+"""
+import json
+import os
+from datetime import date
+
+import numpy as np  # The Numpy numerical computing library
+
+from ingest import to_float
+
+SNAPSHOT_ROOT = 'snapshots'
+
+
+def column_name(endpoint_type: str, key: str) -> str:
+    return f'{endpoint_type}.{key}'
+
+
+def flatten(data: dict, symbols: list, dtype=np.float64) -> dict:
+    """One array per (endpoint type, key) field of the batch response"""
+    empty = {}
+    payloads = [data.get(symbol) or empty for symbol in symbols]
+    fields = {}
+    for payload in payloads:
+        for endpoint_type, values in payload.items():
+            if isinstance(values, dict):
+                for key, value in values.items():
+                    if value is not None:
+                        fields.setdefault((endpoint_type, key), type(value))
+
+    columns = {}
+    for (endpoint_type, key), value_type in fields.items():
+        values = [(payload.get(endpoint_type) or empty).get(key) for payload in payloads]
+        if value_type is str:
+            columns[column_name(endpoint_type, key)] = np.array(
+                ['' if value is None else str(value) for value in values])
+        elif value_type in (int, float):
+            columns[column_name(endpoint_type, key)] = np.fromiter(
+                (to_float(value) for value in values), dtype=dtype, count=len(values))
+    return columns
+
+
+class Snapshot:
+    """Columns of one day, indexed by symbol"""
+
+    def __init__(self, day: str, symbols: np.ndarray, columns: dict):
+        self.day = day
+        self.symbols = symbols
+        self.columns = columns
+        self._positions = None
+
+    def positions(self, symbols) -> np.ndarray:
+        """Row of every symbol in this snapshot, -1 when it is not in it"""
+        if self._positions is None:
+            self._positions = {symbol: i for i, symbol in enumerate(self.symbols.tolist())}
+        return np.fromiter((self._positions.get(symbol, -1) for symbol in symbols),
+                           dtype=np.intp, count=len(symbols))
+
+    def take(self, symbols: list, fields: dict) -> dict:
+        """Arrays for a field spec {column: (endpoint type, key)}, ordered as symbols
+
+        Same result as ingest.parse_columns on the original batch response.
+        """
+        positions = self.positions(symbols)
+        found = positions >= 0
+        arrays = {}
+        for column, (endpoint_type, key) in fields.items():
+            result = np.full(len(symbols), np.nan)
+            source = self.columns.get(column_name(endpoint_type, key))
+            if source is not None:
+                result[found] = source[positions[found]]
+            arrays[column] = result
+        return arrays
+
+    def take_labels(self, symbols: list, field: tuple) -> np.ndarray:
+        """Object array of a text field, ordered as symbols, None when missing
+
+        Same result as ingest.parse_labels on the original batch response.
+        """
+        positions = self.positions(symbols)
+        labels = np.full(len(symbols), None, dtype=object)
+        source = self.columns.get(column_name(*field))
+        if source is not None and source.dtype.kind == 'U':
+            found = positions >= 0
+            labels[found] = source[positions[found]]
+            labels[labels == ''] = None
+        return labels
+
+
+class SnapshotStore:
+    """Directory of dated snapshots"""
+
+    def __init__(self, root: str = SNAPSHOT_ROOT):
+        self.root = root
+
+    def path(self, day: str) -> str:
+        return os.path.join(self.root, day)
+
+    def dates(self) -> list:
+        """Days with a stored snapshot, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(day for day in os.listdir(self.root)
+                      if os.path.exists(os.path.join(self.root, day, 'meta.json')))
+
+    def save(self, data: dict, symbols: list, day: str = None, dtype=np.float64) -> str:
+        """Store the batch response of symbols as the snapshot of day"""
+        day = day or date.today().isoformat()
+        return self.save_columns(np.array(list(symbols)), flatten(data, symbols, dtype), day)
+
+    def save_columns(self, symbols: np.ndarray, columns: dict, day: str) -> str:
+        path = self.path(day)
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'symbols.npy'), np.asarray(symbols, dtype=str))
+        for name, values in columns.items():
+            np.save(os.path.join(path, f'{name}.npy'), values)
+        # meta.json last, a snapshot without it is incomplete
+        with open(os.path.join(path, 'meta.json'), 'w') as file:
+            json.dump({'day': day, 'rows': len(symbols), 'columns': list(columns)}, file)
+        return path
+
+    def columns(self, day: str) -> list:
+        with open(os.path.join(self.path(day), 'meta.json')) as file:
+            return json.load(file)['columns']
+
+    def load(self, day: str = None, columns: list = None, mmap: bool = True) -> Snapshot:
+        """Open the snapshot of day (default the latest)
+
+        columns limits the loaded columns; with mmap the arrays are
+        memory-mapped read only instead of read in memory.
+        """
+        if day is None:
+            days = self.dates()
+            if not days:
+                raise FileNotFoundError(f'No snapshots in {self.root}')
+            day = days[-1]
+
+        path = self.path(day)
+        mmap_mode = 'r' if mmap else None
+        names = self.columns(day) if columns is None else columns
+        loaded = {}
+        for name in names:
+            file = os.path.join(path, f'{name}.npy')
+            if os.path.exists(file):
+                loaded[name] = np.load(file, mmap_mode=mmap_mode)
+        symbols = np.load(os.path.join(path, 'symbols.npy'))
+        return Snapshot(day, symbols, loaded)
+
+    def load_fields(self, fields: dict, day: str = None) -> Snapshot:
+        """Open only the columns of a field spec {column: (endpoint type, key)}"""
+        return self.load(day, [column_name(*field) for field in fields.values()])
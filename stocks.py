@@ -0,0 +1,177 @@
+"""Library API of the stock selecting strategies
+
+Runs the strategies in-process, without the prompts and files of the
+scripts:
+
+    import stocks
+    symbols = stocks.read_universe('sp_500_stocks.csv')
+    results = stocks.run(['momentum', 'value'], symbols, portfolio_value=1000000)
+    stocks.write_results(results, 'parquet', 'output')
+
+This module only imports the standard library. pandas and numpy are
+imported when a strategy runs, requests when something is not cached
+and xlsxwriter when a workbook is written, so the command line scripts
+answer --help and cache-only runs fast. The strategy functions and
+classes of the other modules are available here too, imported on first
+use: stocks.quant_value, stocks.MarketDataClient, ...
+
+17-10-2026
+Arno Kemner
+"""
+import csv
+import importlib
+from datetime import date
+
+import profiling
+
+# the keys of strategies.STRATEGIES and writeroutput.WRITERS, here so the
+# command line choices don't need pandas
+STRATEGY_NAMES = ['equal-weight', 'momentum', 'value']
+OUTPUT_FORMATS = ['excel', 'csv', 'parquet']
+
+# attribute: module it is imported from on first access
+_LAZY = {
+    'STRATEGIES': 'strategies',
+    'OUTPUTS': 'strategies',
+    'equal_weight': 'strategies',
+    'quant_momentum': 'strategies',
+    'quant_value': 'strategies',
+    'MarketDataClient': 'marketdata',
+    'ResponseCache': 'responsecache',
+    'SnapshotStore': 'snapshotstore',
+    'PriceHistory': 'pricehistory',
+    'Universe': 'universe',
+    'read_holdings': 'rebalance',
+    'rebalance': 'rebalance',
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name]), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def read_universe(path: str = 'sp_500_stocks.csv') -> list:
+    """Tickers of a universe CSV with a Ticker column
+
+    Symbols removed from a universe.Universe table are left out.
+    """
+    with open(path, newline='') as file:
+        return [row['Ticker'] for row in csv.DictReader(file)
+                if row.get('Status') != 'removed']
+
+
+def load_universe(path: str = 'sp_500_stocks.csv'):
+    """The universe.Universe symbol table of a table or plain ticker CSV"""
+    from universe import Universe
+    return Universe.load(path)
+
+
+def add_client_arguments(parser):
+    """The market data options of the command line scripts"""
+    parser.add_argument('--base-url',
+                        help='IEX endpoint, e.g. http://127.0.0.1:8000/stable for stubserver.py')
+
+
+def fetch(symbols: list, strategy_names: list, refresh: bool = False, client=None,
+          impute_by: str = None, base_url: str = None) -> dict:
+    """One fetch of everything the strategies need
+
+    Without a client the cached default client of base_url (default IEX
+    Cloud) is used. impute_by ('sector' or 'industry') also fetches the
+    labels to impute by.
+    """
+    from marketdata import MarketDataClient
+    from responsecache import ResponseCache
+    from strategies import endpoint_types
+
+    types = endpoint_types(strategy_names, impute_by)
+    if client is not None:
+        return client.fetch(symbols, types)
+    with ResponseCache(refresh=refresh) as cache, \
+            MarketDataClient(base_url=base_url, cache=cache) as client:
+        return client.fetch(symbols, types)
+
+
+def stream(path: str, strategy_names: list, refresh: bool = False, base_url: str = None):
+    """Chunk at a time fetch and ingest of the universe CSV, returns a Snapshot"""
+    from marketdata import MarketDataClient
+    from pipeline import read_universe as iter_universe, stream_snapshot
+    from responsecache import ResponseCache
+    from strategies import endpoint_types, fields
+
+    with ResponseCache(refresh=refresh) as cache, \
+            MarketDataClient(base_url=base_url, cache=cache) as client:
+        return stream_snapshot(client, iter_universe(path),
+                               endpoint_types(strategy_names), fields(strategy_names))
+
+
+def load_snapshot(day: str = None):
+    """A stored snapshot, default the latest"""
+    from snapshotstore import SnapshotStore
+    return SnapshotStore().load(day)
+
+
+def save_snapshot(data, symbols: list, day: str = None) -> str:
+    """Store fetched data (a batch response or a Snapshot) as the snapshot of day"""
+    from snapshotstore import SnapshotStore
+
+    store = SnapshotStore()
+    day = day or date.today().isoformat()
+    if hasattr(data, 'columns'):
+        return store.save_columns(data.symbols, data.columns, day)
+    return store.save(data, symbols, day)
+
+
+def run_strategies(data, symbols: list, strategy_names: list, portfolio_value: float,
+                   **options) -> dict:
+    """Run the strategies on fetched data, returns {strategy name: dataframe}
+
+    options (like weighting) are passed to every strategy. Symbols
+    missing from data are skipped, also in the returns arrays.
+    """
+    from strategies import STRATEGIES
+    from universe import present_mask
+
+    found = present_mask(data, symbols)
+    profiling.add('missing_symbols', len(symbols) - int(found.sum()))
+    symbols = [symbol for symbol, present in zip(symbols, found.tolist()) if present]
+    if options.get('returns') is not None:
+        # returns are aligned to all symbols, keep those of the present ones
+        options['returns'] = {column: values[found] for column, values in options['returns'].items()}
+    results = {}
+    for name in strategy_names:
+        with profiling.stage(name):
+            results[name] = STRATEGIES[name](data, symbols, portfolio_value, **options)
+    return results
+
+
+def run(strategy_names, symbols: list, portfolio_value: float,
+        refresh: bool = False, client=None, **options) -> dict:
+    """Fetch and run one or more strategies, returns {strategy name: dataframe}"""
+    if isinstance(strategy_names, str):
+        strategy_names = [strategy_names]
+    data = fetch(symbols, strategy_names, refresh, client, options.get('impute_by'))
+    return run_strategies(data, symbols, strategy_names, portfolio_value, **options)
+
+
+def write_results(results: dict, output_format: str = 'excel', path: str = None):
+    """Write the strategy results
+
+    Without path every strategy gets its own workbook; with path all
+    sheets go into that workbook, or that directory for csv and parquet.
+    """
+    from strategies import OUTPUTS
+    from writeroutput import get_writer
+
+    if path is None and output_format != 'excel':
+        path = 'output'
+    if path is None:
+        for name, df in results.items():
+            with get_writer('excel', OUTPUTS[name]['filepath']) as writer:
+                writer.write(df, OUTPUTS[name]['sheet_name'], OUTPUTS[name]['column_formats'])
+        return
+    with get_writer(output_format, path) as writer:
+        for name, df in results.items():
+            writer.write(df, OUTPUTS[name]['sheet_name'], OUTPUTS[name]['column_formats'])
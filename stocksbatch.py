@@ -0,0 +1,304 @@
+"""Batch mode: the strategies for many accounts in one run
+
+    python stocksbatch.py jobs.csv
+    python stocksbatch.py jobs.csv --output-format parquet --output-dir output/accounts
+
+The jobs file is a CSV with one job per row, the Weighting column is
+optional (default equal; market-cap for equal-weight, score for
+momentum and value):
+
+    Account,Universe,Strategy,Portfolio Value,Weighting
+    ACC-001,sp_500_stocks.csv,momentum,1000000,equal
+    ACC-001,sp_500_stocks.csv,value,250000,score
+    ACC-002,universe/universe.csv,value,50000,equal
+
+The market data of all jobs is fetched once: every symbol of every
+universe once, with the endpoint types of the strategies run on it.
+Every distinct (universe, strategy) is scored once, and the shares of
+all jobs with the same picks and weighting are sized together for all
+their portfolio values (sizing.share_counts_many), so 100 accounts cost
+about as much as one. Every account gets one workbook with a sheet per
+job, or one CSV or Parquet file with a row per position of all its jobs.
+
+With --holdings (a CSV of Account, Ticker, Shares) the buy and sell
+orders from the current holdings to the target shares of all jobs of an
+account are added (rebalance.py): an Orders sheet, or an <account>_orders
+file next to the account file.
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import csv
+import os
+
+import profiling
+import stocks
+
+JOB_COLUMNS = ['Account', 'Universe', 'Strategy', 'Portfolio Value']
+OUTPUT_DIR = os.path.join('output', 'accounts')
+
+
+def read_jobs(path: str) -> list:
+    """The jobs of a jobs CSV as dicts, checked line by line"""
+    from strategies import STRATEGY_WEIGHTINGS
+
+    jobs = []
+    with open(path, newline='') as file:
+        reader = csv.DictReader(file)
+        missing = [column for column in JOB_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f'{path}: missing column(s) {missing}')
+        for line, row in enumerate(reader, start=2):
+            strategy = row['Strategy'].strip()
+            weighting = (row.get('Weighting') or 'equal').strip()
+            try:
+                portfolio_value = float(row['Portfolio Value'])
+            except ValueError:
+                raise ValueError(f'{path} line {line}: Portfolio Value must be a number') from None
+            if strategy not in stocks.STRATEGY_NAMES:
+                raise ValueError(f'{path} line {line}: Strategy must be one of {stocks.STRATEGY_NAMES}')
+            if weighting not in STRATEGY_WEIGHTINGS[strategy]:
+                raise ValueError(f'{path} line {line}: Weighting of {strategy} must be one of '
+                                 f'{list(STRATEGY_WEIGHTINGS[strategy])}')
+            jobs.append({'account': row['Account'].strip(),
+                         'universe': row['Universe'].strip(),
+                         'strategy': strategy,
+                         'portfolio_value': portfolio_value,
+                         'weighting': weighting})
+    return jobs
+
+
+def fetch_jobs(jobs: list, client) -> tuple:
+    """One fetch of the data of all jobs, returns (data, {universe: present symbols})
+
+    Symbols are grouped by the strategies run on them, so every symbol
+    is fetched once with just the endpoint types it needs.
+    """
+    from universe import present_symbols
+
+    universes = {path: stocks.load_universe(path).members() for path in
+                 dict.fromkeys(job['universe'] for job in jobs)}
+    strategies_by_symbol = {}
+    for job in jobs:
+        for symbol in universes[job['universe']]:
+            strategies_by_symbol.setdefault(symbol, set()).add(job['strategy'])
+
+    symbols_by_strategies = {}
+    for symbol, strategy_names in strategies_by_symbol.items():
+        symbols_by_strategies.setdefault(tuple(sorted(strategy_names)), []).append(symbol)
+    data = {}
+    for strategy_names, symbols in symbols_by_strategies.items():
+        for symbol, payloads in stocks.fetch(symbols, list(strategy_names), client=client).items():
+            data.setdefault(symbol, {}).update(payloads)
+    profiling.add('rows', len(strategies_by_symbol))
+    return data, {path: present_symbols(data, symbols) for path, symbols in universes.items()}
+
+
+def score_jobs(data: dict, universes: dict, jobs: list, n: int = 50) -> dict:
+    """The picks of every distinct (universe, strategy) of the jobs"""
+    from strategies import PICKS
+
+    picks = {}
+    for job in jobs:
+        key = (job['universe'], job['strategy'])
+        if key in picks:
+            continue
+        with profiling.stage(job['strategy']):
+            if job['strategy'] == 'equal-weight':
+                picks[key] = PICKS['equal-weight'](data, universes[job['universe']])
+            else:
+                picks[key] = PICKS[job['strategy']](data, universes[job['universe']], n)
+    return picks
+
+
+def size_jobs(picks: dict, jobs: list) -> list:
+    """The sized positions of every job, in the order of jobs
+
+    The jobs with the same picks and weighting are sized in one step.
+    """
+    from schema import typed_column
+    from sizing import position_weights, share_counts_many
+    from strategies import SIZING
+
+    groups = {}
+    for i, job in enumerate(jobs):
+        groups.setdefault((job['universe'], job['strategy'], job['weighting']), []).append(i)
+
+    results = [None] * len(jobs)
+    for (universe, strategy, weighting), indexes in groups.items():
+        df = picks[(universe, strategy)]
+        sizing = SIZING[strategy]
+        weights = position_weights(df, weighting, sizing['weight_column'],
+                                   sizing.get('ascending', False))
+        shares = share_counts_many(df['Price'], [jobs[i]['portfolio_value'] for i in indexes],
+                                   weights)
+        for row, i in enumerate(indexes):
+            results[i] = df.copy()
+            results[i][sizing['shares_column']] = typed_column(sizing['shares_column'], shares[row])
+    return results
+
+
+def run_batch(jobs: list, client=None, n: int = 50) -> dict:
+    """Fetch, score and size all jobs, returns {account: [(job, dataframe)]}"""
+    from marketdata import MarketDataClient
+    from responsecache import ResponseCache
+
+    with profiling.stage('fetch'):
+        if client is None:
+            with ResponseCache() as cache, MarketDataClient(cache=cache) as client:
+                data, universes = fetch_jobs(jobs, client)
+        else:
+            data, universes = fetch_jobs(jobs, client)
+    with profiling.stage('picks'):
+        picks = score_jobs(data, universes, jobs, n)
+    with profiling.stage('size', rows=len(jobs)):
+        sized = size_jobs(picks, jobs)
+
+    accounts = {}
+    for job, df in zip(jobs, sized):
+        accounts.setdefault(job['account'], []).append((job, df))
+    return accounts
+
+
+def account_orders(accounts: dict, holdings, band: float = 0.0, turnover_cap: float = None) -> dict:
+    """The rebalance orders of every account, {account: dataframe}
+
+    The target shares of all jobs of an account are summed per ticker,
+    the account value is the sum of its portfolio values.
+    """
+    import numpy as np  # The Numpy numerical computing library
+    import pandas as pd  # The Pandas data science library
+    from rebalance import rebalance
+    from strategies import SIZING
+
+    frames = [(account, job, df) for account, results in accounts.items() for job, df in results]
+    targets = pd.DataFrame({
+        'Account': np.repeat([account for account, _, _ in frames], [len(df) for _, _, df in frames]),
+        'Ticker': np.concatenate([df['Ticker'].to_numpy(dtype=object) for _, _, df in frames]),
+        'Price': np.concatenate([df['Price'].to_numpy(dtype=np.float64) for _, _, df in frames]),
+        'Target Shares': np.concatenate([df[SIZING[job['strategy']]['shares_column']].to_numpy(
+                                             dtype=np.int64) for _, job, df in frames]),
+    })
+    values = {}
+    for account, job, _ in frames:
+        values[account] = values.get(account, 0.0) + job['portfolio_value']
+    orders = rebalance(targets, holdings, values, band=band, turnover_cap=turnover_cap)
+    return {account: df.drop(columns='Account').reset_index(drop=True)
+            for account, df in orders.groupby('Account', sort=False)}
+
+
+def account_table(results: list):
+    """All positions of an account in one table, with the job in front"""
+    import pandas as pd  # The Pandas data science library
+    from strategies import SIZING
+
+    frames = []
+    for job, df in results:
+        df = df.rename(columns={SIZING[job['strategy']]['shares_column']: 'Number of Shares to Buy'})
+        df.insert(0, 'Universe', job['universe'])
+        df.insert(1, 'Strategy', job['strategy'])
+        df.insert(2, 'Weighting', job['weighting'])
+        df.insert(3, 'Portfolio Value', job['portfolio_value'])
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_accounts(accounts: dict, output_format: str = 'excel', output_dir: str = OUTPUT_DIR,
+                   orders: dict = None) -> list:
+    """One workbook (a sheet per job), CSV or Parquet file per account, returns the paths
+
+    orders ({account: dataframe}) adds an Orders sheet or orders file.
+    """
+    from rebalance import ORDERS_OUTPUT
+    from strategies import OUTPUTS
+    from writerexcel import ExcelWriter
+    from writeroutput import file_name
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for account, results in accounts.items():
+        if output_format == 'excel':
+            path = os.path.join(output_dir, f'{file_name(account)}.xlsx')
+            sheet_names = set()
+            with ExcelWriter(path) as writer:
+                for job, df in results:
+                    output = OUTPUTS[job['strategy']]
+                    # an account can run a strategy on several universes
+                    sheet_name, number = output['sheet_name'], 1
+                    while sheet_name in sheet_names:
+                        number += 1
+                        sheet_name = f"{output['sheet_name']} {number}"
+                    sheet_names.add(sheet_name)
+                    writer.write(df, sheet_name, output['column_formats'])
+                if orders is not None and account in orders:
+                    writer.write(orders[account], ORDERS_OUTPUT['sheet_name'],
+                                 ORDERS_OUTPUT['column_formats'])
+            paths.append(path)
+        else:
+            extension = {'csv': '.csv', 'parquet': '.parquet'}[output_format]
+            path = os.path.join(output_dir, f'{file_name(account)}{extension}')
+            table = account_table(results)
+            if output_format == 'csv':
+                table.to_csv(path, index=False)
+            else:
+                table.to_parquet(path, index=False)
+            paths.append(path)
+            if orders is not None and account in orders:
+                orders_path = os.path.join(output_dir, f'{file_name(account)}_orders{extension}')
+                if output_format == 'csv':
+                    orders[account].to_csv(orders_path, index=False)
+                else:
+                    orders[account].to_parquet(orders_path, index=False)
+                paths.append(orders_path)
+    return paths
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Run the strategies for all accounts of a jobs file')
+    parser.add_argument('jobs', help='CSV with the columns ' + ', '.join(JOB_COLUMNS)
+                                     + ' and optionally Weighting')
+    parser.add_argument('--refresh', action='store_true',
+                        help='ignore cached IEX responses and fetch everything again')
+    parser.add_argument('--top', type=int, default=50,
+                        help='number of stocks picked by the momentum and value strategies')
+    parser.add_argument('--output-format', choices=stocks.OUTPUT_FORMATS, default='excel')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--holdings',
+                        help='CSV of the current Account, Ticker, Shares to compute the orders from')
+    parser.add_argument('--band', type=float, default=0.0,
+                        help='no trade when an order is worth less than this fraction of the account')
+    parser.add_argument('--turnover-cap', type=float,
+                        help='at most this fraction of the account value bought plus sold')
+    stocks.add_client_arguments(parser)
+    profiling.add_arguments(parser)
+    return parser
+
+
+def main(argv: list = None):
+    args = build_parser().parse_args(argv)
+    profiling.start_run('batch', args)
+
+    from marketdata import MarketDataClient
+    from responsecache import ResponseCache
+
+    jobs = read_jobs(args.jobs)
+    with ResponseCache(refresh=args.refresh) as cache, \
+            MarketDataClient(base_url=args.base_url, cache=cache) as client:
+        accounts = run_batch(jobs, client, args.top)
+    orders = None
+    if args.holdings:
+        from rebalance import read_holdings
+        with profiling.stage('rebalance'):
+            orders = account_orders(accounts, read_holdings(args.holdings), args.band,
+                                    args.turnover_cap)
+    with profiling.stage('export', rows=len(jobs)):
+        paths = write_accounts(accounts, args.output_format, args.output_dir, orders)
+    print(f'{len(jobs)} jobs of {len(accounts)} accounts written to {args.output_dir}'
+          f' ({len(paths)} files)')
+
+    profiling.finish_run('batch', args)
+
+
+if __name__ == '__main__':
+    main()
@@ -16,87 +16,55 @@ C:\\Users\\i154424\\Documents\\Projects\\test\\stocksdata\\venv\\Lib\\site-packa
 Arno Kemner
 """
 
-import math  # The Python math module
-
-import pandas as pd  # The Pandas data science library
-import requests  # The requests library for HTTP requests in Python
-
-from config import IEX_CLOUD_API_TOKEN
-from writerexcel import write_to_excel
-
-# removed some unexisting tickers: DISCA, HFC, VIAC, WLTW
-stocks = pd.read_csv('sp_500_stocks.csv')
-
-# symbol = 'AAPL'
-# api_url = f'https://sandbox.iexapis.com/stable/stock/{symbol}/quote?token={IEX_CLOUD_API_TOKEN}'
-# data = requests.get(api_url).json()
-# print(data)
-
-
-def chunks(lst, n):
-    """Yield successive n-sized chunks from lst.
-
-    Function sourced from
-    https://stackoverflow.com/questions/312443/how-do-you-split-a-list-into-evenly-sized-chunks
-    """
-    for i in range(0, len(lst), n):
-        yield lst[i:i + n]
-
-
-symbol_groups = list(chunks(stocks['Ticker'], 100))
-symbol_strings = []
-for i in range(0, len(symbol_groups)):
-    symbol_strings.append(','.join(symbol_groups[i]))
-
-my_columns = ['Ticker',
-              'Price',
-              'Market Capitalization',
-              'Number Of Shares to Buy']
-
-
-# Adding Stocks Data to a Pandas DataFrame
-# Looping Through Tickers in chunk List of Stocks
-final_dataframe = pd.DataFrame(columns=my_columns)
-for symbol_string in symbol_strings:
-    batch_api_call_url = f'https://sandbox.iexapis.com/stable/stock/market/batch/?types=quote&symbols={symbol_string}&token={IEX_CLOUD_API_TOKEN}'
-    data = requests.get(batch_api_call_url).json()
-    for symbol in symbol_string.split(','):
-        new_data = pd.DataFrame([[symbol,
-                                 data[symbol]['quote']['latestPrice'],
-                                 data[symbol]['quote']['marketCap'],
-                                 'N/A']],
-                                columns=my_columns)
-        final_dataframe = pd.concat([final_dataframe, new_data],
-                                    ignore_index=True,
-                                    axis=0)
-
-# drop rows with None
-final_dataframe = final_dataframe.dropna().reset_index()
-# print(final_dataframe.loc[[135]])
-
-# Calculating the Number of Shares to Buy
-portfolio_size = input("Enter the value of your portfolio:")
-try:
-    val = float(portfolio_size)
-except ValueError:
-    print("That's not a number! \n Try again:")
-    portfolio_size = input("Enter the value of your portfolio:")
-
-position_size = float(portfolio_size) / len(final_dataframe.index)
-for i in range(0, len(final_dataframe['Ticker'])):
-    final_dataframe.loc[i, 'Number Of Shares to Buy'] = math.floor(
-        position_size / final_dataframe['Price'][i])
-print(final_dataframe)
-
-# export to excel
-column_formats = {
-    'A': ['Ticker', 'string'],
-    'B': ['Price', 'dollar'],
-    'C': ['Market Capitalization', 'dollar'],
-    'D': ['Number of Shares to Buy', 'integer']
-}
-
-write_to_excel(df=final_dataframe,
-               filepath='output\\recommended_trades.xlsx',
-               sheet_name='Recommended Trades',
-               column_formats=column_formats)
+import argparse
+
+import profiling
+import stocks
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Equal-weight S&P 500 index fund')
+    parser.add_argument('--refresh', action='store_true',
+                        help='ignore cached IEX responses and fetch everything again')
+    parser.add_argument('--portfolio-value', type=float,
+                        help='value of your portfolio, asked for when not given')
+    parser.add_argument('--weighting', choices=['equal', 'market-cap'], default='equal',
+                        help='how the portfolio value is divided over the stocks')
+    stocks.add_client_arguments(parser)
+    profiling.add_arguments(parser)
+    return parser
+
+
+def main(argv: list = None):
+    args = build_parser().parse_args(argv)
+    profiling.start_run('equal-weight', args)
+
+    # removed some unexisting tickers: DISCA, HFC, VIAC, WLTW
+    symbols = stocks.read_universe('sp_500_stocks.csv')
+
+    # symbol = 'AAPL'
+    # api_url = f'https://sandbox.iexapis.com/stable/stock/{symbol}/quote?token={IEX_CLOUD_API_TOKEN}'
+    # data = requests.get(api_url).json()
+    # print(data)
+
+    # Fetching all chunks of 100 symbols concurrently
+    with profiling.stage('fetch', rows=len(symbols)):
+        data = stocks.fetch(symbols, ['equal-weight'], args.refresh, base_url=args.base_url)
+
+    # Selecting the Stocks and Calculating the Number of Shares to Buy
+    from sizing import read_portfolio_value
+
+    portfolio_value = read_portfolio_value(args.portfolio_value)
+    results = stocks.run_strategies(data, symbols, ['equal-weight'], portfolio_value,
+                                    weighting=args.weighting)
+    print(results['equal-weight'])
+
+    # export to excel
+    with profiling.stage('export', rows=len(results['equal-weight'])):
+        stocks.write_results(results)
+
+    profiling.finish_run('equal-weight', args)
+
+
+if __name__ == '__main__':
+    main()
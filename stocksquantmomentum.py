@@ -16,178 +16,113 @@ C:\\Users\\i154424\\Documents\\Projects\\test\\stocksdata\\venv\\Lib\\site-packa
 Arno Kemner
 """
 
-import math
-from statistics import mean
+import argparse
+
+import profiling
+import stocks
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Quantitative momentum strategy')
+    parser.add_argument('--refresh', action='store_true',
+                        help='ignore cached IEX responses and fetch everything again')
+    parser.add_argument('--portfolio-value', type=float,
+                        help='value of your portfolio, asked for when not given')
+    parser.add_argument('--weighting', choices=['equal', 'score'], default='equal',
+                        help='how the portfolio value is divided over the stocks')
+    parser.add_argument('--impute', choices=['mean', 'median', 'winsorized'], default='mean',
+                        help='statistic that replaces missing metrics')
+    parser.add_argument('--impute-by', choices=['sector', 'industry'],
+                        help='take the statistic within the sector or industry of the stock')
+    parser.add_argument('--price-history', action='store_true',
+                        help='compute the returns from the locally stored daily closes instead of IEX stats')
+    parser.add_argument('--skip-days', type=int, default=0,
+                        help='with --price-history: leave out the last days, e.g. 21 for 12-1 momentum')
+    parser.add_argument('--volatility-adjusted', action='store_true',
+                        help='with --price-history: divide the returns by their volatility')
+    stocks.add_client_arguments(parser)
+    profiling.add_arguments(parser)
+    return parser
+
+
+def fetch_with_history(symbols: list, refresh: bool, skip_days: int, volatility_adjusted: bool,
+                       impute_by: str = None, base_url: str = None) -> tuple:
+    """The quotes, and the returns computed from the updated price history"""
+    from ingest import GROUP_FIELDS
+    from marketdata import MarketDataClient
+    from pricehistory import PriceHistory
+    from responsecache import ResponseCache
+
+    types = ['quote'] if impute_by is None else ['quote', GROUP_FIELDS[impute_by][0]]
+    with ResponseCache(refresh=refresh) as cache, \
+            MarketDataClient(base_url=base_url, cache=cache) as client:
+        data = client.fetch(symbols, types)
+        history = PriceHistory()
+        history.update(client, symbols)
+        returns = history.latest_returns(symbols,
+                                         skip=skip_days,
+                                         volatility_adjusted=volatility_adjusted)
+    return data, returns
+
+
+def main(argv: list = None):
+    args = build_parser().parse_args(argv)
+    profiling.start_run('momentum', args)
+
+    # removed some unexisting tickers: DISCA, HFC, VIAC, WLTW
+    symbols = stocks.read_universe('sp_500_stocks.csv')
+
+    # symbol = 'AAPL'
+    # api_url = f'https://sandbox.iexapis.com/stable/stock/{symbol}/stats?token={IEX_CLOUD_API_TOKEN}'
+    # data = requests.get(api_url).json()
+    # print(data)
+
+    # Fetching all chunks of 100 symbols concurrently
+    # with the price history only the quotes and the closes since the last run are fetched
+    returns = None
+    with profiling.stage('fetch', rows=len(symbols)):
+        if args.price_history:
+            data, returns = fetch_with_history(symbols, args.refresh, args.skip_days,
+                                               args.volatility_adjusted, args.impute_by,
+                                               args.base_url)
+        else:
+            data = stocks.fetch(symbols, ['momentum'], args.refresh, impute_by=args.impute_by,
+                                base_url=args.base_url)
 
-import pandas as pd  # The Pandas data science library
-import requests  # The requests library for HTTP requests in Python
-from scipy import stats  # The SciPy stats module
-
-from config import IEX_CLOUD_API_TOKEN
-from writerexcel import write_to_excel
-
-# removed some unexisting tickers: DISCA, HFC, VIAC, WLTW
-stocks = pd.read_csv('sp_500_stocks.csv')
-
-# symbol = 'AAPL'
-# api_url = f'https://sandbox.iexapis.com/stable/stock/{symbol}/stats?token={IEX_CLOUD_API_TOKEN}'
-# data = requests.get(api_url).json()
-# print(data)
+    """
+    Real-world quantitative investment firms differentiate between "high quality" and "low quality" momentum stocks:
 
+    High-quality momentum stocks show "slow and steady" outperformance over long periods of time
+    Low-quality momentum stocks might not show any momentum for a long time, and then surge upwards.
+    The reason why high-quality momentum stocks are preferred is because low-quality momentum can often be cause by short-term news that is unlikely to be repeated in the future (such as an FDA approval for a biotechnology company).
 
-def chunks(lst, n):
-    """Yield successive n-sized chunks from lst.
+    To identify high-quality momentum, we're going to build a strategy that selects stocks from the highest percentiles of:
 
-    Function sourced from
-    https://stackoverflow.com/questions/312443/how-do-you-split-a-list-into-evenly-sized-chunks
+    1-month price returns
+    3-month price returns
+    6-month price returns
+    1-year price returns
+    Let's start by building our DataFrame. You'll notice that I use the abbreviation hqm often. It stands for high-quality momentum
     """
-    for i in range(0, len(lst), n):
-        yield lst[i:i + n]
 
+    # Selecting the Stocks and Calculating the Number of Shares to Buy
+    from sizing import read_portfolio_value
 
-symbol_groups = list(chunks(stocks['Ticker'], 100))
-symbol_strings = []
-for i in range(0, len(symbol_groups)):
-    symbol_strings.append(','.join(symbol_groups[i]))
+    portfolio_value = read_portfolio_value(args.portfolio_value)
+    results = stocks.run_strategies(data, symbols, ['momentum'], portfolio_value,
+                                    weighting=args.weighting,
+                                    returns=returns,
+                                    impute=args.impute,
+                                    impute_by=args.impute_by)
+    print(results['momentum'])
+    print('Missing values imputed per column:', results['momentum'].attrs['imputed'])
 
-# Adding Stocks Data to a Pandas DataFrame
-# Looping Through Tickers in chunk List of Stocks
+    # export to excel
+    with profiling.stage('export', rows=len(results['momentum'])):
+        stocks.write_results(results)
 
-"""
-Real-world quantitative investment firms differentiate between "high quality" and "low quality" momentum stocks:
-
-High-quality momentum stocks show "slow and steady" outperformance over long periods of time
-Low-quality momentum stocks might not show any momentum for a long time, and then surge upwards.
-The reason why high-quality momentum stocks are preferred is because low-quality momentum can often be cause by short-term news that is unlikely to be repeated in the future (such as an FDA approval for a biotechnology company).
+    profiling.finish_run('momentum', args)
 
-To identify high-quality momentum, we're going to build a strategy that selects stocks from the highest percentiles of:
 
-1-month price returns
-3-month price returns
-6-month price returns
-1-year price returns
-Let's start by building our DataFrame. You'll notice that I use the abbreviation hqm often. It stands for high-quality momentum
-"""
-hqm_columns = [
-    'Ticker',
-    'Price',
-    'Number of Shares to Buy',
-    'One-Year Price Return',
-    'One-Year Return Percentile',
-    'Six-Month Price Return',
-    'Six-Month Return Percentile',
-    'Three-Month Price Return',
-    'Three-Month Return Percentile',
-    'One-Month Price Return',
-    'One-Month Return Percentile',
-    'HQM Score'
-]
-
-hqm_dataframe = pd.DataFrame(columns=hqm_columns)
-
-for symbol_string in symbol_strings:
-    #     print(symbol_strings)
-    batch_api_call_url = f'https://sandbox.iexapis.com/stable/stock/market/batch/?types=stats,quote&symbols={symbol_string}&token={IEX_CLOUD_API_TOKEN}'
-    data = requests.get(batch_api_call_url).json()
-    for symbol in symbol_string.split(','):
-        new_data = pd.DataFrame([[symbol,
-                                  data[symbol]['quote']['latestPrice'],
-                                  'N/A',
-                                  data[symbol]['stats']['year1ChangePercent'],
-                                  'N/A',
-                                  data[symbol]['stats']['month6ChangePercent'],
-                                  'N/A',
-                                  data[symbol]['stats']['month3ChangePercent'],
-                                  'N/A',
-                                  data[symbol]['stats']['month1ChangePercent'],
-                                  'N/A',
-                                  'N/A'
-                                  ]],
-                                columns=hqm_columns)
-        hqm_dataframe = pd.concat([hqm_dataframe, new_data],
-                                  ignore_index=True,
-                                  axis=0)
-
-# print(hqm_dataframe.columns)
-print(hqm_dataframe)
-
-# drop rows with None
-# hqm_dataframe = hqm_dataframe.dropna().reset_index()
-# hqm_dataframe = hqm_dataframe.mask(hqm_dataframe.eq('None')).dropna().reset_index()
-for column in ['One-Year Price Return', 'Six-Month Price Return', 'Three-Month Price Return',  'One-Month Price Return']:
-    hqm_dataframe[column].fillna(hqm_dataframe[column].mean(), inplace=True)
-
-
-# Calculating Momentum Percentiles
-time_periods = [
-    'One-Year',
-    'Six-Month',
-    'Three-Month',
-    'One-Month'
-]
-
-for row in hqm_dataframe.index:
-    for time_period in time_periods:
-        col_percentile = f'{time_period} Return Percentile'
-        col_pricereturn = f'{time_period} Price Return'
-        hqm_dataframe.loc[row, col_percentile] = stats.percentileofscore(
-            hqm_dataframe[col_pricereturn],
-            hqm_dataframe.loc[row, col_pricereturn]
-        )/100
-
-# Print each percentile score to make sure it was calculated properly
-for time_period in time_periods:
-    print(hqm_dataframe[f'{time_period} Return Percentile'])
-
-# Print the entire DataFrame
-# print(hqm_dataframe)
-
-# Calculating the HQM Score
-for row in hqm_dataframe.index:
-    momentum_percentiles = []
-    for time_period in time_periods:
-        momentum_percentiles.append(
-            hqm_dataframe.loc[row, f'{time_period} Return Percentile'])
-    hqm_dataframe.loc[row, 'HQM Score'] = mean(momentum_percentiles)
-
-# Selecting the 50 Best Momentum Stocks
-hqm_dataframe = hqm_dataframe.sort_values(
-    by='HQM Score', ascending=False, ignore_index=True)
-hqm_dataframe = hqm_dataframe[:51]
-
-# Calculating the Number of Shares to Buy
-portfolio_size = input("Enter the value of your portfolio:")
-try:
-    val = float(portfolio_size)
-except ValueError:
-    print("That's not a number! \n Try again:")
-    portfolio_size = input("Enter the value of your portfolio:")
-
-position_size = float(portfolio_size) / len(hqm_dataframe.index)
-for i in range(0, len(hqm_dataframe['Ticker'])):
-    hqm_dataframe.loc[i, 'Number of Shares to Buy'] = math.floor(
-        position_size / hqm_dataframe['Price'][i])
-hqm_dataframe
-
-print(hqm_dataframe)
-
-# export to excel
-column_formats = {
-    'A': ['Ticker', 'string'],
-    'B': ['Price', 'dollar'],
-    'C': ['Number of Shares to Buy', 'integer'],
-    'D': ['One-Year Price Return', 'percent'],
-    'E': ['One-Year Return Percentile', 'percent'],
-    'F': ['Six-Month Price Return', 'percent'],
-    'G': ['Six-Month Return Percentile', 'percent'],
-    'H': ['Three-Month Price Return', 'percent'],
-    'I': ['Three-Month Return Percentile', 'percent'],
-    'J': ['One-Month Price Return', 'percent'],
-    'K': ['One-Month Return Percentile', 'percent'],
-    'L': ['HQM Score', 'integer']
-}
-
-write_to_excel(df=hqm_dataframe,
-               filepath='output\\momentum_strategy.xlsx',
-               sheet_name='Momentum Strategy',
-               column_formats=column_formats)
+if __name__ == '__main__':
+    main()
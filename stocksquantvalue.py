@@ -18,216 +18,95 @@ C:\\Users\\i154424\\Documents\\Projects\\test\\stocksdata\\venv\\Lib\\site-packa
 Arno Kemner
 """
 
-import math
-from statistics import mean
+import argparse
+
+import profiling
+import stocks
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Quantitative value strategy')
+    parser.add_argument('--refresh', action='store_true',
+                        help='ignore cached IEX responses and fetch everything again')
+    parser.add_argument('--portfolio-value', type=float,
+                        help='value of your portfolio, asked for when not given')
+    parser.add_argument('--weighting', choices=['equal', 'score'], default='equal',
+                        help='how the portfolio value is divided over the stocks')
+    parser.add_argument('--impute', choices=['mean', 'median', 'winsorized'], default='mean',
+                        help='statistic that replaces missing metrics')
+    parser.add_argument('--impute-by', choices=['sector', 'industry'],
+                        help='take the statistic within the sector or industry of the stock')
+    stocks.add_client_arguments(parser)
+    profiling.add_arguments(parser)
+    return parser
+
+
+def main(argv: list = None):
+    args = build_parser().parse_args(argv)
+    profiling.start_run('value', args)
+
+    # removed some unexisting tickers: DISCA, HFC, VIAC, WLTW
+    symbols = stocks.read_universe('sp_500_stocks.csv')
+
+    # symbol = 'AAPL'
+    # api_url = f'https://sandbox.iexapis.com/stable/stock/{symbol}/quote?token={IEX_CLOUD_API_TOKEN}'
+    # data = requests.get(api_url).json()
+    # print(data)
+
+    # Fetching all chunks of 100 symbols concurrently
+    with profiling.stage('fetch', rows=len(symbols)):
+        data = stocks.fetch(symbols, ['value'], args.refresh, impute_by=args.impute_by,
+                            base_url=args.base_url)
 
-import numpy as np  # The Numpy numerical computing library
-import pandas as pd  # The Pandas data science library
-import requests  # The requests library for HTTP requests in Python
-from scipy import stats  # The SciPy stats module
+    """
+    Every valuation metric has certain flaws.
 
-from config import IEX_CLOUD_API_TOKEN
-from writerexcel import write_to_excel
+    For example, the price-to-earnings ratio doesn't work well with stocks with negative earnings.
 
-# removed some unexisting tickers: DISCA, HFC, VIAC, WLTW
-stocks = pd.read_csv('sp_500_stocks.csv')
+    Similarly, stocks that buyback their own shares are difficult to value using the price-to-book ratio.
 
-# symbol = 'AAPL'
-# api_url = f'https://sandbox.iexapis.com/stable/stock/{symbol}/quote?token={IEX_CLOUD_API_TOKEN}'
-# data = requests.get(api_url).json()
-# print(data)
+    Investors typically use a composite basket of valuation metrics to build robust quantitative value strategies. 
+    In this section, we will filter for stocks with the lowest percentiles on the following metrics:
 
+    Price-to-earnings ratio
+    Price-to-book ratio
+    Price-to-sales ratio
+    Enterprise Value divided by Earnings Before Interest, Taxes, Depreciation, and Amortization (EV/EBITDA)
+    Enterprise Value divided by Gross Profit (EV/GP)
 
-def chunks(lst, n):
-    """Yield successive n-sized chunks from lst.
+    Some of these metrics aren't provided directly by the IEX Cloud API, and must be computed after pulling raw data. 
+    We'll start by calculating each data point from scratch.
 
-    Function sourced from
-    https://stackoverflow.com/questions/312443/how-do-you-split-a-list-into-evenly-sized-chunks
+    rv often. It stands for robust value
     """
-    for i in range(0, len(lst), n):
-        yield lst[i:i + n]
-
-
-symbol_groups = list(chunks(stocks['Ticker'], 100))
-symbol_strings = []
-for i in range(0, len(symbol_groups)):
-    symbol_strings.append(','.join(symbol_groups[i]))
-
-# Adding Stocks Data to a Pandas DataFrame
-# Looping Through Tickers in chunk List of Stocks
-
-"""
-Every valuation metric has certain flaws.
 
-For example, the price-to-earnings ratio doesn't work well with stocks with negative earnings.
+    """
+    Dealing with missing data is an important topic in data science.
 
-Similarly, stocks that buyback their own shares are difficult to value using the price-to-book ratio.
+    There are two main approaches:
 
-Investors typically use a composite basket of valuation metrics to build robust quantitative value strategies. 
-In this section, we will filter for stocks with the lowest percentiles on the following metrics:
+    Drop missing data from the data set (pandas' dropna method is useful here)
+    Replace missing data with a new value (pandas' fillna method is useful here)
+    In this tutorial, we will replace missing data with the average non-NaN data point from that column.
+    """
 
-Price-to-earnings ratio
-Price-to-book ratio
-Price-to-sales ratio
-Enterprise Value divided by Earnings Before Interest, Taxes, Depreciation, and Amortization (EV/EBITDA)
-Enterprise Value divided by Gross Profit (EV/GP)
+    # Selecting the Stocks and Calculating the Number of Shares to Buy
+    from sizing import read_portfolio_value
 
-Some of these metrics aren't provided directly by the IEX Cloud API, and must be computed after pulling raw data. 
-We'll start by calculating each data point from scratch.
+    portfolio_value = read_portfolio_value(args.portfolio_value)
+    results = stocks.run_strategies(data, symbols, ['value'], portfolio_value,
+                                    weighting=args.weighting,
+                                    impute=args.impute,
+                                    impute_by=args.impute_by)
+    print(results['value'])
+    print('Missing values imputed per column:', results['value'].attrs['imputed'])
 
-rv often. It stands for robust value
-"""
-rv_columns = [
-    'Ticker',
-    'Price',
-    'Number of Shares to Buy',
-    'Price-to-Earnings Ratio',
-    'PE Percentile',
-    'Price-to-Book Ratio',
-    'PB Percentile',
-    'Price-to-Sales Ratio',
-    'PS Percentile',
-    'EV/EBITDA',
-    'EV/EBITDA Percentile',
-    'EV/GP',
-    'EV/GP Percentile',
-    'RV Score'
-]
-
-rv_dataframe = pd.DataFrame(columns=rv_columns)
-
-for symbol_string in symbol_strings:
-    batch_api_call_url = f'https://sandbox.iexapis.com/stable/stock/market/batch?symbols={symbol_string}&types=quote,advanced-stats&token={IEX_CLOUD_API_TOKEN}'
-    data = requests.get(batch_api_call_url).json()
-    for symbol in symbol_string.split(','):
-        enterprise_value = data[symbol]['advanced-stats']['enterpriseValue']
-        ebitda = data[symbol]['advanced-stats']['EBITDA']
-        gross_profit = data[symbol]['advanced-stats']['grossProfit']
-
-        try:
-            ev_to_ebitda = enterprise_value/ebitda
-        except TypeError:
-            ev_to_ebitda = np.NaN
-
-        try:
-            ev_to_gross_profit = enterprise_value/gross_profit
-        except TypeError:
-            ev_to_gross_profit = np.NaN
-
-        new_data = pd.DataFrame([[
-                                 symbol,
-                                 data[symbol]['quote']['latestPrice'],
-                                 'N/A',
-                                 data[symbol]['quote']['peRatio'],
-                                 'N/A',
-                                 data[symbol]['advanced-stats']['priceToBook'],
-                                 'N/A',
-                                 data[symbol]['advanced-stats']['priceToSales'],
-                                 'N/A',
-                                 ev_to_ebitda,
-                                 'N/A',
-                                 ev_to_gross_profit,
-                                 'N/A',
-                                 'N/A'
-                                 ]],
-                                columns=rv_columns)
-        rv_dataframe = pd.concat([rv_dataframe, new_data],
-                                 ignore_index=True,
-                                 axis=0)
-
-# print(rv_dataframe.columns)
-# print(rv_dataframe.all)
-
-# print missing data:
-print(rv_dataframe[rv_dataframe.isnull().any(axis=1)])
+    # export to excel
+    with profiling.stage('export', rows=len(results['value'])):
+        stocks.write_results(results)
 
-"""
-Dealing with missing data is an important topic in data science.
+    profiling.finish_run('value', args)
 
-There are two main approaches:
 
-Drop missing data from the data set (pandas' dropna method is useful here)
-Replace missing data with a new value (pandas' fillna method is useful here)
-In this tutorial, we will replace missing data with the average non-NaN data point from that column.
-"""
-for column in ['Price-to-Earnings Ratio', 'Price-to-Book Ratio', 'Price-to-Sales Ratio',  'EV/EBITDA', 'EV/GP']:
-    rv_dataframe[column].fillna(rv_dataframe[column].mean(), inplace=True)
-
-# drop rows with None
-# rv_dataframe = rv_dataframe.dropna().reset_index()
-# rv_dataframe = rv_dataframe.mask(rv_dataframe.eq('None')).dropna().reset_index()
-
-
-# Calculating Value Percentiles
-metrics = {
-    'Price-to-Earnings Ratio': 'PE Percentile',
-    'Price-to-Book Ratio': 'PB Percentile',
-    'Price-to-Sales Ratio': 'PS Percentile',
-    'EV/EBITDA': 'EV/EBITDA Percentile',
-    'EV/GP': 'EV/GP Percentile'
-}
-
-for row in rv_dataframe.index:
-    for metric in metrics.keys():
-        rv_dataframe.loc[row, metrics[metric]] = stats.percentileofscore(
-            rv_dataframe[metric],
-            rv_dataframe.loc[row, metric]
-        )/100
-
-# Print each percentile score to make sure it was calculated properly
-for metric in metrics.values():
-    print(rv_dataframe[metric])
-
-# print(rv_dataframe)
-
-# Calculating the RV Score
-for row in rv_dataframe.index:
-    value_percentiles = []
-    for metric in metrics.keys():
-        value_percentiles.append(rv_dataframe.loc[row, metrics[metric]])
-    rv_dataframe.loc[row, 'RV Score'] = mean(value_percentiles)
-
-
-# Selecting the 50 Best Value Stocks
-rv_dataframe.sort_values(by='RV Score', inplace=True)
-rv_dataframe = rv_dataframe[:50]
-rv_dataframe.reset_index(drop=True, inplace=True)
-
-
-# Calculating the Number of Shares to Buy
-portfolio_size = input("Enter the value of your portfolio:")
-try:
-    val = float(portfolio_size)
-except ValueError:
-    print("That's not a number! \n Try again:")
-    portfolio_size = input("Enter the value of your portfolio:")
-
-position_size = float(portfolio_size) / len(rv_dataframe.index)
-for i in range(0, len(rv_dataframe['Ticker'])):
-    rv_dataframe.loc[i, 'Number of Shares to Buy'] = math.floor(
-        position_size / rv_dataframe['Price'][i])
-
-print(rv_dataframe)
-
-# export to excel
-column_formats = {
-    'A': ['Ticker', 'string'],
-    'B': ['Price', 'dollar'],
-    'C': ['Number of Shares to Buy', 'integer'],
-    'D': ['Price-to-Earnings Ratio', 'float'],
-    'E': ['PE Percentile', 'percent'],
-    'F': ['Price-to-Book Ratio', 'float'],
-    'G': ['PB Percentile', 'percent'],
-    'H': ['Price-to-Sales Ratio', 'float'],
-    'I': ['PS Percentile', 'percent'],
-    'J': ['EV/EBITDA', 'float'],
-    'K': ['EV/EBITDA Percentile', 'percent'],
-    'L': ['EV/GP', 'float'],
-    'M': ['EV/GP Percentile', 'percent'],
-    'N': ['RV Score', 'percent']
-}
-
-write_to_excel(df=rv_dataframe,
-               filepath='output\\value_strategy.xlsx',
-               sheet_name='Value Strategy',
-               column_formats=column_formats)
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Run several strategies on one market data snapshot
+
+Fetches the union of the endpoint types the selected strategies need
+(quote, stats, advanced-stats) once per batch of symbols, then runs each
+strategy on that shared snapshot and writes its Excel sheet.
+
+    python stocksrunner.py --portfolio-value 1000000
+    python stocksrunner.py --strategies momentum value --portfolio-value 50000
+
+Symbols missing from the response are skipped; when --universe is a
+universe.py table they are quarantined there, and removed after a few
+runs without them.
+With --stream the universe is fetched and parsed one chunk at a time,
+for universes of many thousands of symbols.
+With --save-snapshot the fetched data is also stored as a dated columnar
+snapshot, --from-snapshot reruns the strategies on a stored snapshot
+without fetching anything.
+--workbook writes all strategy sheets into one Excel workbook,
+--output-format csv or parquet writes a file per strategy for downstream
+systems instead.
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+
+import profiling
+import stocks
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Run stock selecting strategies on one snapshot')
+    parser.add_argument('--strategies', nargs='+', choices=stocks.STRATEGY_NAMES,
+                        default=stocks.STRATEGY_NAMES)
+    parser.add_argument('--universe', default='sp_500_stocks.csv',
+                        help='CSV file with a Ticker column, or a universe.py table')
+    parser.add_argument('--refresh', action='store_true',
+                        help='ignore cached IEX responses and fetch everything again')
+    parser.add_argument('--portfolio-value', type=float,
+                        help='value of your portfolio, asked for when not given')
+    parser.add_argument('--stream', action='store_true',
+                        help='fetch and parse the universe one chunk at a time')
+    parser.add_argument('--save-snapshot', action='store_true',
+                        help='store the fetched data as the snapshot of today')
+    parser.add_argument('--from-snapshot', metavar='DATE', nargs='?', const='latest',
+                        help='run on a stored snapshot (default the latest) instead of fetching')
+    parser.add_argument('--output-format', choices=stocks.OUTPUT_FORMATS, default='excel')
+    parser.add_argument('--workbook', metavar='PATH',
+                        help='write all sheets to this workbook (or directory for csv and parquet)')
+    stocks.add_client_arguments(parser)
+    profiling.add_arguments(parser)
+    return parser
+
+
+def main(argv: list = None):
+    args = build_parser().parse_args(argv)
+    profiling.start_run('runner', args)
+
+    with profiling.stage('fetch'):
+        if args.from_snapshot:
+            data = stocks.load_snapshot(None if args.from_snapshot == 'latest' else args.from_snapshot)
+            symbols = data.symbols.tolist()
+        elif args.stream:
+            data = stocks.stream(args.universe, args.strategies, args.refresh, args.base_url)
+            symbols = data.symbols.tolist()
+        else:
+            # symbols missing from the response are quarantined, not fatal
+            universe = stocks.load_universe(args.universe)
+            symbols = universe.fetch_symbols()
+            data = stocks.fetch(symbols, args.strategies, args.refresh, base_url=args.base_url)
+            symbols = universe.record_response(data, symbols)
+            if universe.path:
+                universe.save()
+            if universe.quarantined():
+                print('Quarantined, missing from the response:', ' '.join(universe.quarantined()))
+        if args.save_snapshot and not args.from_snapshot:
+            stocks.save_snapshot(data, symbols)
+        profiling.add('rows', len(symbols))
+
+    from sizing import read_portfolio_value
+
+    portfolio_value = read_portfolio_value(args.portfolio_value)
+    results = stocks.run_strategies(data, symbols, args.strategies, portfolio_value)
+    for df in results.values():
+        print(df)
+    with profiling.stage('export', rows=sum(len(df) for df in results.values())):
+        stocks.write_results(results, args.output_format, args.workbook)
+
+    profiling.finish_run('runner', args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""Long running service that keeps the strategy picks warm
+
+    python stocksservice.py --port 8080 --interval 60
+    python stocksservice.py --stub       # against the local IEX stub
+
+Every interval the market data of the universe is refreshed through the
+response cache, so quotes are downloaded again after 15 minutes and the
+stats once a day. The picks of a strategy (its scored and selected
+stocks) are only recomputed when one of the strategy's input fields
+changed for some symbol, and then the momentum and value ranks only for
+the changed symbols (incrementalscoring). Requests are answered from the
+picks in memory, only the share counts are computed per request:
+
+    GET  /picks?strategy=value&portfolio_value=1000000&weighting=equal
+    GET  /status
+    POST /refresh
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import time
+from datetime import datetime
+from urllib.parse import parse_qs, urlparse
+
+import stocks
+
+logger = logging.getLogger('stocksservice')
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 500: 'Internal Server Error',
+               503: 'Service Unavailable'}
+
+# above this fraction of changed symbols a strategy is scored from scratch,
+# updating that many ranks one by one is slower
+REBUILD_FRACTION = 0.1
+
+
+def changed_symbols(old: dict, new: dict):
+    """Mask of the symbols with any changed input column (NaN equals NaN)"""
+    import numpy as np  # The Numpy numerical computing library
+
+    changed = None
+    for name, values in new.items():
+        differs = ~((old[name] == values) | (np.isnan(old[name]) & np.isnan(values)))
+        changed = differs if changed is None else changed | differs
+    return changed
+
+
+class PickBoard:
+    """The current picks of every strategy and the inputs they were made from"""
+
+    def __init__(self, strategy_names: list, n: int = 50):
+        self.strategy_names = strategy_names
+        self.n = n
+        self.symbols = None
+        self.inputs = {}
+        self.scores = {}
+        self.picks = {}
+        self.updated_at = {}
+        self.changed = {}
+
+    def update(self, data: dict, symbols: list) -> dict:
+        """Rescore the strategies whose inputs changed, returns {strategy: changed symbols}"""
+        from ingest import parse_columns
+        from strategies import FIELDS, METRIC_COLUMNS, PICKS
+
+        same_universe = symbols == self.symbols
+        changed = {}
+        for name in self.strategy_names:
+            if name in METRIC_COLUMNS:
+                inputs = METRIC_COLUMNS[name](data, symbols)
+            else:
+                inputs = parse_columns(data, symbols, FIELDS[name])
+            mask = None
+            if same_universe and name in self.inputs:
+                mask = changed_symbols(self.inputs[name], inputs)
+                changed[name] = int(mask.sum())
+            else:
+                changed[name] = len(symbols)
+            if changed[name] == 0:
+                continue
+            if name in METRIC_COLUMNS:
+                self.picks[name] = self._rescore(name, symbols, inputs, mask)
+            else:
+                self.picks[name] = PICKS[name](data, symbols)
+            self.inputs[name] = inputs
+            self.updated_at[name] = datetime.now().isoformat(timespec='seconds')
+        self.symbols = symbols
+        self.changed = changed
+        return changed
+
+    def _rescore(self, name: str, symbols: list, inputs: dict, mask=None):
+        """Picks of a scored strategy, only the changed symbols are re-ranked"""
+        import numpy as np  # The Numpy numerical computing library
+        from incrementalscoring import IncrementalScores
+        from strategies import SCORING
+
+        scoring = SCORING[name]
+        if mask is None or name not in self.scores or mask.mean() > REBUILD_FRACTION:
+            self.scores[name] = IncrementalScores(symbols, inputs, scoring['metrics'],
+                                                  scoring['score_column'])
+        else:
+            rows = np.flatnonzero(mask)
+            self.scores[name].update_many([symbols[i] for i in rows],
+                                          {column: values[rows] for column, values in inputs.items()})
+        return self.scores[name].top(scoring['columns'], self.n, scoring['ascending'])
+
+    def positions(self, strategy: str, portfolio_value: float, weighting: str = 'equal'):
+        """The picks of strategy with their shares to buy for portfolio_value"""
+        from strategies import size_picks
+
+        return size_picks(strategy, self.picks[strategy].copy(), portfolio_value, weighting)
+
+
+class StrategyService:
+    """Scheduled refreshes of the PickBoard and the HTTP interface to it"""
+
+    def __init__(self, client, symbols: list, strategy_names: list,
+                 n: int = 50, interval: float = 60.0):
+        self.client = client
+        self.symbols = symbols
+        self.board = PickBoard(strategy_names, n)
+        self.interval = interval
+        self.refreshes = 0
+        self.last_refresh = None
+        self.last_error = None
+        self._refresh_lock = asyncio.Lock()
+
+    def _refresh(self) -> dict:
+        from strategies import endpoint_types
+
+        from universe import present_symbols
+
+        data = self.client.fetch(self.symbols, endpoint_types(self.board.strategy_names))
+        return self.board.update(data, present_symbols(data, self.symbols))
+
+    async def refresh(self) -> dict:
+        """Fetch and rescore in a worker thread, one refresh at a time"""
+        async with self._refresh_lock:
+            start = time.perf_counter()
+            changed = await asyncio.to_thread(self._refresh)
+            self.refreshes += 1
+            self.last_refresh = {'at': datetime.now().isoformat(timespec='seconds'),
+                                 'seconds': round(time.perf_counter() - start, 3),
+                                 'changed': changed}
+            self.last_error = None
+            logger.info('refreshed in %.3fs, changed symbols %s',
+                        self.last_refresh['seconds'], changed)
+            return changed
+
+    async def run_schedule(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as error:
+                # keep serving the last picks
+                self.last_error = repr(error)
+                logger.exception('refresh failed')
+            await asyncio.sleep(self.interval)
+
+    def status(self) -> dict:
+        return {'symbols': len(self.symbols),
+                'strategies': {name: {'picks': len(self.board.picks[name]),
+                                      'updated_at': self.board.updated_at[name]}
+                               for name in self.board.picks},
+                'refreshes': self.refreshes,
+                'last_refresh': self.last_refresh,
+                'last_error': self.last_error}
+
+    def picks(self, query: dict) -> tuple:
+        """Status code and body of a /picks request"""
+        from strategies import STRATEGY_WEIGHTINGS
+
+        strategy = query.get('strategy', [None])[0]
+        weighting = query.get('weighting', ['equal'])[0]
+        if strategy not in self.board.strategy_names:
+            return 400, {'error': f'strategy must be one of {self.board.strategy_names}'}
+        if weighting not in STRATEGY_WEIGHTINGS[strategy]:
+            return 400, {'error': f'weighting of {strategy} must be one of '
+                                  f'{list(STRATEGY_WEIGHTINGS[strategy])}'}
+        try:
+            portfolio_value = float(query['portfolio_value'][0])
+        except (KeyError, ValueError):
+            return 400, {'error': 'portfolio_value must be a number'}
+        if not math.isfinite(portfolio_value) or portfolio_value <= 0:
+            return 400, {'error': 'portfolio_value must be a positive number'}
+        if strategy not in self.board.picks:
+            return 503, {'error': 'no market data yet'}
+
+        from schema import records
+
+        try:
+            df = self.board.positions(strategy, portfolio_value, weighting)
+        except OverflowError:
+            return 400, {'error': 'portfolio_value is too large for the share counts'}
+        return 200, {'strategy': strategy,
+                     'portfolio_value': portfolio_value,
+                     'weighting': weighting,
+                     'updated_at': self.board.updated_at[strategy],
+                     'positions': records(df)}
+
+    async def route(self, method: str, target: str) -> tuple:
+        url = urlparse(target)
+        match method, url.path.rstrip('/'):
+            case 'GET', '/picks':
+                return self.picks(parse_qs(url.query))
+            case 'GET', '/status':
+                return 200, self.status()
+            case 'POST', '/refresh':
+                return 200, {'changed': await self.refresh()}
+            case _, '/picks' | '/status' | '/refresh':
+                return 405, {'error': f'{method} not allowed'}
+        return 404, {'error': 'not found'}
+
+    async def handle(self, reader, writer):
+        """One HTTP/1.1 request per connection"""
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            if len(request_line) < 2:
+                status, body = 400, {'error': 'bad request'}
+            else:
+                try:
+                    status, body = await self.route(request_line[0], request_line[1])
+                except Exception as error:
+                    logger.exception('request failed')
+                    status, body = 500, {'error': repr(error)}
+            content = json.dumps(body).encode()
+            writer.write(f'HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n'
+                         f'Content-Type: application/json\r\n'
+                         f'Content-Length: {len(content)}\r\n'
+                         f'Connection: close\r\n\r\n'.encode() + content)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8080):
+        server = await asyncio.start_server(self.handle, host, port)
+        logger.info('serving on http://%s:%s', host, server.sockets[0].getsockname()[1])
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.run_schedule())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Serve the strategy picks over HTTP')
+    parser.add_argument('--strategies', nargs='+', choices=stocks.STRATEGY_NAMES,
+                        default=stocks.STRATEGY_NAMES)
+    parser.add_argument('--universe', help='CSV file with a Ticker column (default sp_500_stocks.csv)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--interval', type=float, default=60.0,
+                        help='seconds between market data refreshes')
+    parser.add_argument('--top', type=int, default=50,
+                        help='number of stocks picked by the momentum and value strategies')
+    stocks.add_client_arguments(parser)
+    parser.add_argument('--stub', action='store_true',
+                        help='use the local IEX stub instead of IEX Cloud')
+    parser.add_argument('--stub-symbols', type=int, default=500,
+                        help='with --stub and no --universe: size of the fake universe')
+    return parser
+
+
+def main(argv: list = None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
+    from marketdata import MarketDataClient
+    from responsecache import CACHE_PATH, ResponseCache
+
+    client_options = {'base_url': args.base_url}
+    cache_path = CACHE_PATH
+    if args.stub:
+        from stubserver import make_symbols, start_stub_server
+
+        stub, base_url = start_stub_server()
+        client_options = {'token': 'stub', 'base_url': base_url}
+        # the stub data stays out of the response cache of real runs
+        cache_path = ':memory:'
+        symbols = (stocks.read_universe(args.universe) if args.universe
+                   else make_symbols(args.stub_symbols))
+    else:
+        symbols = stocks.read_universe(args.universe or 'sp_500_stocks.csv')
+
+    with ResponseCache(cache_path) as cache, MarketDataClient(cache=cache, **client_options) as client:
+        service = StrategyService(client, symbols, args.strategies, args.top, args.interval)
+        try:
+            asyncio.run(service.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
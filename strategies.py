@@ -0,0 +1,345 @@
+"""The three stock selecting strategies as functions
+
+Every strategy works on an in-memory market data snapshot: the merged
+batch response {symbol: {type: payload}} of the market data client.
+ENDPOINT_TYPES lists the types a strategy needs, so one snapshot holding
+the union of these types serves all strategies.
+
+1: equal_weight    Equal-weight S&P 500 index fund
+2: quant_momentum  The 50 stocks with the highest price momentum (HQM)
+3: quant_value     The 50 stocks with the best value metrics (RV)
+
+Each strategy is its picks function (ingest, impute, score, select) and
+size_picks, which fills in the shares to buy for a portfolio value.
+
+17-10-2026
+Arno Kemner
+"""
+import os
+
+import pandas as pd  # The Pandas data science library
+
+from imputation import impute as impute_missing
+from ingest import (EQUAL_WEIGHT_FIELDS, GROUP_FIELDS, MOMENTUM_FIELDS, VALUE_FIELDS,
+                    VALUE_RATIOS, add_ratios, build_frame, parse_columns, parse_labels)
+from profiling import stage
+from scoring import score_frame
+from selection import select_top
+from sizing import size_positions
+
+ENDPOINT_TYPES = {
+    'equal-weight': ['quote'],
+    'momentum': ['stats', 'quote'],
+    'value': ['quote', 'advanced-stats'],
+}
+
+FIELDS = {
+    'equal-weight': EQUAL_WEIGHT_FIELDS,
+    'momentum': MOMENTUM_FIELDS,
+    'value': VALUE_FIELDS,
+}
+
+EQUAL_WEIGHT_COLUMNS = [
+    'Ticker',
+    'Price',
+    'Market Capitalization',
+    'Number Of Shares to Buy'
+]
+
+HQM_COLUMNS = [
+    'Ticker',
+    'Price',
+    'Number of Shares to Buy',
+    'One-Year Price Return',
+    'One-Year Return Percentile',
+    'Six-Month Price Return',
+    'Six-Month Return Percentile',
+    'Three-Month Price Return',
+    'Three-Month Return Percentile',
+    'One-Month Price Return',
+    'One-Month Return Percentile',
+    'HQM Score'
+]
+
+RV_COLUMNS = [
+    'Ticker',
+    'Price',
+    'Number of Shares to Buy',
+    'Price-to-Earnings Ratio',
+    'PE Percentile',
+    'Price-to-Book Ratio',
+    'PB Percentile',
+    'Price-to-Sales Ratio',
+    'PS Percentile',
+    'EV/EBITDA',
+    'EV/EBITDA Percentile',
+    'EV/GP',
+    'EV/GP Percentile',
+    'RV Score'
+]
+
+TIME_PERIODS = [
+    'One-Year',
+    'Six-Month',
+    'Three-Month',
+    'One-Month'
+]
+
+MOMENTUM_METRICS = {f'{time_period} Price Return': f'{time_period} Return Percentile'
+                    for time_period in TIME_PERIODS}
+
+VALUE_METRICS = {
+    'Price-to-Earnings Ratio': 'PE Percentile',
+    'Price-to-Book Ratio': 'PB Percentile',
+    'Price-to-Sales Ratio': 'PS Percentile',
+    'EV/EBITDA': 'EV/EBITDA Percentile',
+    'EV/GP': 'EV/GP Percentile'
+}
+
+# export to excel: file, sheet name and column formats per strategy
+OUTPUTS = {
+    'equal-weight': {
+        'filepath': os.path.join('output', 'recommended_trades.xlsx'),
+        'sheet_name': 'Recommended Trades',
+        'column_formats': {
+            'A': ['Ticker', 'string'],
+            'B': ['Price', 'dollar'],
+            'C': ['Market Capitalization', 'dollar'],
+            'D': ['Number of Shares to Buy', 'integer']
+        }
+    },
+    'momentum': {
+        'filepath': os.path.join('output', 'momentum_strategy.xlsx'),
+        'sheet_name': 'Momentum Strategy',
+        'column_formats': {
+            'A': ['Ticker', 'string'],
+            'B': ['Price', 'dollar'],
+            'C': ['Number of Shares to Buy', 'integer'],
+            'D': ['One-Year Price Return', 'percent'],
+            'E': ['One-Year Return Percentile', 'percent'],
+            'F': ['Six-Month Price Return', 'percent'],
+            'G': ['Six-Month Return Percentile', 'percent'],
+            'H': ['Three-Month Price Return', 'percent'],
+            'I': ['Three-Month Return Percentile', 'percent'],
+            'J': ['One-Month Price Return', 'percent'],
+            'K': ['One-Month Return Percentile', 'percent'],
+            'L': ['HQM Score', 'integer']
+        }
+    },
+    'value': {
+        'filepath': os.path.join('output', 'value_strategy.xlsx'),
+        'sheet_name': 'Value Strategy',
+        'column_formats': {
+            'A': ['Ticker', 'string'],
+            'B': ['Price', 'dollar'],
+            'C': ['Number of Shares to Buy', 'integer'],
+            'D': ['Price-to-Earnings Ratio', 'float'],
+            'E': ['PE Percentile', 'percent'],
+            'F': ['Price-to-Book Ratio', 'float'],
+            'G': ['PB Percentile', 'percent'],
+            'H': ['Price-to-Sales Ratio', 'float'],
+            'I': ['PS Percentile', 'percent'],
+            'J': ['EV/EBITDA', 'float'],
+            'K': ['EV/EBITDA Percentile', 'percent'],
+            'L': ['EV/GP', 'float'],
+            'M': ['EV/GP Percentile', 'percent'],
+            'N': ['RV Score', 'percent']
+        }
+    },
+}
+
+# how the scored strategies rank: frame columns, metric: percentile
+# columns, score column and whether a low score is better
+SCORING = {
+    'momentum': {'columns': HQM_COLUMNS,
+                 'metrics': MOMENTUM_METRICS,
+                 'score_column': 'HQM Score',
+                 'ascending': False},
+    'value': {'columns': RV_COLUMNS,
+              'metrics': VALUE_METRICS,
+              'score_column': 'RV Score',
+              'ascending': True},
+}
+
+# shares column and sizing weights per strategy; a low RV Score is better
+SIZING = {
+    'equal-weight': {'shares_column': 'Number Of Shares to Buy',
+                     'weight_column': 'Market Capitalization'},
+    'momentum': {'shares_column': 'Number of Shares to Buy',
+                 'weight_column': 'HQM Score'},
+    'value': {'shares_column': 'Number of Shares to Buy',
+              'weight_column': 'RV Score',
+              'ascending': True},
+}
+
+# the weightings that make sense for the weight column of each strategy
+STRATEGY_WEIGHTINGS = {
+    'equal-weight': ('equal', 'market-cap'),
+    'momentum': ('equal', 'score'),
+    'value': ('equal', 'score'),
+}
+
+
+def fill_missing(df: pd.DataFrame, columns, impute: str = 'mean', groups=None) -> pd.DataFrame:
+    """Replace missing data with the average non-NaN value of its column
+
+    impute picks another statistic (see imputation.IMPUTATION_METHODS),
+    groups optionally the group label per row to take it within. The
+    number of filled values per column is kept in df.attrs['imputed'].
+    """
+    df.attrs['imputed'] = impute_missing(df, columns, impute, groups)
+    return df
+
+
+def group_labels(data: dict, symbols: list, impute_by: str = None):
+    """The sector or industry of every symbol, None without impute_by"""
+    if impute_by is None:
+        return None
+    return parse_labels(data, symbols, GROUP_FIELDS[impute_by])
+
+
+def equal_weight_picks(data: dict, symbols: list) -> pd.DataFrame:
+    """Every stock with a price and market capitalization, shares not sized yet"""
+    with stage('ingest', rows=len(symbols)):
+        final_dataframe = build_frame(symbols, EQUAL_WEIGHT_COLUMNS,
+                                      parse_columns(data, symbols, EQUAL_WEIGHT_FIELDS))
+
+    # drop rows with None
+    with stage('impute', rows=len(final_dataframe)):
+        return final_dataframe.dropna(
+            subset=['Price', 'Market Capitalization']).reset_index(drop=True)
+
+
+def momentum_columns(data: dict, symbols: list, returns: dict = None) -> dict:
+    """Price and the momentum metrics per symbol, missing values are NaN
+
+    returns optionally gives the price returns per momentum column, e.g.
+    computed from pricehistory.PriceHistory, instead of the stats endpoint.
+    """
+    if returns is None:
+        return parse_columns(data, symbols, MOMENTUM_FIELDS)
+    return {**parse_columns(data, symbols, {'Price': MOMENTUM_FIELDS['Price']}),
+            **returns}
+
+
+def momentum_picks(data: dict, symbols: list, n: int = 50, returns: dict = None,
+                   impute: str = 'mean', impute_by: str = None) -> pd.DataFrame:
+    """The n stocks with the highest HQM Score, shares not sized yet"""
+    with stage('ingest', rows=len(symbols)):
+        hqm_dataframe = build_frame(symbols, HQM_COLUMNS,
+                                    momentum_columns(data, symbols, returns))
+        groups = group_labels(data, symbols, impute_by)
+    with stage('impute', rows=len(hqm_dataframe)):
+        hqm_dataframe = fill_missing(hqm_dataframe, MOMENTUM_METRICS, impute, groups)
+
+    with stage('score', rows=len(hqm_dataframe)):
+        hqm_dataframe = score_frame(hqm_dataframe, MOMENTUM_METRICS, 'HQM Score')
+    with stage('select', rows=len(hqm_dataframe)):
+        return select_top(hqm_dataframe, 'HQM Score', n)
+
+
+def value_columns(data: dict, symbols: list) -> dict:
+    """Price, the value metrics and their inputs per symbol, missing values are NaN"""
+    return add_ratios(parse_columns(data, symbols, VALUE_FIELDS), VALUE_RATIOS)
+
+
+def value_picks(data: dict, symbols: list, n: int = 50,
+                impute: str = 'mean', impute_by: str = None) -> pd.DataFrame:
+    """The n stocks with the lowest RV Score, shares not sized yet"""
+    with stage('ingest', rows=len(symbols)):
+        rv_dataframe = build_frame(symbols, RV_COLUMNS, value_columns(data, symbols))
+        groups = group_labels(data, symbols, impute_by)
+    with stage('impute', rows=len(rv_dataframe)):
+        rv_dataframe = fill_missing(rv_dataframe, VALUE_METRICS, impute, groups)
+
+    with stage('score', rows=len(rv_dataframe)):
+        rv_dataframe = score_frame(rv_dataframe, VALUE_METRICS, 'RV Score')
+    with stage('select', rows=len(rv_dataframe)):
+        return select_top(rv_dataframe, 'RV Score', n, ascending=True)
+
+
+def size_picks(strategy: str, picks: pd.DataFrame, portfolio_value: float,
+               weighting: str = 'equal') -> pd.DataFrame:
+    """Fill in the shares to buy of the picks of strategy"""
+    if weighting not in STRATEGY_WEIGHTINGS[strategy]:
+        raise ValueError(f'Weighting {weighting!r} does not apply to {strategy}, '
+                         f'use one of {list(STRATEGY_WEIGHTINGS[strategy])}')
+    with stage('size', rows=len(picks)):
+        return size_positions(picks, portfolio_value, weighting=weighting, **SIZING[strategy])
+
+
+def equal_weight(data: dict,
+                 symbols: list,
+                 portfolio_value: float,
+                 weighting: str = 'equal') -> pd.DataFrame:
+    """Shares to buy of every stock for an equal-weight index fund"""
+    return size_picks('equal-weight', equal_weight_picks(data, symbols),
+                      portfolio_value, weighting)
+
+
+def quant_momentum(data: dict,
+                   symbols: list,
+                   portfolio_value: float,
+                   n: int = 50,
+                   weighting: str = 'equal',
+                   returns: dict = None,
+                   impute: str = 'mean',
+                   impute_by: str = None) -> pd.DataFrame:
+    """The n stocks with the highest HQM Score and their shares to buy"""
+    return size_picks('momentum', momentum_picks(data, symbols, n, returns, impute, impute_by),
+                      portfolio_value, weighting)
+
+
+def quant_value(data: dict,
+                symbols: list,
+                portfolio_value: float,
+                n: int = 50,
+                weighting: str = 'equal',
+                impute: str = 'mean',
+                impute_by: str = None) -> pd.DataFrame:
+    """The n stocks with the lowest RV Score and their shares to buy"""
+    return size_picks('value', value_picks(data, symbols, n, impute, impute_by),
+                      portfolio_value, weighting)
+
+
+STRATEGIES = {
+    'equal-weight': equal_weight,
+    'momentum': quant_momentum,
+    'value': quant_value,
+}
+
+# the parsed input columns of the scored strategies
+METRIC_COLUMNS = {
+    'momentum': momentum_columns,
+    'value': value_columns,
+}
+
+# the picks of a strategy before sizing, for callers that size them many times
+PICKS = {
+    'equal-weight': equal_weight_picks,
+    'momentum': momentum_picks,
+    'value': value_picks,
+}
+
+
+def fields(strategy_names) -> dict:
+    """Union of the field specs of the strategies"""
+    union = {}
+    for name in strategy_names:
+        union.update(FIELDS[name])
+    return union
+
+
+def endpoint_types(strategy_names, impute_by: str = None) -> list:
+    """Union of the endpoint types needed by the strategies, in a fixed order
+
+    impute_by adds the type of the sector or industry labels.
+    """
+    types = []
+    for name in strategy_names:
+        for endpoint_type in ENDPOINT_TYPES[name]:
+            if endpoint_type not in types:
+                types.append(endpoint_type)
+    if impute_by is not None and GROUP_FIELDS[impute_by][0] not in types:
+        types.append(GROUP_FIELDS[impute_by][0])
+    return types
@@ -0,0 +1,295 @@
+"""Local stub of the IEX Cloud batch endpoint
+
+Serves deterministic fake quote, stats, advanced-stats, company (sector
+and industry) and chart (daily close) payloads so the market data client can be exercised and
+benchmarked offline.
+Unknown types are ignored and the payload of each symbol only depends on
+the symbol (and the day for charts), so repeated runs get identical data.
+With a missing rate, that fraction of the fields is null, like the gaps
+in real IEX data. Delisted symbols are left out of the response.
+
+To test the client against failures, a fault rate answers that fraction
+of the requests with a fault (FAULTS): a 503, an error JSON, a truncated
+body, one type of a symbol or one whole symbol with an error string as a
+payload. The malformed symbols get an error string as their payload in
+the next response with them. A batch with a poison symbol gets a 400
+error JSON, and after outage_after requests every request gets a 503. With a token set, requests with another token
+get a 401.
+
+Run standalone:
+    python stubserver.py --port 8000 --latency 0.2 --missing-rate 0.05
+    python stubserver.py --fault-rate 0.1 --poison ZZZZ
+
+and point the scripts to it with --base-url (any token is accepted):
+    python stocksrunner.py --base-url http://127.0.0.1:8000/stable
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import functools
+import json
+import random
+import string
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HISTORY_START = date(2015, 1, 2)
+# trading days per chart range
+CHART_RANGES = {'5d': 5, '1m': 21, '3m': 63, '6m': 126, '1y': 252, '2y': 504, '5y': 1260}
+# kinds of injected faults
+FAULTS = ['status', 'error', 'truncated', 'payload', 'symbol']
+# sector: its industries
+SECTORS = {
+    'Technology': ['Software', 'Semiconductors', 'Hardware'],
+    'Health Care': ['Pharmaceuticals', 'Biotechnology', 'Medical Devices'],
+    'Financials': ['Banks', 'Insurance', 'Capital Markets'],
+    'Industrials': ['Machinery', 'Aerospace', 'Transportation'],
+    'Consumer': ['Retail', 'Food', 'Apparel'],
+    'Energy': ['Oil & Gas', 'Utilities'],
+}
+
+
+def make_symbols(n: int) -> list:
+    """Return n unique fake ticker symbols"""
+    rng = random.Random(n)
+    symbols = set()
+    while len(symbols) < n:
+        length = rng.randint(1, 5)
+        symbols.add(''.join(rng.choices(string.ascii_uppercase, k=length)))
+    return sorted(symbols)
+
+
+@functools.lru_cache(maxsize=4)
+def trading_days(end: date) -> list:
+    """Weekdays from HISTORY_START up to end"""
+    days = []
+    day = HISTORY_START
+    while day <= end:
+        if day.weekday() < 5:
+            days.append(day.isoformat())
+        day += timedelta(days=1)
+    return days
+
+
+@functools.lru_cache(maxsize=None)
+def price_path(symbol: str, end: date) -> tuple:
+    """Daily closes of symbol from HISTORY_START up to end"""
+    rng = random.Random(f'{symbol} chart')
+    drift = rng.gauss(0.0003, 0.0003)
+    volatility = rng.uniform(0.01, 0.03)
+    price = rng.uniform(5, 200)
+    closes = []
+    for _ in trading_days(end):
+        price *= 1 + rng.gauss(drift, volatility)
+        closes.append(round(price, 2))
+    return tuple(closes)
+
+
+def make_chart(symbol: str, chart_range: str = '1m', end: date = None) -> list:
+    """Chart payload: the daily closes of the last chart_range trading days"""
+    end = end or date.today()
+    days = trading_days(end)
+    n = CHART_RANGES.get(chart_range, 21)
+    closes = price_path(symbol, end)
+    return [{'date': day, 'close': close}
+            for day, close in zip(days[-n:], closes[-n:])]
+
+
+def make_payload(symbol: str, types: list, chart_range: str = '1m', missing_rate: float = 0.0) -> dict:
+    """Fake batch payload for one symbol, in the IEX response shape"""
+    rng = random.Random(symbol)
+    price = round(rng.uniform(5, 500), 2)
+    shares = rng.uniform(1e7, 5e9)
+    market_cap = price * shares
+    revenue = market_cap / rng.uniform(0.5, 15)
+    gross_profit = revenue * rng.uniform(0.1, 0.7)
+    ebitda = gross_profit * rng.uniform(0.2, 0.9)
+    enterprise_value = market_cap * rng.uniform(0.8, 1.4)
+
+    payload = {}
+    for endpoint_type in types:
+        match endpoint_type:
+            case 'quote':
+                payload['quote'] = {
+                    'symbol': symbol,
+                    'latestPrice': price,
+                    'marketCap': round(market_cap),
+                    'peRatio': round(rng.uniform(-20, 80), 2),
+                }
+            case 'stats':
+                payload['stats'] = {
+                    'year1ChangePercent': rng.gauss(0.08, 0.3),
+                    'month6ChangePercent': rng.gauss(0.04, 0.2),
+                    'month3ChangePercent': rng.gauss(0.02, 0.12),
+                    'month1ChangePercent': rng.gauss(0.01, 0.07),
+                }
+            case 'advanced-stats':
+                payload['advanced-stats'] = {
+                    'enterpriseValue': round(enterprise_value),
+                    'EBITDA': round(ebitda),
+                    'grossProfit': round(gross_profit),
+                    'priceToBook': round(rng.uniform(0.5, 20), 2),
+                    'priceToSales': round(market_cap / revenue, 2),
+                }
+            case 'company':
+                # own random generator, so the other payloads stay the same
+                company_rng = random.Random(f'{symbol} company')
+                sector = company_rng.choice(list(SECTORS))
+                payload['company'] = {
+                    'symbol': symbol,
+                    'sector': sector,
+                    'industry': company_rng.choice(SECTORS[sector]),
+                }
+            case 'chart':
+                payload['chart'] = make_chart(symbol, chart_range)
+    if missing_rate:
+        drop_missing(symbol, payload, missing_rate)
+    return payload
+
+
+def drop_missing(symbol: str, payload: dict, missing_rate: float):
+    """Set a missing_rate fraction of the numeric fields to null"""
+    # own random generator, so the values don't change with the rate
+    rng = random.Random(f'{symbol} missing')
+    for values in payload.values():
+        if isinstance(values, dict):
+            for key in values:
+                if key != 'symbol' and rng.random() < missing_rate:
+                    values[key] = None
+
+
+def make_batch(symbols: list, types: list, missing_rate: float = 0.0) -> dict:
+    """Fake merged batch response of symbols, without the server"""
+    return {symbol: make_payload(symbol, types, missing_rate=missing_rate)
+            for symbol in symbols}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # keep-alive, so pooled sessions can reuse their connections
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        symbols = query.get('symbols', [''])[0].split(',')
+        types = query.get('types', [''])[0].split(',')
+        chart_range = query.get('range', ['1m'])[0]
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            outage = server.outage_after is not None and server.requests > server.outage_after
+            fault = server.faults.choice(FAULTS) if server.faults.random() < server.fault_rate else None
+        time.sleep(server.latency)
+        if url.path.rstrip('/') != '/stable/stock/market/batch':
+            self._send(404, {'error': 'not found'})
+            return
+        if server.token is not None and query.get('token', [''])[0] != server.token:
+            self._send(401, {'error': 'Invalid token'})
+            return
+        if outage or fault == 'status':
+            self._send(503, {'error': 'Service unavailable'})
+            return
+        if server.poison.intersection(symbols):
+            self._send(400, {'error': 'Unknown symbol'})
+            return
+        if fault == 'error':
+            self._send(200, {'error': 'Internal error'})
+            return
+
+        # delisted symbols are left out of the response, as IEX does
+        body = {symbol: make_payload(symbol, types, chart_range, server.missing_rate)
+                for symbol in symbols if symbol and symbol not in server.delisted}
+        if fault == 'payload' and body:
+            with server.lock:
+                payload = body[server.faults.choice(sorted(body))]
+            if payload:
+                payload[next(iter(payload))] = 'Internal error'
+        if fault == 'symbol' and body:
+            with server.lock:
+                body[server.faults.choice(sorted(body))] = 'Internal error'
+        with server.lock:
+            malformed = server.malformed.intersection(body)
+            server.malformed -= malformed
+        for symbol in malformed:
+            body[symbol] = 'Internal error'
+        content = json.dumps(body).encode()
+        if fault == 'truncated':
+            content = content[:len(content) // 2]
+        self._send_content(200, content)
+
+    def _send(self, status: int, body: dict):
+        self._send_content(status, json.dumps(body).encode())
+
+    def _send_content(self, status: int, content: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def configure(server, latency: float = 0.0, missing_rate: float = 0.0, delisted=(),
+              fault_rate: float = 0.0, poison=(), outage_after: int = None, seed: int = 0):
+    """Set the simulated latency, gaps and faults of a stub server"""
+    server.latency = latency
+    server.missing_rate = missing_rate
+    server.delisted = set(delisted)
+    server.fault_rate = fault_rate
+    server.poison = set(poison)
+    server.outage_after = outage_after
+    server.token = None
+    server.malformed = set()
+    server.faults = random.Random(seed)
+    server.requests = 0
+    server.lock = threading.Lock()
+
+
+def start_stub_server(port: int = 0, latency: float = 0.0, missing_rate: float = 0.0,
+                      delisted=(), fault_rate: float = 0.0, poison=(), outage_after: int = None,
+                      seed: int = 0):
+    """Start the stub in a background thread
+
+    Returns the server and the base url to give to MarketDataClient.
+    Stop it with server.shutdown(). The delisted symbols get no payload;
+    server.delisted, server.fault_rate, server.poison, server.malformed,
+    server.outage_after and server.token can be changed while it runs,
+    server.requests counts the requests.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    configure(server, latency, missing_rate, delisted, fault_rate, poison, outage_after, seed)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f'http://{host}:{port}/stable'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local IEX batch endpoint stub')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds of simulated network latency per request')
+    parser.add_argument('--missing-rate', type=float, default=0.0,
+                        help='fraction of the fields that is null')
+    parser.add_argument('--delisted', nargs='+', default=[], metavar='SYMBOL',
+                        help='symbols left out of the responses')
+    parser.add_argument('--fault-rate', type=float, default=0.0,
+                        help='fraction of the requests answered with a fault')
+    parser.add_argument('--poison', nargs='+', default=[], metavar='SYMBOL',
+                        help='symbols that fail every batch they are in')
+    parser.add_argument('--outage-after', type=int,
+                        help='answer every request after this many with a 503')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), StubHandler)
+    configure(server, args.latency, args.missing_rate, args.delisted, args.fault_rate,
+              args.poison, args.outage_after)
+    print(f'Serving IEX stub on http://127.0.0.1:{args.port}/stable')
+    server.serve_forever()
@@ -0,0 +1,5 @@
+"""The modules are at the repository root, so plain pytest finds them too"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,116 @@
+"""incrementalscoring against the full fill_missing + score_frame recompute
+
+17-10-2026
+Arno Kemner
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from incrementalscoring import IncrementalScores, MetricRanks
+from ingest import build_frame
+from scoring import percentile_ranks, score_frame
+from selection import select_top
+from strategies import HQM_COLUMNS, MOMENTUM_METRICS, fill_missing
+
+PERCENTILE_COLUMNS = list(MOMENTUM_METRICS.values()) + ['HQM Score']
+
+
+def make_columns(n: int, rng) -> dict:
+    """Returns rounded to 2 decimals, so there are many ties"""
+    columns = {'Price': np.round(rng.uniform(5, 500, n), 2)}
+    for metric in MOMENTUM_METRICS:
+        values = np.round(rng.normal(0.05, 0.2, n), 2)
+        values[rng.random(n) < 0.1] = np.nan
+        columns[metric] = values
+    return columns
+
+
+def full_recompute(symbols: list, columns: dict) -> pd.DataFrame:
+    df = fill_missing(build_frame(symbols, HQM_COLUMNS, columns), MOMENTUM_METRICS)
+    return score_frame(df, MOMENTUM_METRICS, 'HQM Score')
+
+
+def assert_same(scores: IncrementalScores, symbols: list, columns: dict):
+    incremental = scores.frame(HQM_COLUMNS)
+    full = full_recompute(symbols, columns)
+    np.testing.assert_array_equal(incremental[PERCENTILE_COLUMNS].to_numpy(),
+                                  full[PERCENTILE_COLUMNS].to_numpy())
+    np.testing.assert_array_equal(incremental[list(MOMENTUM_METRICS)].to_numpy(),
+                                  full[list(MOMENTUM_METRICS)].to_numpy())
+    pd.testing.assert_frame_equal(scores.top(HQM_COLUMNS, 10), select_top(full, 'HQM Score', 10))
+
+
+def filled_percentiles(values: np.ndarray) -> np.ndarray:
+    """percentile_ranks after filling NaN with the mean, as fill_missing does"""
+    filled = pd.Series(values).fillna(pd.Series(values).mean()).to_numpy()
+    return percentile_ranks(filled)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_updates_match_full_recompute(seed):
+    rng = np.random.default_rng(seed)
+    n = 60
+    symbols = [f'S{i:03d}' for i in range(n)]
+    columns = make_columns(n, rng)
+    scores = IncrementalScores(symbols, columns, MOMENTUM_METRICS, 'HQM Score')
+    assert_same(scores, symbols, columns)
+
+    for round_ in range(100):
+        positions = rng.choice(n, 3, replace=False)
+        updates = {}
+        for metric in MOMENTUM_METRICS:
+            values = np.round(rng.normal(0.05, 0.2, 3), 2)
+            # missing values, values coming back and ties with other values
+            values[rng.random(3) < 0.2] = np.nan
+            ties = rng.random(3) < 0.2
+            values[ties] = columns[metric][rng.choice(n, ties.sum())]
+            columns[metric][positions] = values
+            updates[metric] = values
+        if round_ % 2:
+            scores.update_many([symbols[i] for i in positions], updates)
+        else:
+            for j, i in enumerate(positions):
+                scores.update(symbols[i], {metric: values[j] for metric, values in updates.items()})
+        assert_same(scores, symbols, columns)
+
+
+def test_values_missing_and_back():
+    values = np.array([0.1, 0.2, 0.3, 0.4, 0.5])
+    ranks = MetricRanks(values)
+    for position, value in [(1, np.nan), (3, np.nan), (1, 0.2), (3, 0.9), (0, np.nan)]:
+        ranks.update(position, value)
+        values[position] = value
+        np.testing.assert_array_equal(ranks.percentiles(), filled_percentiles(values))
+
+
+def test_all_missing_and_back():
+    values = np.array([0.1, np.nan, 0.3])
+    ranks = MetricRanks(values)
+    for position, value in [(0, np.nan), (2, np.nan), (1, 0.5), (0, 0.5)]:
+        ranks.update(position, value)
+        values[position] = value
+        if np.isnan(values).all():
+            assert np.isnan(ranks.percentiles()).all()
+        else:
+            np.testing.assert_array_equal(ranks.percentiles(), filled_percentiles(values))
+
+
+def test_ties_with_the_fill_value():
+    # the mean of 1, 2 and 3 is exactly 2, so the missing value ties
+    # with the valid 2
+    values = np.array([1.0, 2.0, np.nan, 3.0])
+    ranks = MetricRanks(values)
+    assert ranks.fill_value == pd.Series(values).mean()
+    np.testing.assert_array_equal(ranks.percentiles(), filled_percentiles(values))
+    assert ranks.percentiles()[1] == ranks.percentiles()[2]
+
+    # a valid value moves onto the fill value and away again
+    for position, value in [(3, 4.0), (0, 0.5), (1, 2.5), (1, 2.0), (3, 3.0), (0, 1.0)]:
+        changed = ranks.update(position, value)
+        before = filled_percentiles(values)
+        values[position] = value
+        after = filled_percentiles(values)
+        np.testing.assert_array_equal(ranks.percentiles(), after)
+        # every rank that changed is in the returned positions
+        assert set(np.flatnonzero(before != after)) <= set(changed.tolist())
@@ -0,0 +1,59 @@
+"""scoring.percentile_ranks against scipy.stats.percentileofscore
+
+17-10-2026
+Arno Kemner
+"""
+import numpy as np
+import pytest
+from scipy import stats
+
+from scoring import composite_score, percentile_ranks
+
+
+def percentileofscore_ranks(values: np.ndarray) -> np.ndarray:
+    """The original loop: one percentileofscore call per value, NaN left out"""
+    valid = values[~np.isnan(values)]
+    return np.array([np.nan if np.isnan(value) else
+                     stats.percentileofscore(valid, value, kind='rank') / 100
+                     for value in values])
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_matches_percentileofscore(seed):
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.normal(0, 1, (200, 4)), 1)  # rounded, so there are ties
+    values[rng.random(values.shape) < 0.1] = np.nan
+    ranks = percentile_ranks(values)
+    for column in range(values.shape[1]):
+        np.testing.assert_allclose(ranks[:, column], percentileofscore_ranks(values[:, column]),
+                                   rtol=1e-12)
+
+
+def test_ties_and_nan():
+    values = np.array([3.0, np.nan, 1.0, 3.0, 2.0, 3.0, np.nan])
+    ranks = percentile_ranks(values)
+    np.testing.assert_allclose(ranks, percentileofscore_ranks(values), rtol=1e-12)
+    assert np.isnan(ranks[[1, 6]]).all()
+    assert ranks[0] == ranks[3] == ranks[5] == 0.8
+
+
+def test_all_nan_and_empty():
+    assert np.isnan(percentile_ranks(np.full(3, np.nan))).all()
+    assert percentile_ranks(np.empty(0)).shape == (0,)
+
+
+def test_axis():
+    rng = np.random.default_rng(0)
+    values = np.round(rng.normal(0, 1, (3, 50, 2)), 1)
+    values[rng.random(values.shape) < 0.1] = np.nan
+    ranks = percentile_ranks(values, axis=1)
+    for date in range(3):
+        np.testing.assert_array_equal(ranks[date], percentile_ranks(values[date]))
+
+
+def test_composite_score_leaves_out_missing():
+    percentiles = np.array([[0.5, np.nan, 1.0], [np.nan, np.nan, np.nan]])
+    scores = composite_score(percentiles)
+    assert scores[0] == 0.75
+    assert np.isnan(scores[1])
+    assert composite_score(percentiles[:1], [1.0, 1.0, 3.0])[0] == pytest.approx(0.875)
@@ -0,0 +1,216 @@
+"""Indexed universe of symbols with delta updates and quarantine
+
+Instead of a hand-pruned static CSV, the universe is a symbol table:
+every symbol gets an integer id the first time it is added and keeps it,
+also after it is removed, so a symbol that comes back gets its old row.
+Metadata (e.g. the security name or the sector) is kept per id.
+
+Symbols are added and removed with deltas (add, remove, or sync to a new
+ticker list). A symbol missing from a batch response is quarantined
+instead of breaking the run: it is still fetched, so it comes back when
+IEX returns it again, but the strategies skip it. After max_misses
+responses in a row without it, it is removed.
+
+The table is stored as a CSV with a Ticker column, so it can be used
+wherever a universe CSV is expected:
+    python universe.py sync sp_500_stocks.csv
+    python universe.py remove DISCA HFC VIAC WLTW
+    python universe.py show
+
+17-10-2026
+Arno Kemner
+"""
+import argparse
+import csv
+import os
+
+import numpy as np  # The Numpy numerical computing library
+
+UNIVERSE_PATH = os.path.join('universe', 'universe.csv')
+STATUSES = ['active', 'quarantined', 'removed']
+TABLE_COLUMNS = ['Ticker', 'Id', 'Status', 'Misses']
+
+
+def present_mask(data, symbols: list) -> np.ndarray:
+    """Mask of the symbols with a payload in data (a batch response or a Snapshot)"""
+    if hasattr(data, 'positions'):
+        return data.positions(symbols) >= 0
+    return np.fromiter((bool(data.get(symbol)) for symbol in symbols), dtype=bool, count=len(symbols))
+
+
+def present_symbols(data, symbols: list) -> list:
+    """The symbols with a payload in data (a batch response or a Snapshot)"""
+    found = present_mask(data, symbols)
+    return [symbol for symbol, present in zip(symbols, found.tolist()) if present]
+
+
+class Universe:
+    """Symbol table: symbol -> stable integer id, status and metadata"""
+
+    def __init__(self, symbols=(), max_misses: int = 5, path: str = None):
+        self.max_misses = max_misses
+        self.path = path
+        self.ids = {}
+        self.symbols = []
+        self.status = []
+        self.misses = []
+        self.metadata = {}
+        self.add(symbols)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.ids and self.status[self.ids[symbol]] != 'removed'
+
+    def add(self, symbols, metadata: dict = None) -> np.ndarray:
+        """Add symbols (or take removed ones back), returns their ids
+
+        metadata optionally maps a field to one value per symbol.
+        """
+        ids = []
+        for symbol in symbols:
+            symbol_id = self.ids.get(symbol)
+            if symbol_id is None:
+                symbol_id = self.ids[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+                self.status.append('active')
+                self.misses.append(0)
+                for values in self.metadata.values():
+                    values.append('')
+            elif self.status[symbol_id] == 'removed':
+                self.status[symbol_id] = 'active'
+                self.misses[symbol_id] = 0
+            ids.append(symbol_id)
+        for field, values in (metadata or {}).items():
+            column = self.metadata.setdefault(field, [''] * len(self.symbols))
+            for symbol_id, value in zip(ids, values):
+                column[symbol_id] = '' if value is None else str(value)
+        return np.array(ids, dtype=np.intp)
+
+    def remove(self, symbols) -> int:
+        """Remove symbols, their ids stay reserved; returns the number removed"""
+        removed = 0
+        for symbol in symbols:
+            if symbol in self:
+                self.status[self.ids[symbol]] = 'removed'
+                removed += 1
+        return removed
+
+    def sync(self, symbols) -> tuple:
+        """Apply the delta to a new ticker list, returns (added, removed) symbols"""
+        symbols = list(dict.fromkeys(symbols))
+        wanted = set(symbols)
+        added = [symbol for symbol in symbols if symbol not in self]
+        removed = [symbol for symbol in self.members(quarantined=True) if symbol not in wanted]
+        self.add(added)
+        self.remove(removed)
+        return added, removed
+
+    def members(self, quarantined: bool = False) -> list:
+        """Active symbols in id order, with quarantined=True the quarantined ones too"""
+        statuses = ('active', 'quarantined') if quarantined else ('active',)
+        return [symbol for symbol, status in zip(self.symbols, self.status) if status in statuses]
+
+    def fetch_symbols(self) -> list:
+        """The symbols to fetch: the quarantined ones too, to see if they came back"""
+        return self.members(quarantined=True)
+
+    def quarantined(self) -> list:
+        return [symbol for symbol, status in zip(self.symbols, self.status)
+                if status == 'quarantined']
+
+    def record_response(self, data, symbols: list) -> list:
+        """Quarantine the symbols missing from data, returns the present ones
+
+        A symbol that is missing max_misses times in a row is removed, a
+        quarantined symbol that is present again becomes active.
+        """
+        present = present_symbols(data, symbols)
+        found = set(present)
+        for symbol in symbols:
+            symbol_id = self.ids.get(symbol)
+            if symbol_id is None or self.status[symbol_id] == 'removed':
+                continue
+            if symbol in found:
+                self.status[symbol_id] = 'active'
+                self.misses[symbol_id] = 0
+            else:
+                self.misses[symbol_id] += 1
+                self.status[symbol_id] = ('removed' if self.misses[symbol_id] >= self.max_misses
+                                          else 'quarantined')
+        return present
+
+    def positions(self, symbols) -> np.ndarray:
+        """Id of every symbol, -1 when it is not in the table"""
+        return np.fromiter((self.ids.get(symbol, -1) for symbol in symbols),
+                           dtype=np.intp, count=len(symbols))
+
+    def save(self, path: str = None) -> str:
+        """Write the table as CSV, default to the path it was loaded from"""
+        path = path or self.path or UNIVERSE_PATH
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(TABLE_COLUMNS + list(self.metadata))
+            for symbol_id, symbol in enumerate(self.symbols):
+                writer.writerow([symbol, symbol_id, self.status[symbol_id], self.misses[symbol_id]]
+                                + [values[symbol_id] for values in self.metadata.values()])
+        self.path = path
+        return path
+
+    @classmethod
+    def load(cls, path: str = UNIVERSE_PATH, max_misses: int = 5) -> 'Universe':
+        """A stored table, or a new one from a plain ticker CSV (its other columns as metadata)"""
+        with open(path, newline='') as file:
+            reader = csv.DictReader(file)
+            rows = list(reader)
+            fields = reader.fieldnames or []
+        table = 'Id' in fields and 'Status' in fields
+        universe = cls(max_misses=max_misses, path=path if table else None)
+        if table:
+            rows.sort(key=lambda row: int(row['Id']))
+        metadata_fields = [field for field in fields if field not in TABLE_COLUMNS]
+        universe.add([row['Ticker'] for row in rows],
+                     {field: [row[field] for row in rows] for field in metadata_fields})
+        if table:
+            if [int(row['Id']) for row in rows] != list(range(len(rows))):
+                raise ValueError(f'{path}: the ids must be 0 to {len(rows) - 1}')
+            universe.status = [row['Status'] if row['Status'] in STATUSES else 'active'
+                               for row in rows]
+            universe.misses = [int(row['Misses'] or 0) for row in rows]
+        return universe
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the universe symbol table')
+    parser.add_argument('--path', default=UNIVERSE_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('add', help='add symbols').add_argument('symbols', nargs='+')
+    commands.add_parser('remove', help='remove symbols').add_argument('symbols', nargs='+')
+    commands.add_parser('sync', help='add and remove symbols to match a ticker CSV') \
+        .add_argument('csv_path')
+    commands.add_parser('show', help='print the counts and the quarantined symbols')
+    args = parser.parse_args()
+
+    universe = Universe.load(args.path) if os.path.exists(args.path) else Universe(path=args.path)
+    match args.command:
+        case 'add':
+            universe.add(args.symbols)
+        case 'remove':
+            universe.remove(args.symbols)
+        case 'sync':
+            added, removed = universe.sync(Universe.load(args.csv_path).members())
+            print(f'Added {len(added)}, removed {len(removed)} symbols')
+        case 'show':
+            counts = {status: universe.status.count(status) for status in STATUSES}
+            print(f'{len(universe)} symbols: {counts}')
+            if universe.quarantined():
+                print('Quarantined:', ' '.join(universe.quarantined()))
+            return
+    print(f'Universe written to {universe.save()}')
+
+
+if __name__ == '__main__':
+    main()
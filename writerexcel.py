@@ -1,76 +1,89 @@
 """Function to write dataframe to excel
 
+ExcelWriter writes any number of strategy sheets into one workbook.
+It uses the xlsxwriter constant_memory mode, so rows are streamed to
+disk, and the cell formats are created once per workbook. xlsxwriter is
+imported when the first workbook is opened.
+
+column_formats maps a column letter to its header and format type:
+    {'A': ['Ticker', 'string'], 'B': ['Price', 'dollar'], ...}
+
 20-12-2022
 Arno Kemner
 """
+import math
+import os
+
+import numpy as np  # The Numpy numerical computing library
 import pandas as pd  # The Pandas data science library
 
+BACKGROUND_COLOR = '#0a0a23'
+FONT_COLOR = '#ffffff'
+
+# cell values that can be NaN, written as empty cells
+NUMBERS = (float, np.floating)
+
+# number format per format type, None for text
+NUMBER_FORMATS = {
+    'string': None,
+    'dollar': '$0.00',
+    'integer': '0',
+    'float': '0',
+    'percent': '0.0%',
+}
+
+
+class ExcelWriter:
+    """Workbook with one formatted sheet per dataframe"""
+
+    def __init__(self, filepath: str, constant_memory: bool = True):
+        import xlsxwriter
+
+        if os.path.dirname(filepath):
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        self.workbook = xlsxwriter.Workbook(filepath, {'constant_memory': constant_memory})
+        self.formats = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.workbook.close()
+
+    def format(self, format_type: str):
+        """Cached workbook format of a format type, unknown types are text"""
+        if format_type not in NUMBER_FORMATS:
+            format_type = 'string'
+        if format_type not in self.formats:
+            properties = {'font_color': FONT_COLOR,
+                          'bg_color': BACKGROUND_COLOR,
+                          'border': 1}
+            if NUMBER_FORMATS[format_type] is not None:
+                properties['num_format'] = NUMBER_FORMATS[format_type]
+            self.formats[format_type] = self.workbook.add_format(properties)
+        return self.formats[format_type]
+
+    def write(self, df: pd.DataFrame, sheet_name: str, column_formats: dict):
+        """Add df as a sheet, the rows are written top to bottom"""
+        from xlsxwriter.utility import xl_cell_to_rowcol
+
+        worksheet = self.workbook.add_worksheet(sheet_name)
+        formats = {xl_cell_to_rowcol(f'{letter}1')[1]: spec
+                   for letter, spec in column_formats.items()}
+        for i, column in enumerate(df.columns):
+            header, format_type = formats.get(i, [column, 'string'])
+            template = self.format(format_type)
+            worksheet.set_column(i, i, 25, template)
+            worksheet.write(0, i, header, template)
+
+        for row, values in enumerate(df.itertuples(index=False, name=None), start=1):
+            worksheet.write_row(row, 0, [None if value is pd.NA or isinstance(value, NUMBERS)
+                                         and math.isnan(value) else value for value in values])
+
 
 def write_to_excel(df: pd.DataFrame, filepath: str, sheet_name: str, column_formats: dict):
-    writer = pd.ExcelWriter(filepath, engine='xlsxwriter')
-    df.to_excel(writer, sheet_name=sheet_name, index=False)
-
-    background_color = '#0a0a23'
-    font_color = '#ffffff'
-
-    string_template = writer.book.add_format(
-        {
-            'font_color': font_color,
-            'bg_color': background_color,
-            'border': 1
-        }
-    )
-    dollar_template = writer.book.add_format(
-        {
-            'num_format': '$0.00',
-            'font_color': font_color,
-            'bg_color': background_color,
-            'border': 1
-        }
-    )
-    integer_template = writer.book.add_format(
-        {
-            'num_format': '0',
-            'font_color': font_color,
-            'bg_color': background_color,
-            'border': 1
-        }
-    )
-    float_template = writer.book.add_format(
-        {
-            'num_format': '0',
-            'font_color': font_color,
-            'bg_color': background_color,
-            'border': 1
-        }
-    )
-    percent_template = writer.book.add_format(
-        {
-            'num_format': '0.0%',
-            'font_color': font_color,
-            'bg_color': background_color,
-            'border': 1
-        }
-    )
-
-    for column in column_formats.keys():
-        match column_formats[column][1]:
-            case 'string':
-                template = string_template
-            case 'float':
-                template = float_template
-            case 'percent':
-                template = percent_template
-            case 'integer':
-                template = integer_template
-            case 'dollar':
-                template = dollar_template
-            case _:
-                template = string_template
-
-        writer.sheets[sheet_name].set_column(
-            f'{column}:{column}', 25, template)
-        writer.sheets[sheet_name].write(
-            f'{column}1', column_formats[column][0], template)
-
-    writer.close()
+    with ExcelWriter(filepath) as writer:
+        writer.write(df, sheet_name, column_formats)
@@ -0,0 +1,84 @@
+"""Pluggable output writers for the strategy results
+
+All writers take the same calls, so a run can write Excel for people
+and CSV or Parquet for downstream systems:
+
+    with get_writer('parquet', 'output/strategies') as writer:
+        writer.write(df, 'Momentum Strategy', column_formats)
+
+excel    one workbook, a sheet per strategy (writerexcel.ExcelWriter)
+csv      a CSV file per strategy in a directory
+parquet  a Parquet file per strategy in a directory (needs pyarrow)
+
+The CSV and Parquet files keep the dataframe column names and ignore the
+Excel column formats.
+
+17-10-2026
+Arno Kemner
+"""
+import os
+import re
+from abc import ABC, abstractmethod
+
+import pandas as pd  # The Pandas data science library
+
+from writerexcel import ExcelWriter
+
+
+def file_name(sheet_name: str) -> str:
+    """'Momentum Strategy' -> 'momentum_strategy'"""
+    return re.sub(r'[^0-9a-z]+', '_', sheet_name.lower()).strip('_')
+
+
+class DirectoryWriter(ABC):
+    """Writes every sheet to its own file in a directory"""
+    extension = ''
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        pass
+
+    def filepath(self, sheet_name: str) -> str:
+        return os.path.join(self.path, f'{file_name(sheet_name)}{self.extension}')
+
+    @abstractmethod
+    def write(self, df: pd.DataFrame, sheet_name: str, column_formats: dict = None):
+        """Write df as sheet_name to its file"""
+
+
+class CsvWriter(DirectoryWriter):
+    extension = '.csv'
+
+    def write(self, df: pd.DataFrame, sheet_name: str, column_formats: dict = None):
+        df.to_csv(self.filepath(sheet_name), index=False)
+
+
+class ParquetWriter(DirectoryWriter):
+    extension = '.parquet'
+
+    def write(self, df: pd.DataFrame, sheet_name: str, column_formats: dict = None):
+        df.to_parquet(self.filepath(sheet_name), index=False)
+
+
+WRITERS = {
+    'excel': ExcelWriter,
+    'csv': CsvWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def get_writer(output_format: str, path: str):
+    """Writer for output_format; path is the workbook or the directory"""
+    try:
+        return WRITERS[output_format](path)
+    except KeyError:
+        raise ValueError(f'Unknown output format {output_format!r}, use one of {list(WRITERS)}') from None